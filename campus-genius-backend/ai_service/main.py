@@ -1,17 +1,65 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+import json
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from pymongo import MongoClient
 
 load_dotenv()
 
+# The LLM gateway and response cache are shared with the Django backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from apps.chat_service.gateway import (  # noqa: E402
+    FakeBackend, GeminiBackend, LLMGateway, LLMTransientError, INTERACTIVE, BULK, RETRY_AFTER
+)
+from apps.chat_service.response_cache import (  # noqa: E402
+    MemoryStore, MongoStore, ResponseCache, course_scope
+)
+
 app = FastAPI(title="CampusGenius AI Services")
 
 # Initialize Gemini
 # model="gemini-pro" is a good default for text generation
-llm = ChatGoogleGenerativeAI(model="gemini-pro", google_api_key=os.getenv("GEMINI_API_KEY"))
+MODEL = "gemini-pro"
+
+# Every call goes through the gateway: bounded concurrency with chat ahead
+# of bulk work, timeouts, and jittered retries on rate limits
+backend = FakeBackend() if os.getenv("CHAT_LLM_BACKEND") == "fake" else GeminiBackend(os.getenv("GEMINI_API_KEY"))
+gateway = LLMGateway(
+    backend,
+    concurrency=int(os.getenv("LLM_GATEWAY_CONCURRENCY", "8")),
+    bulk_concurrency=int(os.getenv("LLM_GATEWAY_BULK_CONCURRENCY", "2")),
+    queue_timeout=float(os.getenv("LLM_GATEWAY_QUEUE_TIMEOUT", "10")),
+    timeout=float(os.getenv("LLM_GATEWAY_TIMEOUT", "120")),
+    retries=int(os.getenv("LLM_GATEWAY_RETRIES", "2")),
+    backoff=float(os.getenv("LLM_GATEWAY_BACKOFF", "0.5")),
+)
+
+
+# Same Mongo collection and settings as the Django side, so both share entries
+def build_response_cache():
+    try:
+        mongo = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"), serverSelectionTimeoutMS=2000)
+        mongo.server_info()
+        store = MongoStore(mongo[os.getenv("MONGO_DB_NAME", "campus_genius_chat")])
+    except Exception as e:
+        print(f"Response cache falling back to memory: {e}")
+        store = MemoryStore()
+    return ResponseCache(
+        store,
+        ttl=int(os.getenv("CHAT_CACHE_TTL", "86400")),
+        max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "500")),
+        similarity=float(os.getenv("CHAT_CACHE_SIMILARITY", "0")),
+        embed=gateway.embed_sync,
+        embed_model=backend.embed_model,
+    )
+
+
+response_cache = build_response_cache()
 
 @app.get("/")
 def read_root():
@@ -33,16 +81,20 @@ class QuizInput(BaseModel):
 class ChatInput(BaseModel):
     query: str
     context: Optional[str] = None
+    course_id: Optional[str] = None
+    stream: Optional[bool] = False
 
 class VideoInput(BaseModel):
     transcript: str
     max_length: Optional[int] = 300
 
 # Helper function to generate response
-async def generate_response(prompt_text: str):
+async def generate_response(prompt_text: str, priority: int = BULK):
     try:
-        response = llm.invoke(prompt_text)
-        return response.content
+        return await gateway.generate(MODEL, prompt_text, priority)
+    except LLMTransientError as e:
+        # Rate limited or queue full: ask the client to come back
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -66,10 +118,51 @@ async def generate_quiz(input: QuizInput):
 
 @app.post("/ai/chatbot")
 async def chatbot(input: ChatInput):
+    lookup = await run_in_threadpool(
+        response_cache.get, course_scope(input.course_id), input.query, input.context or ""
+    )
     context_str = f"Context: {input.context}\n\n" if input.context else ""
     prompt = f"{context_str}Question: {input.query}\n\nAnswer:"
-    result = await generate_response(prompt)
-    return {"response": result}
+    if input.stream:
+        return StreamingResponse(
+            stream_chatbot(lookup, prompt),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    if lookup.hit:
+        return {"response": lookup.reply, "cached": True}
+    result = await generate_response(prompt, INTERACTIVE)
+    await run_in_threadpool(response_cache.put, lookup, result)
+    return {"response": result, "cached": False}
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Server-Sent Events: 'token' per chunk, then 'done' with the full response or 'error'
+async def stream_chatbot(lookup, prompt):
+    if lookup.hit:
+        yield sse_event("token", {"text": lookup.reply})
+        yield sse_event("done", {"response": lookup.reply, "cached": True})
+        return
+    parts = []
+    try:
+        async for chunk in gateway.stream(MODEL, prompt, INTERACTIVE):
+            parts.append(chunk)
+            yield sse_event("token", {"text": chunk})
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+        return
+    result = "".join(parts)
+    await run_in_threadpool(response_cache.put, lookup, result)
+    yield sse_event("done", {"response": result, "cached": False})
+
+@app.get("/ai/gateway-stats")
+async def gateway_stats():
+    return gateway.snapshot()
+
+@app.get("/ai/chatbot/cache-stats")
+async def chatbot_cache_stats():
+    return await run_in_threadpool(response_cache.stats)
 
 @app.post("/ai/summarize-video")
 async def summarize_video(input: VideoInput):
@@ -1,12 +1,17 @@
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
+from apps.common.notification_counts import get_counts
+from .llm import LLMError
+from .views import AnswerStream, in_course
 
 User = get_user_model()
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
+        self.ai_tasks = set()
         self.room_name = self.scope['url_route']['kwargs']['room_name']
         self.room_group_name = f'chat_{self.room_name}'
         
@@ -29,6 +34,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         print(f"DEBUG: ChatConsumer disconnecting. Code: {close_code}")
+        for task in self.ai_tasks:
+            task.cancel()
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -37,6 +44,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         text_data_json = json.loads(text_data)
+        if text_data_json.get('type') == 'chat_ai':
+            # Streamed from a task so room messages keep arriving meanwhile
+            task = asyncio.create_task(self.answer(text_data_json))
+            self.ai_tasks.add(task)
+            task.add_done_callback(self.ai_tasks.discard)
+            return
         message = text_data_json['message']
         user = self.scope["user"]
 
@@ -60,11 +73,47 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'user': user
         }))
 
+    async def answer(self, request):
+        """
+        Answer a {"type": "chat_ai", "message", "course"?, "id"?} frame
+        to this socket only: chat_ai frames with event 'token' as the
+        model produces text, then 'done' with the full reply, or 'error'.
+        """
+        async def send(event, **data):
+            await self.send(text_data=json.dumps(
+                {'type': 'chat_ai', 'id': request.get('id'), 'event': event, **data}
+            ))
+
+        user = self.scope['user']
+        message = request.get('message')
+        course_id = request.get('course')
+        if not message:
+            await send('error', error='Message is required')
+            return
+        if course_id and not await database_sync_to_async(in_course)(user, course_id):
+            await send('error', error='Course not found')
+            return
+
+        answer = AnswerStream(user, message, course_id)
+        try:
+            async for chunk in answer:
+                await send('token', text=chunk)
+        except LLMError as e:
+            await send('error', error=str(e))
+            return
+        await send('done', reply=answer.reply, cached=answer.cached)
+
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user_id = self.scope['url_route']['kwargs']['user_id']
         self.notification_group_name = f'notifications_{self.user_id}'
 
+        # Only the recipient may listen to their notifications and counts
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated or str(user.pk) != self.user_id:
+            await self.close()
+            return
+
         # Join notification group
         await self.channel_layer.group_add(
             self.notification_group_name,
@@ -73,6 +122,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
+        # Current counts up front; later changes arrive as notification_counts
+        counts = await database_sync_to_async(get_counts)(user.pk)
+        await self.notification_counts({'counts': counts})
+
     async def disconnect(self, close_code):
         # Leave notification group
         await self.channel_layer.group_discard(
@@ -83,6 +136,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         pass  # Notifications are sent from the server side only
 
+    async def notification_counts(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'notification_counts',
+            'data': event['counts']
+        }))
+
     async def notification(self, event):
         # Send notification to WebSocket
         await self.send(text_data=json.dumps({
@@ -0,0 +1,448 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+logger = logging.getLogger(__name__)
+
+# LLM gateway: the one way AI features call a provider.
+#
+# Each process has one LLMGateway per provider. A call waits for a slot
+# in the gateway's Lanes. At most ``concurrency`` calls run at once.
+# INTERACTIVE waiters (chat) are served before BULK ones (quiz
+# generation, file summaries), and BULK work never holds more than
+# ``bulk_concurrency`` slots, so chat always has room. A call that gets
+# no slot within ``queue_timeout`` fails with LLMBusy instead of piling
+# up.
+#
+# Calls are bounded by ``timeout``. Provider errors that mean "try again
+# later" (rate limits, overload) raise LLMTransientError and are retried
+# up to ``retries`` times. Each retry waits a full-jitter exponential
+# backoff, and the call gives up its slot while waiting. Views answer
+# LLMTransientError, LLMBusy included, with 503 and Retry-After rather
+# than 500.
+#
+# Backends are pluggable: GeminiBackend, or FakeBackend, a deterministic
+# local model for development, load checks and tests. The module does
+# not import Django; ai_service/main.py uses it as well.
+
+INTERACTIVE, BULK = 0, 1
+LANE_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk'}
+
+# Seconds clients are told to wait after a 503
+RETRY_AFTER = 5
+
+# Gemini text models, in order of preference
+GEMINI_MODELS = (
+    'gemini-1.5-flash',
+    'gemini-pro',
+    'gemini-1.0-pro',
+    'gemini-1.5-pro',
+)
+
+
+class LLMError(Exception):
+    """No model produced a reply."""
+
+
+class LLMConfigurationError(LLMError):
+    pass
+
+
+class ModelNotFound(LLMError):
+    """The backend does not serve this model."""
+
+
+class LLMTransientError(LLMError):
+    """The provider is rate limiting or overloaded; the call may succeed later."""
+
+
+class LLMTimeout(LLMTransientError):
+    """The provider did not answer in time. Not retried."""
+
+
+class LLMBusy(LLMTransientError):
+    """No gateway slot became free in time."""
+
+
+class GeminiBackend:
+    name = 'gemini'
+    embed_model = 'models/embedding-001'
+
+    def __init__(self, api_key):
+        import google.generativeai as genai
+        self._genai = genai
+        genai.configure(api_key=api_key)
+        self._models = {}
+
+    def _model(self, model_name):
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = self._genai.GenerativeModel(model_name)
+        return model
+
+    @contextmanager
+    def _errors(self):
+        from google.api_core import exceptions
+        try:
+            yield
+        except exceptions.NotFound as e:
+            raise ModelNotFound(str(e)) from e
+        except (exceptions.TooManyRequests, exceptions.ResourceExhausted, exceptions.ServiceUnavailable,
+                exceptions.InternalServerError, exceptions.DeadlineExceeded) as e:
+            raise LLMTransientError(str(e)) from e
+
+    async def generate(self, model_name, contents):
+        with self._errors():
+            response = await self._model(model_name).generate_content_async(contents)
+            return response.text
+
+    async def stream(self, model_name, contents):
+        with self._errors():
+            response = await self._model(model_name).generate_content_async(contents, stream=True)
+            async for chunk in response:
+                yield chunk.text
+
+    def generate_sync(self, model_name, contents, timeout):
+        with self._errors():
+            response = self._model(model_name).generate_content(
+                contents, request_options={'timeout': timeout}
+            )
+            return response.text
+
+    def upload_file(self, path, mime_type):
+        with self._errors():
+            return self._genai.upload_file(path, mime_type=mime_type)
+
+    def embed(self, text):
+        with self._errors():
+            return self._genai.embed_content(
+                model=self.embed_model, content=text, task_type='semantic_similarity'
+            )['embedding']
+
+    def list_models(self):
+        return [
+            model.name for model in self._genai.list_models()
+            if 'generateContent' in model.supported_generation_methods
+        ]
+
+
+class FakeFile:
+    def __init__(self, path, mime_type):
+        self.path = path
+        self.mime_type = mime_type
+
+    def __str__(self):
+        return f'<file {self.mime_type}>'
+
+
+class FakeBackend:
+    """
+    Deterministic stand-in for the provider: answers after ``delay``
+    seconds (or ``delays[model_name]``) with a reply derived from the
+    prompt, fails for the model names in ``failing``, and raises
+    LLMTransientError for the first ``transient[model_name]`` calls.
+    """
+    name = 'fake'
+    embed_model = 'fake-hashed-words'
+
+    def __init__(self, delay=0.0, failing=(), models=GEMINI_MODELS, delays=None, transient=None):
+        self.delay = delay
+        self.delays = dict(delays or {})
+        self.failing = set(failing)
+        self.transient = dict(transient or {})
+        self.models = list(models)
+        self.calls = deque(maxlen=1000)  # model names asked, newest last
+        self._lock = threading.Lock()
+
+    def _check(self, model_name):
+        self.calls.append(model_name)
+        if model_name not in self.models:
+            raise ModelNotFound(model_name)
+        if model_name in self.failing:
+            raise LLMError(f"{model_name} is unavailable")
+        with self._lock:
+            if self.transient.get(model_name):
+                self.transient[model_name] -= 1
+                raise LLMTransientError(f"{model_name} is rate limited")
+
+    async def generate(self, model_name, contents):
+        delay = self.delays.get(model_name, self.delay)
+        if delay:
+            await asyncio.sleep(delay)
+        self._check(model_name)
+        return self._reply(model_name, contents)
+
+    async def stream(self, model_name, contents):
+        self._check(model_name)
+        # One word at a time, spread over the same total delay
+        words = self._reply(model_name, contents).split(' ')
+        delay = self.delays.get(model_name, self.delay) / len(words)
+        for i, word in enumerate(words):
+            if delay:
+                await asyncio.sleep(delay)
+            yield word if i == 0 else ' ' + word
+
+    def generate_sync(self, model_name, contents, timeout):
+        delay = self.delays.get(model_name, self.delay)
+        if delay > timeout:
+            time.sleep(timeout)
+            raise LLMTimeout(f"{model_name} did not answer within {timeout:g}s")
+        if delay:
+            time.sleep(delay)
+        self._check(model_name)
+        return self._reply(model_name, contents)
+
+    def upload_file(self, path, mime_type):
+        return FakeFile(path, mime_type)
+
+    def _reply(self, model_name, contents):
+        prompt = contents if isinstance(contents, str) else ' '.join(str(part) for part in contents)
+        digest = hashlib.sha1(prompt.encode()).hexdigest()[:8]
+        return f"[{model_name}:{digest}] {prompt}"
+
+    def embed(self, text):
+        # Hashed bag of words: shared words make questions similar
+        vector = [0.0] * 64
+        for word in text.split():
+            vector[int(hashlib.sha1(word.encode()).hexdigest(), 16) % 64] += 1.0
+        return vector
+
+    def list_models(self):
+        return [f'models/{name}' for name in self.models]
+
+
+class _Waiter:
+    def __init__(self, priority, wake):
+        self.priority = priority
+        self.wake = wake
+        self.granted = False
+
+
+class Lanes:
+    """
+    A counting semaphore with priority lanes. Waiters are woken through a
+    callback rather than a loop-bound primitive, so sync views, Celery
+    workers and any event loop can share one instance.
+    """
+
+    def __init__(self, concurrency, bulk_concurrency=None):
+        self.concurrency = concurrency
+        self.limits = {INTERACTIVE: concurrency, BULK: min(bulk_concurrency or concurrency, concurrency)}
+        self.active = {INTERACTIVE: 0, BULK: 0}
+        self._waiters = []  # (priority, arrival, waiter)
+        self._arrivals = itertools.count()
+        self._lock = threading.Lock()
+
+    def _free(self, priority):
+        return sum(self.active.values()) < self.concurrency and self.active[priority] < self.limits[priority]
+
+    def _enter(self, priority, wake):
+        with self._lock:
+            # No overtaking waiters of the same or a higher priority
+            if self._free(priority) and not any(entry[0] <= priority for entry in self._waiters):
+                self.active[priority] += 1
+                return None
+            waiter = _Waiter(priority, wake)
+            self._waiters.append((priority, next(self._arrivals), waiter))
+            return waiter
+
+    def _grant(self):
+        # Called with the lock held; returns the waiters to wake
+        woken = []
+        for entry in sorted(self._waiters, key=lambda entry: entry[:2]):
+            priority, _, waiter = entry
+            if self._free(priority):
+                self._waiters.remove(entry)
+                self.active[priority] += 1
+                waiter.granted = True
+                woken.append(waiter)
+        return woken
+
+    def release(self, priority):
+        with self._lock:
+            self.active[priority] -= 1
+            woken = self._grant()
+        for waiter in woken:
+            waiter.wake()
+
+    def _abandon(self, waiter):
+        with self._lock:
+            if not waiter.granted:
+                self._waiters[:] = [entry for entry in self._waiters if entry[2] is not waiter]
+                return
+        # The slot arrived just as the wait ended; pass it on
+        self.release(waiter.priority)
+
+    @asynccontextmanager
+    async def slot(self, priority, timeout):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enter(priority, wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(granted, timeout)
+            except asyncio.TimeoutError:
+                self._abandon(waiter)
+                raise LLMBusy(f"No {LANE_NAMES[priority]} LLM slot free within {timeout:g}s") from None
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    @contextmanager
+    def slot_sync(self, priority, timeout):
+        event = threading.Event()
+        waiter = self._enter(priority, event.set)
+        if waiter is not None and not event.wait(timeout):
+            self._abandon(waiter)
+            raise LLMBusy(f"No {LANE_NAMES[priority]} LLM slot free within {timeout:g}s")
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    'active': self.active[priority],
+                    'limit': self.limits[priority],
+                    'waiting': sum(1 for entry in self._waiters if entry[0] == priority),
+                }
+                for priority, name in LANE_NAMES.items()
+            }
+
+
+class LLMGateway:
+    def __init__(self, backend, concurrency=8, bulk_concurrency=2, queue_timeout=10.0, timeout=120.0,
+                 retries=2, backoff=0.5, max_backoff=8.0):
+        self.backend = backend
+        self.lanes = Lanes(concurrency, bulk_concurrency)
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.counters = {'calls': 0, 'retries': 0, 'busy': 0, 'timeouts': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _backoff(self, attempt):
+        # Full jitter, so callers that failed together do not retry together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _should_retry(self, error, attempt):
+        if isinstance(error, LLMTimeout):
+            self._count('timeouts')
+        elif isinstance(error, LLMTransientError) and attempt < self.retries:
+            self._count('retries')
+            logger.info("LLM call rate limited, retrying: %s", error)
+            return True
+        self._count('failures')
+        return False
+
+    async def generate(self, model_name, contents, priority=INTERACTIVE, timeout=None):
+        timeout = timeout or self.timeout
+        self._count('calls')
+        for attempt in itertools.count():
+            async with self._slot(priority):
+                try:
+                    return await asyncio.wait_for(self.backend.generate(model_name, contents), timeout)
+                except asyncio.TimeoutError:
+                    error = LLMTimeout(f"{model_name} did not answer within {timeout:g}s")
+                except Exception as e:
+                    error = e
+            if not self._should_retry(error, attempt):
+                raise error
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def stream(self, model_name, contents, priority=INTERACTIVE, timeout=None):
+        """
+        Like generate(), yielding text as it arrives. Retries only happen
+        before the first chunk; the timeout applies to each chunk.
+        """
+        timeout = timeout or self.timeout
+        self._count('calls')
+        for attempt in itertools.count():
+            sent = False
+            async with self._slot(priority):
+                chunks = self.backend.stream(model_name, contents)
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(anext(chunks), timeout)
+                        except StopAsyncIteration:
+                            return
+                        except asyncio.TimeoutError:
+                            raise LLMTimeout(f"{model_name} stopped answering for {timeout:g}s") from None
+                        if chunk:
+                            sent = True
+                            yield chunk
+                except Exception as e:
+                    error = e
+                finally:
+                    await chunks.aclose()
+            if sent or not self._should_retry(error, attempt):
+                raise error
+            await asyncio.sleep(self._backoff(attempt))
+
+    def generate_sync(self, model_name, contents, priority=BULK, timeout=None):
+        timeout = timeout or self.timeout
+        return self._call_sync(lambda: self.backend.generate_sync(model_name, contents, timeout), priority)
+
+    def upload_file_sync(self, path, mime_type, priority=BULK):
+        return self._call_sync(lambda: self.backend.upload_file(path, mime_type), priority)
+
+    def embed_sync(self, text, priority=INTERACTIVE):
+        return self._call_sync(lambda: self.backend.embed(text), priority)
+
+    def _call_sync(self, call, priority):
+        self._count('calls')
+        for attempt in itertools.count():
+            with self._slot_sync(priority):
+                try:
+                    return call()
+                except Exception as e:
+                    error = e
+            if not self._should_retry(error, attempt):
+                raise error
+            time.sleep(self._backoff(attempt))
+
+    @asynccontextmanager
+    async def _slot(self, priority):
+        try:
+            async with self.lanes.slot(priority, self.queue_timeout):
+                yield
+        except LLMBusy:
+            self._count('busy')
+            raise
+
+    @contextmanager
+    def _slot_sync(self, priority):
+        try:
+            with self.lanes.slot_sync(priority, self.queue_timeout):
+                yield
+        except LLMBusy:
+            self._count('busy')
+            raise
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {'backend': self.backend.name, 'lanes': self.lanes.snapshot(), **counters}
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from statistics import median
+
+# Per-model circuit breakers and latency stats for the chat LLM chain.
+#
+# A model that fails ``threshold`` times in a row is skipped for
+# ``cooldown`` seconds; after that a single request is let through as a
+# probe, which closes the breaker on success or opens it for another
+# cooldown on failure. Models are tried fastest first by the median of
+# their recent latencies, with models that have no successes yet after
+# them in preference order and models whose last call failed last.
+# Everything is per process.
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class _ModelStats:
+    def __init__(self, window):
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_until = None
+        self.probing = False
+        self.latencies = deque(maxlen=window)
+        self.last_error = None
+
+    def p50(self):
+        return median(self.latencies) if self.latencies else None
+
+
+class ModelHealth:
+    def __init__(self, threshold=3, cooldown=60.0, window=50, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.window = window
+        self.clock = clock
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, model_name):
+        stats = self._stats.get(model_name)
+        if stats is None:
+            stats = self._stats[model_name] = _ModelStats(self.window)
+        return stats
+
+    def _state(self, stats):
+        if stats.opened_until is None:
+            return CLOSED
+        if self.clock() < stats.opened_until:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self, model_name):
+        """Whether to send a request to this model now."""
+        with self._lock:
+            stats = self._get(model_name)
+            state = self._state(stats)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not stats.probing:
+                # Only one probe at a time after the cooldown
+                stats.probing = True
+                return True
+            return False
+
+    def order(self, model_names):
+        """
+        Fastest recent p50 first, then models without latencies, then
+        models whose last call failed; ties keep the given order.
+        """
+        with self._lock:
+            keys = {}
+            for name in model_names:
+                stats = self._get(name)
+                p50 = stats.p50()
+                if stats.consecutive_failures:
+                    keys[name] = (2, stats.consecutive_failures)
+                elif p50 is None:
+                    keys[name] = (1, 0)
+                else:
+                    keys[name] = (0, p50)
+        return sorted(model_names, key=keys.get)
+
+    def record_success(self, model_name, seconds):
+        with self._lock:
+            stats = self._get(model_name)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.opened_until = None
+            stats.probing = False
+            stats.latencies.append(seconds)
+
+    def record_failure(self, model_name, error=None):
+        with self._lock:
+            stats = self._get(model_name)
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_error = str(error) if error else None
+            if stats.probing or stats.consecutive_failures >= self.threshold:
+                stats.opened_until = self.clock() + self.cooldown
+            stats.probing = False
+
+    def cancelled(self, model_name):
+        # A request abandoned mid-call says nothing about the model, but
+        # must not leave a probe slot taken
+        with self._lock:
+            self._get(model_name).probing = False
+
+    def snapshot(self):
+        """Per-model metrics, for the models endpoint and management commands."""
+        now = self.clock()
+        with self._lock:
+            return {
+                name: {
+                    'state': self._state(stats),
+                    'successes': stats.successes,
+                    'failures': stats.failures,
+                    'consecutive_failures': stats.consecutive_failures,
+                    'p50_ms': round(stats.p50() * 1000, 1) if stats.latencies else None,
+                    'samples': len(stats.latencies),
+                    'retry_in_s': round(max(stats.opened_until - now, 0), 1) if stats.opened_until else None,
+                    'last_error': stats.last_error,
+                }
+                for name, stats in sorted(self._stats.items())
+            }
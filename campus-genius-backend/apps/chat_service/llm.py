@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .gateway import (
+    FakeBackend, GeminiBackend, LLMGateway, GEMINI_MODELS, INTERACTIVE,
+    LLMError, LLMConfigurationError, LLMTransientError, LLMBusy, ModelNotFound,
+)
+from .health import ModelHealth
+from .response_cache import MemoryStore, MongoStore, ResponseCache
+from .utils import get_db
+
+logger = logging.getLogger(__name__)
+
+# Process-wide LLM gateway and chat client.
+#
+# Every AI feature calls the provider through get_gateway(), which holds
+# the configured backend and bounds concurrency, queueing, timeouts and
+# retries (apps.chat_service.gateway). The backend is configured once per
+# process and its model handles are reused, instead of genai.configure()
+# and a new GenerativeModel on every request.
+#
+# The chat client picks the model. Calls are async, so a slow completion
+# waits on the event loop rather than holding a worker thread. Which
+# models the API key can use is kept in an availability table refreshed
+# from list_models() at most once per CHAT_LLM_AVAILABILITY_TTL; preferred
+# models come first, any other discovered model after them, and a model
+# that answers "not found" is dropped from the table until the next
+# refresh.
+#
+# Failing models are skipped for a cooldown and the rest tried fastest
+# first; see apps.chat_service.health.
+#
+# CHAT_LLM_BACKEND = 'fake' swaps Gemini for FakeBackend, a deterministic
+# local model for development, load checks and tests.
+
+PREFERRED_MODELS = GEMINI_MODELS
+
+
+class ChatClient:
+    def __init__(self, gateway, preferred=PREFERRED_MODELS, timeout=30.0, availability_ttl=3600.0,
+                 health=None):
+        self.gateway = gateway
+        self.backend = gateway.backend
+        self.health = health or ModelHealth()
+        self.preferred = tuple(preferred)
+        self.timeout = timeout
+        self.availability_ttl = availability_ttl
+        self._available = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    async def reply(self, prompt):
+        last_error = None
+        for model_name in await self.candidates():
+            if not self.health.allow(model_name):
+                continue
+            started = time.monotonic()
+            try:
+                text = await self.gateway.generate(model_name, prompt, INTERACTIVE, self.timeout)
+            except (asyncio.CancelledError, LLMBusy):
+                # Says nothing about the model; the gateway is full
+                self.health.cancelled(model_name)
+                raise
+            except ModelNotFound as e:
+                self.health.cancelled(model_name)
+                self._forget(model_name)
+                last_error = e
+            except Exception as e:
+                logger.warning("Chat model %s failed: %s", model_name, e)
+                self.health.record_failure(model_name, e)
+                last_error = e
+            else:
+                self.health.record_success(model_name, time.monotonic() - started)
+                return text
+        raise self._exhausted(last_error)
+
+    def _exhausted(self, last_error):
+        if isinstance(last_error, LLMTransientError):
+            # Still a 503 for the caller
+            return last_error
+        return LLMError(str(last_error) if last_error else 'All chat models are cooling down')
+
+    async def stream(self, prompt):
+        """
+        Like reply(), but yields the text as the model produces it. A model
+        that fails before its first chunk is skipped as in reply(); once
+        text has gone out, a failure ends the stream with LLMError. The
+        timeout applies to the wait for each chunk.
+        """
+        last_error = None
+        for model_name in await self.candidates():
+            if not self.health.allow(model_name):
+                continue
+            started = time.monotonic()
+            chunks = self.gateway.stream(model_name, prompt, INTERACTIVE, self.timeout)
+            sent = False
+            try:
+                async for chunk in chunks:
+                    sent = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit, LLMBusy):
+                self.health.cancelled(model_name)
+                raise
+            except ModelNotFound as e:
+                self.health.cancelled(model_name)
+                self._forget(model_name)
+                last_error = e
+            except Exception as e:
+                logger.warning("Chat model %s failed while streaming: %s", model_name, e)
+                self.health.record_failure(model_name, e)
+                if sent:
+                    raise LLMError(f"The reply was interrupted: {e}") from e
+                last_error = e
+            else:
+                self.health.record_success(model_name, time.monotonic() - started)
+                return
+            finally:
+                await chunks.aclose()
+        raise self._exhausted(last_error)
+
+    async def candidates(self):
+        available = await self.availability()
+        if available is None:
+            # Discovery failed; the preferred list is the best guess
+            names = list(self.preferred)
+        else:
+            names = [name for name in self.preferred if name in available] + sorted(
+                name for name in available if name not in self.preferred
+            )
+        return self.health.order(names)
+
+    def _stale(self):
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.availability_ttl
+
+    async def availability(self):
+        if self._stale():
+            await sync_to_async(self._refresh, thread_sensitive=False)()
+        return self._available
+
+    def _refresh(self):
+        with self._lock:
+            # Another request may have refreshed while this one waited
+            if not self._stale():
+                return
+            try:
+                self._available = {name.removeprefix('models/') for name in self.backend.list_models()}
+            except Exception as e:
+                logger.warning("Listing chat models failed: %s", e)
+                self._available = None
+            self._refreshed_at = time.monotonic()
+
+    def _forget(self, model_name):
+        with self._lock:
+            if self._available is not None:
+                self._available.discard(model_name)
+
+
+_gateway = None
+_client = None
+_response_cache = None
+_client_lock = threading.RLock()  # the builders call each other
+
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        with _client_lock:
+            if _gateway is None:
+                _gateway = _build_gateway()
+    return _gateway
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        with _client_lock:
+            if _response_cache is None:
+                _response_cache = _build_response_cache()
+    return _response_cache
+
+
+def reset_client():
+    """Drop the process-wide gateway and client, e.g. after changing the backend settings."""
+    global _gateway, _client, _response_cache
+    with _client_lock:
+        _gateway = None
+        _client = None
+        _response_cache = None
+
+
+def _build_gateway():
+    backend_name = getattr(settings, 'CHAT_LLM_BACKEND', 'gemini')
+    if backend_name == 'fake':
+        backend = FakeBackend(delay=getattr(settings, 'CHAT_LLM_FAKE_DELAY', 0.0))
+    elif backend_name == 'gemini':
+        api_key = getattr(settings, 'GEMINI_API_KEY', os.getenv('GEMINI_API_KEY'))
+        if not api_key:
+            raise LLMConfigurationError('AI configuration missing')
+        backend = GeminiBackend(api_key)
+    else:
+        raise LLMConfigurationError(f"Unknown CHAT_LLM_BACKEND {backend_name!r}")
+    return LLMGateway(
+        backend,
+        concurrency=getattr(settings, 'LLM_GATEWAY_CONCURRENCY', 8),
+        bulk_concurrency=getattr(settings, 'LLM_GATEWAY_BULK_CONCURRENCY', 2),
+        queue_timeout=getattr(settings, 'LLM_GATEWAY_QUEUE_TIMEOUT', 10.0),
+        timeout=getattr(settings, 'LLM_GATEWAY_TIMEOUT', 120.0),
+        retries=getattr(settings, 'LLM_GATEWAY_RETRIES', 2),
+        backoff=getattr(settings, 'LLM_GATEWAY_BACKOFF', 0.5),
+    )
+
+
+def _build_client():
+    return ChatClient(
+        get_gateway(),
+        timeout=getattr(settings, 'CHAT_LLM_TIMEOUT', 30.0),
+        availability_ttl=getattr(settings, 'CHAT_LLM_AVAILABILITY_TTL', 3600.0),
+        health=ModelHealth(
+            threshold=getattr(settings, 'CHAT_LLM_BREAKER_THRESHOLD', 3),
+            cooldown=getattr(settings, 'CHAT_LLM_BREAKER_COOLDOWN', 60.0),
+        ),
+    )
+
+
+def _build_response_cache():
+    db = get_db()
+    store = MongoStore(db) if db is not None else MemoryStore()
+    try:
+        gateway = get_gateway()
+    except LLMConfigurationError:
+        gateway = None
+    return ResponseCache(
+        store,
+        ttl=getattr(settings, 'CHAT_CACHE_TTL', 86400),
+        max_entries=getattr(settings, 'CHAT_CACHE_MAX_ENTRIES', 500),
+        similarity=getattr(settings, 'CHAT_CACHE_SIMILARITY', 0.0),
+        embed=gateway.embed_sync if gateway else None,
+        embed_model=gateway.backend.embed_model if gateway else None,
+    )
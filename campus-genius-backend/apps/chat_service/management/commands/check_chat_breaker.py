@@ -0,0 +1,104 @@
+import asyncio
+from django.core.management.base import BaseCommand, CommandError
+from apps.chat_service.health import ModelHealth, CLOSED, OPEN
+from apps.chat_service.gateway import FakeBackend, LLMError, LLMGateway
+from apps.chat_service.llm import ChatClient
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the chat model chain against a stub provider and check that '
+        'failing models are skipped for the cooldown, probed afterwards, and '
+        'that candidates are ordered by recent latency'
+    )
+
+    def handle(self, *args, **options):
+        self.failures = []
+        asyncio.run(self._run())
+        if self.failures:
+            raise CommandError('\n'.join(self.failures))
+        self.stdout.write(self.style.SUCCESS('Chat model breaker behaves as expected'))
+
+    def expect(self, condition, message):
+        self.stdout.write(f"  {'ok  ' if condition else 'FAIL'} {message}")
+        if not condition:
+            self.failures.append(message)
+
+    async def _run(self):
+        clock = _Clock()
+        health = ModelHealth(threshold=3, cooldown=30.0, clock=clock)
+
+        self.stdout.write('Breaker on a failing model')
+        backend = FakeBackend(failing={'gemini-1.5-flash'}, models=['gemini-1.5-flash'])
+        client = ChatClient(LLMGateway(backend), health=health)
+        for _ in range(3):
+            await self._reply(client)
+        self.expect(health.snapshot()['gemini-1.5-flash']['state'] == OPEN, 'opens after 3 consecutive failures')
+
+        backend.calls.clear()
+        error = await self._reply(client)
+        self.expect(not backend.calls, 'no request is sent while the breaker is open')
+        self.expect(error is not None and 'cooling down' in error, 'a chain of open breakers fails fast')
+
+        clock.now += 31
+        await asyncio.gather(self._reply(client), self._reply(client))
+        self.expect(len(backend.calls) == 1, 'one probe is sent after the cooldown')
+        self.expect(health.snapshot()['gemini-1.5-flash']['state'] == OPEN, 'a failed probe reopens the breaker')
+
+        backend.failing.clear()
+        clock.now += 31
+        error = await self._reply(client)
+        self.expect(error is None, 'the recovered model answers the probe')
+        self.expect(health.snapshot()['gemini-1.5-flash']['state'] == CLOSED, 'a successful probe closes the breaker')
+
+        self.stdout.write('Fallback and latency ordering')
+        backend = FakeBackend(
+            failing={'gemini-1.5-flash'},
+            delays={'gemini-pro': 0.03, 'gemini-1.0-pro': 0.005, 'gemini-1.5-pro': 0.015},
+        )
+        health = ModelHealth(threshold=3, cooldown=30.0, clock=clock)
+        client = ChatClient(LLMGateway(backend), health=health)
+        # Until every model has a latency sample, untimed ones come in preference order
+        for _ in range(12):
+            await self._reply(client)
+        self.expect(health.snapshot()['gemini-1.5-flash']['failures'] == 1, 'the failing model is not retried first')
+        candidates = await client.candidates()
+        self.expect(
+            candidates == ['gemini-pro', 'gemini-1.0-pro', 'gemini-1.5-pro', 'gemini-1.5-flash'],
+            f'untimed models follow timed ones, failing ones come last: {candidates}',
+        )
+        for model_name in ('gemini-1.0-pro', 'gemini-1.5-pro'):
+            # Traffic that only this model can serve gives it a sample
+            single = FakeBackend(models=[model_name], delays=backend.delays)
+            await self._reply(ChatClient(LLMGateway(single), health=health))
+        candidates = await client.candidates()
+        self.expect(
+            candidates[:3] == ['gemini-1.0-pro', 'gemini-1.5-pro', 'gemini-pro'],
+            f'timed models are ordered by p50: {candidates}',
+        )
+        backend.calls.clear()
+        await self._reply(client)
+        self.expect(list(backend.calls) == ['gemini-1.0-pro'], 'the fastest model is asked first')
+
+        self.stdout.write('')
+        self.stdout.write(f"{'model':<18} {'state':<10} {'ok':>4} {'fail':>5} {'p50 ms':>8}")
+        for model_name, stats in client.health.snapshot().items():
+            p50 = '-' if stats['p50_ms'] is None else f"{stats['p50_ms']:.1f}"
+            self.stdout.write(
+                f"{model_name:<18} {stats['state']:<10} {stats['successes']:>4} {stats['failures']:>5} {p50:>8}"
+            )
+
+    async def _reply(self, client):
+        try:
+            await client.reply('hello')
+        except LLMError as e:
+            return str(e)
+        return None
@@ -0,0 +1,104 @@
+import asyncio
+import tempfile
+from unittest import mock
+from django.core.management.base import BaseCommand, CommandError
+from apps.chat_service.gateway import GeminiBackend
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive GeminiBackend against the installed google-generativeai SDK (no network) '
+        'and check every call it makes matches the real SDK signatures'
+    )
+
+    def handle(self, *args, **options):
+        import google.generativeai as genai
+        self.stdout.write(f"google-generativeai {genai.__version__}")
+        self.failures = []
+        self._check_signatures(genai)
+        self._check_transport(genai)
+        if self.failures:
+            raise CommandError('\n'.join(self.failures))
+        self.stdout.write(self.style.SUCCESS('GeminiBackend matches the installed SDK'))
+
+    def expect(self, condition, message):
+        self.stdout.write(f"  {'ok  ' if condition else 'FAIL'} {message}")
+        if not condition:
+            self.failures.append(message)
+
+    def attempt(self, message, call):
+        try:
+            result = call()
+        except Exception as e:
+            self.expect(False, f"{message} ({type(e).__name__}: {e})")
+            return None
+        self.expect(True, message)
+        return result
+
+    def _check_signatures(self, genai):
+        # An autospec of the module rejects any argument the real function would not accept
+        sdk = mock.create_autospec(genai)
+        backend = GeminiBackend.__new__(GeminiBackend)
+        backend._genai = sdk
+        backend._models = {}
+
+        model = sdk.GenerativeModel.return_value
+        model.generate_content.return_value.text = 'sync'
+        self.attempt('generate_sync binds to GenerativeModel.generate_content',
+                     lambda: backend.generate_sync('gemini-1.5-flash', ['hi'], timeout=5))
+
+        self.attempt('upload_file binds to genai.upload_file',
+                     lambda: backend.upload_file('/tmp/video.mp4', 'video/mp4'))
+
+        sdk.embed_content.return_value = {'embedding': [0.1, 0.2]}
+        self.attempt('embed binds to genai.embed_content', lambda: backend.embed('hello'))
+
+        sdk.list_models.return_value = []
+        self.attempt('list_models binds to genai.list_models', backend.list_models)
+
+        model.generate_content_async.return_value = mock.Mock(text='async')
+        self.attempt('generate binds to GenerativeModel.generate_content_async',
+                     lambda: asyncio.run(backend.generate('gemini-1.5-flash', ['hi'])))
+
+        async def chunks():
+            for text in ('a', 'b'):
+                yield mock.Mock(text=text)
+
+        async def drain():
+            return [chunk async for chunk in backend.stream('gemini-1.5-flash', ['hi'])]
+
+        model.generate_content_async.return_value = chunks()
+        self.attempt('stream binds to GenerativeModel.generate_content_async(stream=True)',
+                     lambda: asyncio.run(drain()))
+
+    def _check_transport(self, genai):
+        # The real SDK end to end, with only the gRPC/discovery transport replaced
+        from google.ai import generativelanguage as glm
+        from google.generativeai import client
+
+        calls = {}
+
+        def fake_generate(self, request=None, **kwargs):
+            calls['generate'] = kwargs
+            return glm.GenerateContentResponse(
+                candidates=[{'content': {'parts': [{'text': 'hello'}], 'role': 'model'}}]
+            )
+
+        def fake_create_file(self, path, **kwargs):
+            calls['upload'] = kwargs
+            return glm.File(name='files/abc', uri='https://example.invalid/files/abc', mime_type=kwargs['mime_type'])
+
+        with mock.patch.object(glm.GenerativeServiceClient, 'generate_content', fake_generate), \
+                mock.patch.object(client.FileServiceClient, 'create_file', fake_create_file), \
+                tempfile.NamedTemporaryFile(suffix='.mp4') as video:
+            backend = GeminiBackend(api_key='test')
+            text = self.attempt('generate_sync runs through the real SDK',
+                                lambda: backend.generate_sync('gemini-1.5-flash', ['hi'], timeout=7))
+            self.expect(text == 'hello', 'generate_sync returns the response text')
+            self.expect(calls.get('generate', {}).get('timeout') == 7,
+                        'generate_sync passes its timeout through request_options')
+
+            uploaded = self.attempt('upload_file runs through the real SDK',
+                                    lambda: backend.upload_file(video.name, 'video/mp4'))
+            self.expect(getattr(uploaded, 'name', None) == 'files/abc', 'upload_file returns the uploaded File')
+            self.expect(calls.get('upload', {}).get('mime_type') == 'video/mp4', 'upload_file passes the MIME type')
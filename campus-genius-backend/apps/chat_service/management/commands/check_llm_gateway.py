@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from django.core.management.base import BaseCommand, CommandError
+from apps.chat_service.gateway import (
+    FakeBackend, LLMGateway, LLMBusy, LLMTimeout, LLMTransientError, INTERACTIVE, BULK,
+)
+
+
+class _Probe(FakeBackend):
+    """FakeBackend that records how many calls run at once and in which order they start."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+        self.started = []
+        self._probe_lock = threading.Lock()
+
+    def _enter(self, label):
+        with self._probe_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.started.append(label)
+
+    def _leave(self):
+        with self._probe_lock:
+            self.active -= 1
+
+    async def generate(self, model_name, contents):
+        self._enter(contents)
+        try:
+            return await super().generate(model_name, contents)
+        finally:
+            self._leave()
+
+    def generate_sync(self, model_name, contents, timeout):
+        self._enter(contents)
+        try:
+            return super().generate_sync(model_name, contents, timeout)
+        finally:
+            self._leave()
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the LLM gateway against a stub provider and check its concurrency '
+        'limit, priority lanes, queue timeout, retries and call timeout'
+    )
+
+    def handle(self, *args, **options):
+        self.failures = []
+        asyncio.run(self._run())
+        if self.failures:
+            raise CommandError('\n'.join(self.failures))
+        self.stdout.write(self.style.SUCCESS('LLM gateway behaves as expected'))
+
+    def expect(self, condition, message):
+        self.stdout.write(f"  {'ok  ' if condition else 'FAIL'} {message}")
+        if not condition:
+            self.failures.append(message)
+
+    async def _run(self):
+        self.stdout.write('Concurrency limit')
+        backend = _Probe(delay=0.02)
+        gateway = LLMGateway(backend, concurrency=4, bulk_concurrency=2)
+        await asyncio.gather(*[gateway.generate('gemini-pro', f'q{i}') for i in range(20)])
+        self.expect(backend.peak == 4, f'at most 4 calls at once (peak {backend.peak})')
+
+        # Sync callers in threads share the same slots
+        backend = _Probe(delay=0.05)
+        gateway = LLMGateway(backend, concurrency=2, bulk_concurrency=2)
+        threads = [
+            threading.Thread(target=gateway.generate_sync, args=('gemini-pro', f'sync{i}'))
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        await asyncio.gather(*[gateway.generate('gemini-pro', f'async{i}') for i in range(3)])
+        await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+        self.expect(backend.peak == 2, f'threads and coroutines share the limit (peak {backend.peak})')
+
+        self.stdout.write('Priority lanes')
+        backend = _Probe(delays={'gemini-pro': 0.02, 'gemini-1.5-pro': 0.2})
+        gateway = LLMGateway(backend, concurrency=1, bulk_concurrency=1)
+        holder = asyncio.create_task(gateway.generate('gemini-1.5-pro', 'holder', BULK))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.create_task(gateway.generate('gemini-pro', f'bulk{i}', BULK)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        queued.append(asyncio.create_task(gateway.generate('gemini-pro', 'chat', INTERACTIVE)))
+        await asyncio.gather(holder, *queued)
+        self.expect(backend.started[1] == 'chat', f'chat overtakes queued bulk work: {backend.started}')
+
+        backend = _Probe(delays={'gemini-pro': 0.01, 'gemini-1.5-pro': 0.1})
+        gateway = LLMGateway(backend, concurrency=4, bulk_concurrency=1)
+        bulk = [asyncio.create_task(gateway.generate('gemini-1.5-pro', f'bulk{i}', BULK)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        await asyncio.gather(*[gateway.generate('gemini-pro', f'chat{i}') for i in range(3)])
+        lanes = gateway.lanes.snapshot()
+        self.expect(
+            lanes['bulk']['active'] == 1 and lanes['bulk']['waiting'] == 2,
+            f"bulk work is capped while chat runs beside it: {lanes['bulk']}",
+        )
+        await asyncio.gather(*bulk)
+
+        self.stdout.write('Queue timeout')
+        gateway = LLMGateway(FakeBackend(delay=0.2), concurrency=1, queue_timeout=0.05)
+        holder = asyncio.create_task(gateway.generate('gemini-pro', 'holder'))
+        await asyncio.sleep(0.01)
+        try:
+            await gateway.generate('gemini-pro', 'late')
+            busy = False
+        except LLMBusy:
+            busy = True
+        await holder
+        self.expect(busy and gateway.counters['busy'] == 1, 'a full gateway answers LLMBusy instead of queueing forever')
+        self.expect(gateway.lanes.snapshot()['interactive']['waiting'] == 0, 'the timed-out waiter leaves the queue')
+
+        self.stdout.write('Retries and timeouts')
+        backend = FakeBackend(transient={'gemini-pro': 2})
+        gateway = LLMGateway(backend, retries=2, backoff=0.01)
+        reply = await gateway.generate('gemini-pro', 'hello')
+        self.expect(reply is not None and gateway.counters['retries'] == 2, 'rate limits are retried with backoff')
+
+        backend = FakeBackend(transient={'gemini-pro': 3})
+        gateway = LLMGateway(backend, retries=2, backoff=0.01)
+        try:
+            await gateway.generate('gemini-pro', 'hello')
+            gave_up = False
+        except LLMTransientError:
+            gave_up = True
+        self.expect(gave_up and len(backend.calls) == 3, 'retries stop after the limit')
+
+        backend = FakeBackend(delay=0.2)
+        gateway = LLMGateway(backend, timeout=0.05, retries=2, backoff=0.01)
+        try:
+            await gateway.generate('gemini-pro', 'hello')
+            timed_out = False
+        except LLMTimeout:
+            timed_out = True
+        self.expect(
+            timed_out and gateway.counters['timeouts'] == 1 and gateway.counters['retries'] == 0,
+            'slow calls time out and are not retried',
+        )
+
+        backend = FakeBackend(transient={'gemini-pro': 1})
+        gateway = LLMGateway(backend, retries=2, backoff=0.01)
+        text = ''.join([chunk async for chunk in gateway.stream('gemini-pro', 'hello')])
+        self.expect(text.endswith('hello') and gateway.counters['retries'] == 1, 'streams retry before their first chunk')
+
+        self.stdout.write('')
+        self.stdout.write(str(gateway.snapshot()))
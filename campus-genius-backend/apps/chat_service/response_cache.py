@@ -0,0 +1,274 @@
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Shared cache of chat answers, so near-identical student questions cost
+# one LLM call.
+#
+# Questions are normalized (case, accents, punctuation, whitespace) and
+# looked up by exact match first. With an embedding function and a
+# similarity threshold, a miss falls back to the closest cached question
+# by cosine similarity. Both lookups only see entries with the same scope
+# (one per course, plus 'general') and the same context text. Entries
+# expire after ``ttl`` seconds, and each scope keeps at most
+# ``max_entries``, dropping the least recently used. Hit/miss counters
+# are kept per scope.
+#
+# This module does not import Django. ChatView and ai_service/main.py
+# (FastAPI) both use it, and both point MongoStore at the same collection
+# so they share entries and counters. MemoryStore is the per-process
+# fallback when Mongo is unreachable. Store errors are logged and count as
+# a miss, never as a failed chat request.
+
+GENERAL_SCOPE = 'general'
+HIT, SEMANTIC_HIT, MISS = 'hits', 'semantic_hits', 'misses'
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return _WHITESPACE.sub(' ', _PUNCTUATION.sub(' ', text)).strip()
+
+
+def course_scope(course_id):
+    return f'course:{course_id}' if course_id else GENERAL_SCOPE
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class Lookup:
+    """The result of ResponseCache.get(); pass it back to put() on a miss."""
+
+    def __init__(self, scope, question, context, reply=None, kind=MISS, embedding=None):
+        self.scope = scope
+        self.question = question
+        self.context = context
+        self.reply = reply
+        self.kind = kind
+        self.embedding = embedding
+
+    @property
+    def hit(self):
+        return self.reply is not None
+
+    @property
+    def key(self):
+        return f'{self.scope}:{self.context}:{_digest(self.question)}'
+
+
+class MemoryStore:
+    def __init__(self):
+        self._entries = defaultdict(OrderedDict)
+        self._counters = defaultdict(lambda: {HIT: 0, SEMANTIC_HIT: 0, MISS: 0})
+        self._lock = threading.Lock()
+
+    def get(self, scope, key, now):
+        with self._lock:
+            entries = self._entries[scope]
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= now:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return entry
+
+    def candidates(self, scope, context, embed_model, now, limit):
+        with self._lock:
+            return [
+                entry for entry in list(self._entries[scope].values())[-limit:]
+                if entry['context'] == context and entry['embed_model'] == embed_model
+                and entry['embedding'] is not None and entry['expires_at'] > now
+            ]
+
+    def touch(self, scope, key, now):
+        with self._lock:
+            if key in self._entries[scope]:
+                self._entries[scope].move_to_end(key)
+
+    def put(self, scope, key, entry, max_entries):
+        with self._lock:
+            entries = self._entries[scope]
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def count(self, scope, outcome):
+        with self._lock:
+            self._counters[scope][outcome] += 1
+
+    def counters(self):
+        with self._lock:
+            return {scope: dict(values) for scope, values in self._counters.items()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class MongoStore:
+    def __init__(self, db, collection='response_cache'):
+        self.entries = db[collection]
+        self.stats = db[f'{collection}_stats']
+        self._indexed = False
+
+    def _ensure_indexes(self):
+        if self._indexed:
+            return
+        # Mongo drops expired documents itself; reads also check expires_at
+        # since the TTL monitor only runs once a minute
+        self.entries.create_index('expires_at', expireAfterSeconds=0)
+        self.entries.create_index([('scope', 1), ('last_used_at', -1)])
+        self._indexed = True
+
+    def get(self, scope, key, now):
+        self._ensure_indexes()
+        return self.entries.find_one_and_update(
+            {'_id': key, 'expires_at': {'$gt': now}},
+            {'$set': {'last_used_at': now}},
+        )
+
+    def candidates(self, scope, context, embed_model, now, limit):
+        self._ensure_indexes()
+        return list(self.entries.find(
+            {'scope': scope, 'context': context, 'embed_model': embed_model,
+             'embedding': {'$ne': None}, 'expires_at': {'$gt': now}},
+        ).sort('last_used_at', -1).limit(limit))
+
+    def touch(self, scope, key, now):
+        self.entries.update_one({'_id': key}, {'$set': {'last_used_at': now}})
+
+    def put(self, scope, key, entry, max_entries):
+        self._ensure_indexes()
+        self.entries.replace_one({'_id': key}, {'_id': key, **entry}, upsert=True)
+        stale = [
+            doc['_id'] for doc in self.entries.find({'scope': scope}, {'_id': 1})
+            .sort('last_used_at', -1).skip(max_entries)
+        ]
+        if stale:
+            self.entries.delete_many({'_id': {'$in': stale}})
+
+    def count(self, scope, outcome):
+        self.stats.update_one({'_id': scope}, {'$inc': {outcome: 1}}, upsert=True)
+
+    def counters(self):
+        return {
+            doc['_id']: {outcome: doc.get(outcome, 0) for outcome in (HIT, SEMANTIC_HIT, MISS)}
+            for doc in self.stats.find()
+        }
+
+    def clear(self):
+        self.entries.delete_many({})
+        self.stats.delete_many({})
+
+
+class ResponseCache:
+    def __init__(self, store, ttl=86400, max_entries=500, similarity=0.0, embed=None, embed_model=None):
+        self.store = store
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Semantic lookups need both an embedding function and a threshold
+        self.similarity = similarity if embed else 0.0
+        self.embed = embed
+        self.embed_model = embed_model
+
+    def get(self, scope, question, context=''):
+        lookup = Lookup(scope, normalize(question), _digest(normalize(context)) if context else '')
+        if not lookup.question:
+            return lookup
+        try:
+            self._find(lookup)
+            self.store.count(scope, lookup.kind)
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+        return lookup
+
+    def _find(self, lookup):
+        now = _now()
+        entry = self.store.get(lookup.scope, lookup.key, now)
+        if entry is not None:
+            lookup.reply, lookup.kind = entry['reply'], HIT
+            return
+        if not self.similarity:
+            return
+        lookup.embedding = [float(value) for value in self.embed(lookup.question)]
+        candidates = self.store.candidates(
+            lookup.scope, lookup.context, self.embed_model, now, self.max_entries
+        )
+        if not candidates:
+            return
+        matrix = np.array([entry['embedding'] for entry in candidates], dtype=float)
+        vector = np.array(lookup.embedding, dtype=float)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+        scores = matrix @ vector / np.where(norms == 0, 1, norms)
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity:
+            entry = candidates[best]
+            self.store.touch(lookup.scope, entry['key'], now)
+            lookup.reply, lookup.kind = entry['reply'], SEMANTIC_HIT
+
+    def put(self, lookup, reply):
+        if lookup.hit or not lookup.question or not reply:
+            return
+        now = _now()
+        entry = {
+            'key': lookup.key,
+            'scope': lookup.scope,
+            'context': lookup.context,
+            'question': lookup.question,
+            'reply': reply,
+            'embedding': lookup.embedding,
+            'embed_model': self.embed_model if lookup.embedding is not None else None,
+            'created_at': now,
+            'last_used_at': now,
+            'expires_at': now + timedelta(seconds=self.ttl),
+        }
+        try:
+            self.store.put(lookup.scope, lookup.key, entry, self.max_entries)
+        except Exception as e:
+            logger.warning("Response cache store failed: %s", e)
+
+    def stats(self):
+        """Hit/miss counts and hit rate per scope and in total."""
+        try:
+            counters = self.store.counters()
+        except Exception as e:
+            logger.warning("Reading response cache stats failed: %s", e)
+            counters = {}
+        total = {HIT: 0, SEMANTIC_HIT: 0, MISS: 0}
+        for values in counters.values():
+            for outcome in total:
+                total[outcome] += values.get(outcome, 0)
+        return {
+            'store': type(self.store).__name__,
+            'total': _with_rate(total),
+            'scopes': {scope: _with_rate(values) for scope, values in sorted(counters.items())},
+        }
+
+
+def _with_rate(values):
+    lookups = values[HIT] + values[SEMANTIC_HIT] + values[MISS]
+    return {
+        **values,
+        'lookups': lookups,
+        'hit_rate': round((values[HIT] + values[SEMANTIC_HIT]) / lookups, 3) if lookups else None,
+    }
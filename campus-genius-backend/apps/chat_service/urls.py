@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import ChatView
+from .views import ChatView, ChatModelHealthView, ChatCacheStatsView
 
 urlpatterns = [
     path('', ChatView.as_view(), name='chat'),
+    path('models/', ChatModelHealthView.as_view(), name='chat-model-health'),
+    path('cache/', ChatCacheStatsView.as_view(), name='chat-cache-stats'),
 ]
@@ -1,145 +1,265 @@
-import google.generativeai as genai
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import permissions, status
-from django.conf import settings
+import json
+import logging
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, permissions, status
+from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+from apps.faculty.models import Course
+from .gateway import LLMError, LLMConfigurationError, LLMTransientError, RETRY_AFTER
+from .llm import get_client, get_gateway, get_response_cache
+from .response_cache import course_scope
 from .utils import get_db
-import os
 
-class ChatView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIView(View):
+    """
+    A plain Django async view with DRF authentication and parsing, for
+    endpoints that wait on slow I/O: under ASGI the wait happens on the
+    event loop instead of in a worker thread. Authentication and parsing
+    run in a thread since they may touch the database.
+    """
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like DRF, session auth enforces CSRF itself
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.drf_request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            self.user = await sync_to_async(self._authenticate)()
+        except exceptions.APIException as e:
+            response = self.error(e.detail, e.status_code, key='detail')
+            # Same 401 challenge as APIView; without one DRF answers 403
+            authenticators = self.drf_request.authenticators
+            challenge = authenticators[0].authenticate_header(request) if authenticators else None
+            if challenge and e.status_code == status.HTTP_401_UNAUTHORIZED:
+                response['WWW-Authenticate'] = challenge
+            elif isinstance(e, exceptions.NotAuthenticated):
+                response.status_code = status.HTTP_403_FORBIDDEN
+            return response
+        return await super().dispatch(request, *args, **kwargs)
+
+    def _authenticate(self):
+        user = self.drf_request.user
+        if not user or not user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        return user
+
+    async def data(self):
+        try:
+            return await sync_to_async(lambda: self.drf_request.data)()
+        except exceptions.ParseError:
+            return {}
+
+    def respond(self, data, status_code=status.HTTP_200_OK):
+        return JsonResponse(data, status=status_code, safe=False, encoder=JSONEncoder)
+
+    def error(self, message, status_code, key='error'):
+        return self.respond({key: message}, status_code)
+
+
+async def log_message(user, role, message):
+    """Append to the Mongo chat log, if Mongo is reachable."""
+    def insert():
+        db = get_db()
+        if db is None:
+            return
+        db.chat_logs.insert_one({
+            'user_id': user.id,
+            'email': user.email,
+            'role': role,
+            'message': message,
+            'timestamp': timezone.now()
+        })
+
+    try:
+        await sync_to_async(insert, thread_sensitive=False)()
+    except Exception as e:
+        logger.error("Storing chat log failed: %s", e)
+
+
+def in_course(user, course_id):
+    # Cached answers are shared per course, so only its members may use its scope
+    try:
+        courses = Course.objects.filter(pk=int(course_id))
+    except (TypeError, ValueError):
+        return False
+    return courses.filter(
+        Q(faculty=user) | Q(enrollments__student=user, enrollments__is_active=True)
+    ).exists()
+
+
+class AnswerStream:
+    """
+    The answer to one chat message, iterated as text chunks as the model
+    produces them (or as one chunk from the response cache). The question
+    is logged when iteration starts and the whole reply once it ends, so
+    an abandoned stream is neither logged nor cached. Raises LLMError if
+    no model answers.
+    """
+
+    def __init__(self, user, message, course_id=None):
+        self.user = user
+        self.message = message
+        self.scope = course_scope(course_id)
+        self.reply = ''
+        self.cached = False
+
+    async def __aiter__(self):
+        await log_message(self.user, 'user', self.message)
+        cache_lookup = await sync_to_async(
+            lambda: get_response_cache().get(self.scope, self.message), thread_sensitive=False
+        )()
+        if cache_lookup.hit:
+            self.reply, self.cached = cache_lookup.reply, True
+            yield self.reply
+        else:
+            parts = []
+            async for chunk in get_client().stream(self.message):
+                parts.append(chunk)
+                yield chunk
+            self.reply = ''.join(parts)
+            await sync_to_async(get_response_cache().put, thread_sensitive=False)(cache_lookup, self.reply)
+        await log_message(self.user, 'ai', self.reply)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
+
 
-    def post(self, request):
+class ChatView(AsyncAPIView):
+
+    async def post(self, request):
         """
         Handle chat interaction:
         1. Receive user message
         2. Store user message in MongoDB
-        3. Call Gemini AI
+        3. Answer from the response cache (apps.chat_service.response_cache),
+           scoped to the optional ``course``, or ask the chat model
+           (apps.chat_service.llm) and cache its answer
         4. Store AI response in MongoDB
         5. Return response
+
+        With ``stream`` set or ``Accept: text/event-stream`` the reply is
+        sent as Server-Sent Events while the model produces it.
         """
-        try:
-            message = request.data.get('message')
-            if not message:
-                return Response({'error': 'Message is required'}, status=status.HTTP_400_BAD_REQUEST)
+        data = await self.data()
+        message = data.get('message')
+        if not message:
+            return self.error('Message is required', status.HTTP_400_BAD_REQUEST)
+        course_id = data.get('course')
+        if course_id and not await sync_to_async(in_course)(self.user, course_id):
+            return self.error('Course not found', status.HTTP_400_BAD_REQUEST)
+        if str(data.get('stream', '')).lower() in ('1', 'true') or 'text/event-stream' in request.headers.get('Accept', ''):
+            return self.stream(AnswerStream(self.user, message, course_id))
 
-            user = request.user
-            db = get_db()
-            chat_logs = db.chat_logs
-
-            # 1. Store User Message
-            if db is not None:
-                chat_entry = {
-                    'user_id': user.id,
-                    'email': user.email,
-                    'role': 'user',
-                    'message': message,
-                    'timestamp': timezone.now()
-                }
-                chat_logs = db.chat_logs
-                chat_logs.insert_one(chat_entry)
-            else:
-                 print("DEBUG: MongoDB unavailable, skipping chat log storage.")
-
-            # 2. Call Gemini (with Fallback)
-            api_key = getattr(settings, 'GEMINI_API_KEY', os.getenv('GEMINI_API_KEY'))
-            if not api_key:
-                return Response({'error': 'AI configuration missing'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            genai.configure(api_key=api_key)
-            
-            # List of models to try in order of preference
-            models_to_try = [
-                'gemini-1.5-flash', 
-                'gemini-pro', 
-                'gemini-1.0-pro', 
-                'gemini-1.5-pro'
-            ]
-            ai_text = "I'm sorry, I am currently overloaded."
-            
-            success = False
-            last_error = None
-
-            # Attempt 1: Hardcoded models
-            for model_name in models_to_try:
-                try:
-                    print(f"DEBUG: Trying model {model_name}")
-                    model = genai.GenerativeModel(model_name)
-                    chat_session = model.start_chat(history=[])
-                    response = chat_session.send_message(message)
-                    ai_text = response.text
-                    success = True
-                    break # Success!
-                except Exception as e:
-                    print(f"DEBUG: Failed with {model_name}: {e}")
-                    last_error = e
-            
-            # Attempt 2: Dynamic Discovery if Hardcoded failed
-            if not success:
-                print("DEBUG: Hardcoded models failed. Attempting dynamic discovery...")
-                try:
-                    for m in genai.list_models():
-                        if 'generateContent' in m.supported_generation_methods:
-                            print(f"DEBUG: Discovered available model: {m.name}")
-                            model = genai.GenerativeModel(m.name)
-                            chat_session = model.start_chat(history=[])
-                            response = chat_session.send_message(message)
-                            ai_text = response.text
-                            success = True
-                            break
-                except Exception as e:
-                    print(f"DEBUG: Dynamic discovery failed: {e}")
-                    last_error = e
-
-            if not success:
-                 raise last_error or Exception("All models (including dynamic discovery) failed")
-
-            # 3. Store AI Response
-            if db is not None:
-                ai_entry = {
-                    'user_id': user.id,
-                    'email': user.email,
-                    'role': 'ai',
-                    'message': ai_text,
-                    'timestamp': timezone.now()
-                }
-                chat_logs.insert_one(ai_entry)
-
-            return Response({
-                'reply': ai_text,
-                'status': 'success'
-            })
+        await log_message(self.user, 'user', message)
 
-        except Exception as e:
-            print(f"DEBUG: ChatView Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        cache_lookup = await sync_to_async(
+            lambda: get_response_cache().get(course_scope(course_id), message), thread_sensitive=False
+        )()
+        if cache_lookup.hit:
+            ai_text = cache_lookup.reply
+        else:
+            try:
+                ai_text = await get_client().reply(message)
+            except LLMConfigurationError as e:
+                return self.error(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
+            except LLMTransientError as e:
+                response = self.error(str(e), status.HTTP_503_SERVICE_UNAVAILABLE)
+                response['Retry-After'] = str(RETRY_AFTER)
+                return response
+            except LLMError as e:
+                logger.error("ChatView: no model answered: %s", e)
+                return self.error(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
+            await sync_to_async(get_response_cache().put, thread_sensitive=False)(cache_lookup, ai_text)
 
-    def get(self, request):
+        await log_message(self.user, 'ai', ai_text)
+
+        return self.respond({
+            'reply': ai_text,
+            'cached': cache_lookup.hit,
+            'status': 'success'
+        })
+
+    def stream(self, answer):
+        # Server-Sent Events: 'token' per chunk, then 'done' or 'error'
+        async def events():
+            try:
+                async for chunk in answer:
+                    yield sse_event('token', {'text': chunk})
+            except LLMError as e:
+                logger.error("ChatView: no model answered: %s", e)
+                yield sse_event('error', {'error': str(e)})
+                return
+            yield sse_event('done', {'reply': answer.reply, 'cached': answer.cached, 'status': 'success'})
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def get(self, request):
         """
         Retrieve chat history for the user.
         """
-        try:
+        def history():
             db = get_db()
             if db is None:
-                return Response([])
-            
-            chat_logs = db.chat_logs
-            
-            # Fetch last 50 messages for this user, sorted by timestamp
-            cursor = chat_logs.find({'user_id': request.user.id}).sort('timestamp', 1).limit(50)
-            
-            history = []
-            for doc in cursor:
-                history.append({
-                    'role': doc['role'],
-                    'message': doc['message'],
-                    'timestamp': doc['timestamp']
-                })
-                
-            return Response(history)
-            
+                return []
+            # Last 50 messages for this user, sorted by timestamp
+            cursor = db.chat_logs.find({'user_id': self.user.id}).sort('timestamp', 1).limit(50)
+            return [
+                {'role': doc['role'], 'message': doc['message'], 'timestamp': doc['timestamp']}
+                for doc in cursor
+            ]
+
+        try:
+            return self.respond(await sync_to_async(history, thread_sensitive=False)())
         except Exception as e:
+            return self.error(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ChatModelHealthView(APIView):
+    """
+    Per-model breaker state, success/failure counts and p50 latency, plus
+    the LLM gateway's lanes and retry counters, for this process.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            client = get_client()
+        except LLMConfigurationError as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({
+            'backend': client.backend.name,
+            'models': client.health.snapshot(),
+            'gateway': get_gateway().snapshot(),
+        })
+
+
+class ChatCacheStatsView(APIView):
+    """Response cache hit rates, per course scope and in total, shared with ai_service."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_response_cache().stats())
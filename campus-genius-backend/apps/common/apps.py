@@ -0,0 +1,26 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from allauth.account.apps import AccountConfig as AllauthAccountConfig
+
+class CommonConfig(AppConfig):
+    default = True
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.common'
+    verbose_name = 'Common'
+
+    def ready(self):
+        # Keeps the per-user notification counters current
+        from . import signals  # noqa: F401
+
+
+class AccountConfig(AllauthAccountConfig):
+    """
+    allauth.account, accepting the async-capable AccountMiddleware from
+    apps.common.middleware in place of its own sync-only one.
+    """
+
+    def ready(self):
+        required_mw = 'apps.common.middleware.AccountMiddleware'
+        if required_mw not in settings.MIDDLEWARE:
+            raise ImproperlyConfigured(f"{required_mw} must be added to settings.MIDDLEWARE")
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from django.db import connection
+
+
+@contextmanager
+def scratch_database(verbosity=0, on_disk=False):
+    """
+    Run the block against a throwaway test database, the same way the test
+    runner does, so benchmarks can seed data without touching real tables.
+
+    SQLite test databases default to a shared in-memory database, whose
+    table locks fail concurrent writers at once instead of waiting; pass
+    ``on_disk=True`` to use a temporary file when several threads write.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    if on_disk and connection.vendor == 'sqlite' and not old_test_name:
+        test_settings['NAME'] = os.path.join(tempfile.gettempdir(), f'scratch-{os.getpid()}.sqlite3')
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = old_test_name
+
+
+def best_of(func, repeat=3):
+    """Return (best wall time in ms, last result) over ``repeat`` runs."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
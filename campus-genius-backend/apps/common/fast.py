@@ -0,0 +1,92 @@
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from .renderers import FastJSONRenderer
+
+# Fast read-only lists.
+#
+# For hot list endpoints, instantiating a DRF serializer per row and walking
+# its fields dominates the response time. A FastSerializer reads the same
+# data with values() and builds the dicts directly, reproducing the output
+# of the view's serializer_class exactly: same keys in the same order, same
+# value formats. Views opt in with FastListMixin and fast_serializer_class;
+# everything other than list() still goes through the serializer, and
+# FAST_SERIALIZATION = False turns the fast path off.
+#
+# benchmark_fast_serializers checks that both paths produce the same bytes.
+
+
+class FastSerializer:
+    """
+    Subclasses name the values() columns they read (including the
+    pagination ordering column and 'id') and turn a page of those rows into
+    the serializer's representation in to_representation().
+    """
+    columns = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+
+    def values(self, queryset):
+        # values() rows cannot be prefetched into
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def to_representation(self, rows):
+        raise NotImplementedError
+
+
+class FastListMixin:
+    fast_serializer_class = None
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.fast_serializer_class is None or not settings.FAST_SERIALIZATION:
+            return renderers
+        return [FastJSONRenderer() if type(r) is JSONRenderer else r for r in renderers]
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer_class is None or not settings.FAST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_serializer_class(context=self.get_serializer_context())
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(list(queryset)))
+
+
+def datetime_formatter():
+    """
+    DRF's DateTimeField output: ISO 8601 in the current time zone, with 'Z'
+    for UTC. Resolve the time zone once per page, not per value.
+    """
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def format_datetime(value):
+        if not value:
+            return None
+        if tz is not None:
+            value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return format_datetime
+
+
+def file_url(field, name, request):
+    """DRF's FileField output for a stored name read with values()."""
+    if not name:
+        return None
+    url = field.storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def optional(convert, value):
+    return None if value is None else convert(value)
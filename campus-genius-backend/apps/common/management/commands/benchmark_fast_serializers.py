@@ -0,0 +1,123 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.common.benchmarking import scratch_database, best_of
+from apps.common.models import Notification
+from apps.common.seed import seed_campus
+from apps.quiz.models import QuizAttempt, StudentAnswer
+
+NEXT_LINK = re.compile(r'<([^>]+)>; rel="next"')
+
+# (url, role) for every view with a fast_serializer_class
+ENDPOINTS = [
+    ('/api/quiz-attempts/', 'faculty'),
+    ('/api/quiz-attempts/', 'student'),
+    ('/api/common/notifications/', 'faculty'),
+    ('/api/common/notifications/', 'student'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a scratch database, check that the fast list path returns the same '
+        'bytes as the serializers on every page, and compare their throughput'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seeded = seed_campus(students=options['students'])
+            self._seed_edge_cases(seeded)
+            clients = {}
+            for role in ('faculty', 'student'):
+                clients[role] = APIClient(raise_request_exception=False)
+                clients[role].force_authenticate(seeded[role])
+
+            failures = []
+            for url, role in ENDPOINTS:
+                failures += self._compare(clients[role], url, role)
+            if failures:
+                raise CommandError(
+                    "Fast path output differs:\n  " + "\n  ".join(failures)
+                )
+            self.stdout.write(self.style.SUCCESS('Fast and serializer output match on every page'))
+
+            self.stdout.write(
+                f"\n{'endpoint':<40} {'rows':>5} {'serializer ms':>14} {'fast ms':>8} "
+                f"{'speedup':>8} {'fast rows/s':>12}"
+            )
+            for url, role in ENDPOINTS:
+                self._benchmark(clients[role], url, role, options)
+
+    def _pages(self, client, url):
+        pages = []
+        while url:
+            response = client.get(url)
+            pages.append(response)
+            match = NEXT_LINK.search(response.get('Link', ''))
+            url = match.group(1) if match else None
+        return pages
+
+    def _compare(self, client, url, role):
+        with override_settings(FAST_SERIALIZATION=False):
+            expected = self._pages(client, url)
+        with override_settings(FAST_SERIALIZATION=True):
+            actual = self._pages(client, url)
+
+        label = f"GET {url} as {role}"
+        if len(expected) != len(actual):
+            return [f"{label}: {len(actual)} pages, expected {len(expected)}"]
+        failures = []
+        for number, (want, got) in enumerate(zip(expected, actual), 1):
+            if want.status_code != got.status_code:
+                failures.append(f"{label} page {number}: status {got.status_code}, expected {want.status_code}")
+            elif want.get('Link') != got.get('Link'):
+                failures.append(f"{label} page {number}: Link header differs")
+            elif want.content != got.content:
+                offset = next(
+                    (i for i, (a, b) in enumerate(zip(want.content, got.content)) if a != b),
+                    min(len(want.content), len(got.content))
+                )
+                failures.append(
+                    f"{label} page {number}: body differs at byte {offset}: "
+                    f"{got.content[offset - 40:offset + 40]!r} != {want.content[offset - 40:offset + 40]!r}"
+                )
+        self.stdout.write(f"{'ok' if not failures else 'DIFF':>5}  {label} ({len(expected)} pages)")
+        return failures
+
+    def _benchmark(self, client, url, role, options):
+        page_url = f"{url}?page_size={options['page_size']}"
+        with override_settings(FAST_SERIALIZATION=False):
+            slow_ms, response = best_of(lambda: client.get(page_url), options['repeat'])
+        with override_settings(FAST_SERIALIZATION=True):
+            fast_ms, _ = best_of(lambda: client.get(page_url), options['repeat'])
+        rows = len(response.json())
+        self.stdout.write(
+            f"{'GET ' + url + ' as ' + role:<40} {rows:>5} {slow_ms:>14.2f} {fast_ms:>8.2f} "
+            f"{slow_ms / fast_ms:>7.1f}x {rows * 1000 / fast_ms:>12.0f}"
+        )
+
+    def _seed_edge_cases(self, seeded):
+        # Values the seed does not produce: nulls, a stored file, non-ASCII
+        # text and the line separators DRF escapes
+        student = seeded['student']
+        student.first_name = 'Zoë'
+        student.save(update_fields=['first_name'])
+        attempt = QuizAttempt.objects.create(
+            quiz=seeded['quizzes'][0], student=student, attempt_number=99
+        )
+        StudentAnswer.objects.create(
+            attempt=attempt, question=seeded['quizzes'][0].questions.first(),
+            text_answer='naïve \u2028 answer', file_answer='quiz_submissions/answer.py',
+            marks_obtained=0.1, feedback='1e-05 is not a score'
+        )
+        Notification.objects.create(
+            recipient=student, title='Ünïcode \u2029', message='line\u2028break',
+            notification_type='system', created_at=timezone.now()
+        )
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from apps.common.benchmarking import scratch_database, best_of
+from apps.common.prefetch import plan_queryset
+from apps.common.seed import seed_campus
+from apps.faculty.models import Course
+from apps.faculty.serializers import CourseSerializer, CourseSummarySerializer
+from apps.quiz.models import Quiz
+from apps.quiz.serializers import QuizSerializer, QuizSummarySerializer
+from apps.student.models import Enrollment, QuizSubmission, AssignmentSubmission
+from apps.student.serializers import (
+    EnrollmentSerializer, EnrollmentSummarySerializer,
+    QuizSubmissionSerializer, QuizSubmissionSummarySerializer,
+    AssignmentSubmissionSerializer, AssignmentSubmissionSummarySerializer
+)
+
+VARIANTS = [
+    ('courses', Course, CourseSerializer, CourseSummarySerializer),
+    ('quizzes', Quiz, QuizSerializer, QuizSummarySerializer),
+    ('enrollments', Enrollment, EnrollmentSerializer, EnrollmentSummarySerializer),
+    ('quiz submissions', QuizSubmission, QuizSubmissionSerializer, QuizSubmissionSummarySerializer),
+    ('assignment submissions', AssignmentSubmission, AssignmentSubmissionSerializer,
+     AssignmentSubmissionSummarySerializer),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a scratch database and compare the per-row serialization cost '
+        'and payload size of the full and ?view=summary serializers'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--questions', type=int, default=10)
+        parser.add_argument('--rows', type=int, default=500, help='Rows serialized per variant')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seed_campus(students=options['students'], questions=options['questions'])
+
+            self.stdout.write(
+                f"{'endpoint':<24} {'rows':>5} {'full us/row':>12} {'summary us/row':>15} "
+                f"{'speedup':>8} {'full B/row':>11} {'summary B/row':>14}"
+            )
+            for label, model, full, summary in VARIANTS:
+                full_us, full_bytes, count = self._measure(model, full, options)
+                summary_us, summary_bytes, _ = self._measure(model, summary, options)
+                if not count:
+                    self.stdout.write(f"{label:<24} {0:>5}  no rows seeded")
+                    continue
+                self.stdout.write(
+                    f"{label:<24} {count:>5} {full_us:>12.1f} {summary_us:>15.1f} "
+                    f"{full_us / summary_us:>7.1f}x {full_bytes:>11.0f} {summary_bytes:>14.0f}"
+                )
+
+    def _measure(self, model, serializer_class, options):
+        # Rows are loaded once, with the plan the view would use, so only
+        # to_representation() and rendering are timed
+        queryset = plan_queryset(model.objects.order_by('-id'), serializer_class)
+        rows = list(queryset[:options['rows']])
+        if not rows:
+            return 0, 0, 0
+        renderer = JSONRenderer()
+        ms, body = best_of(
+            lambda: renderer.render(serializer_class(rows, many=True).data),
+            options['repeat']
+        )
+        return ms * 1000 / len(rows), len(body) / len(rows), len(rows)
+
@@ -0,0 +1,126 @@
+import json
+from pathlib import Path
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.common.benchmarking import scratch_database
+from apps.common.seed import seed_campus
+from apps.faculty.urls import router as faculty_router
+from apps.quiz.urls import router as quiz_router
+from apps.student.urls import router as student_router
+
+BUDGETS_FILE = Path(__file__).resolve().parents[2] / 'query_budgets.json'
+
+# (mount point, router, roles that call it)
+ROUTERS = [
+    ('/api/faculty/', faculty_router, ['faculty']),
+    ('/api/student/', student_router, ['student']),
+    ('/api/', quiz_router, ['faculty', 'student']),
+]
+
+# Read-heavy views that are not on a router
+EXTRA_ENDPOINTS = [
+    ('/api/faculty/dashboard/', 'faculty'),
+    ('/api/student/dashboard/', 'student'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a scratch database, GET every router list/detail endpoint plus the '
+        'dashboards, and compare their query counts with query_budgets.json'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Write the measured counts to the budgets file instead of checking them'
+        )
+        parser.add_argument('--students', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seeded = seed_campus(students=options['students'])
+            clients = {}
+            for role in ('faculty', 'student'):
+                clients[role] = APIClient(raise_request_exception=False)
+                clients[role].force_authenticate(seeded[role])
+            measured = self._measure(clients)
+
+        # A server error is a broken endpoint, never a budget to record
+        errors = [f"{key}: status {result['status']}" for key, result in sorted(measured.items())
+                  if result['status'] >= 500]
+        if errors:
+            raise CommandError("Server errors:\n  " + "\n  ".join(errors))
+
+        if options['update']:
+            BUDGETS_FILE.write_text(json.dumps(measured, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(measured)} budgets to {BUDGETS_FILE}"))
+            return
+
+        budgets = json.loads(BUDGETS_FILE.read_text()) if BUDGETS_FILE.exists() else {}
+        failures = []
+        for key, result in sorted(measured.items()):
+            budget = budgets.get(key)
+            if budget is None:
+                status = 'NEW'
+                failures.append(f"{key}: no budget recorded")
+            elif result['status'] != budget['status']:
+                status = 'STATUS'
+                failures.append(f"{key}: status {result['status']}, expected {budget['status']}")
+            elif result['status'] >= 400:
+                # 4xx pages run their own queries; only the status is budgeted
+                status = 'error'
+            elif result['queries'] > budget['queries']:
+                status = 'OVER'
+                failures.append(f"{key}: {result['queries']} queries, budget {budget['queries']}")
+            else:
+                status = 'ok'
+            allowed = budget['queries'] if budget else '-'
+            self.stdout.write(f"{status:>6} {result['queries']:>5} / {allowed:<5} {key}")
+
+        if failures:
+            raise CommandError(
+                "Query budgets exceeded:\n  " + "\n  ".join(failures) +
+                "\nFix the regression, or rerun with --update if the change is intended."
+            )
+        self.stdout.write(self.style.SUCCESS(f"All {len(measured)} endpoints within budget"))
+
+    def _measure(self, clients):
+        measured = {}
+        for mount, router, roles in ROUTERS:
+            for prefix, viewset, basename in router.registry:
+                for role in roles:
+                    url = f"{mount}{prefix}/"
+                    response, queries = self._get(clients[role], url)
+                    measured[f"GET {url} as {role}"] = {'status': response.status_code, 'queries': queries}
+
+                    pk = self._first_pk(response)
+                    if pk is not None:
+                        response, queries = self._get(clients[role], f"{url}{pk}/")
+                        measured[f"GET {url}<pk>/ as {role}"] = {
+                            'status': response.status_code, 'queries': queries
+                        }
+        for url, role in EXTRA_ENDPOINTS:
+            response, queries = self._get(clients[role], url)
+            measured[f"GET {url} as {role}"] = {'status': response.status_code, 'queries': queries}
+        return measured
+
+    def _get(self, client, url):
+        # Start every request cold so cached reads do not hide their queries
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        return response, len(ctx.captured_queries)
+
+    def _first_pk(self, response):
+        if response.status_code != 200:
+            return None
+        data = getattr(response, 'data', None)
+        if isinstance(data, dict):
+            data = data.get('results')
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            return data[0].get('id')
+        return None
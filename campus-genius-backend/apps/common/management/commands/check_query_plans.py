@@ -0,0 +1,174 @@
+import json
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.common.benchmarking import scratch_database
+from apps.common.models import Notification
+from apps.common.seed import seed_campus
+from apps.faculty.models import Meeting, Assignment, CourseDashboardSnapshot
+from apps.quiz.models import QuizAttempt
+from apps.student.models import (
+    Enrollment, AssignmentSubmission, VideoProgress, StudyGroupMessage
+)
+
+SQLITE_STEP = re.compile(r'\b(SCAN|SEARCH) (\S+)(.*)')
+SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\S+)')
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\S+)')
+POSTGRES_INDEX_SCAN = re.compile(r'Index (?:Only )?Scan (?:Backward )?(?:using|on) (\S+) on (\S+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a scratch database and EXPLAIN the hot dashboard/feed queries, '
+        'failing if any of them does not read its main table through the index '
+        'it is meant to use'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            seeded = seed_campus(students=options['students'])
+            self._analyze()
+            failures = []
+            for label, queryset, expected in self._checks(seeded):
+                table = queryset.model._meta.db_table
+                index = self._index_name(table, expected)
+                ok, detail, used = self._uses_index(queryset, table)
+                if ok and index not in used:
+                    ok, verdict = False, 'WRONG'
+                    detail = f"expected {index}, got {detail}"
+                else:
+                    verdict = 'ok' if ok else 'SCAN'
+                self.stdout.write(f"{verdict:>5}  {label:<34} {detail}")
+                if not ok:
+                    failures.append(f"{label}: {detail}")
+
+        if failures:
+            raise CommandError(
+                f"{len(failures)} quer{'y' if len(failures) == 1 else 'ies'} do not use "
+                f"their expected index on {connection.vendor}:\n  " + "\n  ".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS(f"All query plans use their expected index on {connection.vendor}"))
+
+    def _checks(self, seeded):
+        # (label, queryset, expected index): a name, or the columns of an
+        # index Django named itself (unique_together)
+        student = seeded['student']
+        faculty = seeded['faculty']
+        course = seeded['courses'][0]
+        quiz = seeded['quizzes'][0]
+        now = timezone.now()
+        return [
+            ('notification unread count', Notification.objects.filter(
+                recipient=student, is_read=False), 'notification_unread_idx'),
+            ('notification feed', Notification.objects.filter(
+                recipient=student).order_by('-created_at', '-id')[:20], 'notification_feed_idx'),
+            ('student completed attempts', QuizAttempt.objects.filter(
+                student=student, completed_at__isnull=False), 'attempt_student_done_idx'),
+            ('quiz completed attempts', QuizAttempt.objects.filter(
+                quiz=quiz, completed_at__isnull=False), 'attempt_quiz_done_idx'),
+            ('attempt allocation', QuizAttempt.objects.filter(
+                quiz=quiz, student=student), ('quiz_id', 'student_id', 'attempt_number')),
+            ('recent submissions', AssignmentSubmission.objects.filter(
+                student=student).order_by('-submitted_at')[:5], 'submission_student_recent_idx'),
+            ('completed videos in course', VideoProgress.objects.filter(
+                student=student, video__course=course, is_completed=True), 'progress_student_done_idx'),
+            ('course completion rate', VideoProgress.objects.filter(
+                video__course=course), 'progress_video_done_idx'),
+            ('upcoming meetings', Meeting.objects.filter(
+                course__faculty=faculty, start_time__gt=now).order_by('start_time')[:5],
+                'meeting_course_start_idx'),
+            ('active assignments', Assignment.objects.filter(
+                course__in=[c.id for c in seeded['courses']], due_date__gt=now),
+                'assignment_course_due_idx'),
+            ('course enrollments', Enrollment.objects.filter(
+                course=course, is_active=True), 'enrollment_course_active_idx'),
+            ('student enrollments', Enrollment.objects.filter(
+                student=student, is_active=True), ('student_id', 'course_id')),
+            ('study group messages', StudyGroupMessage.objects.filter(
+                group__course=course).order_by('-created_at', '-id')[:50], 'group_message_feed_idx'),
+            ('dashboard snapshots', CourseDashboardSnapshot.objects.filter(
+                faculty=faculty), 'faculty_snapshot_idx'),
+        ]
+
+    def _index_name(self, table, expected):
+        if isinstance(expected, str):
+            return expected
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        for name, info in constraints.items():
+            if info['index'] or info['unique']:
+                if tuple(info['columns']) == tuple(expected):
+                    return name
+        raise CommandError(f"No index on {table}({', '.join(expected)})")
+
+    def _analyze(self):
+        # MySQL and PostgreSQL plan from statistics, which fresh tables lack.
+        # SQLite is left without them: its default plan uses any index that
+        # matches, which is what is being checked, while statistics from a
+        # seed this small would make it scan the smaller tables instead.
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                tables = ', '.join(connection.ops.quote_name(t) for t in connection.introspection.table_names())
+                cursor.execute(f'ANALYZE TABLE {tables}')
+                cursor.fetchall()
+            elif connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE')
+
+    def _uses_index(self, queryset, table):
+        """Return (uses some index, plan detail, names of the indexes used)."""
+        if connection.vendor == 'mysql':
+            return self._mysql_uses_index(json.loads(queryset.explain(format='JSON')), table)
+
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            if table in POSTGRES_SEQ_SCAN.findall(plan):
+                return False, f"Seq Scan on {table}", set()
+            used = {index for index, on_table in POSTGRES_INDEX_SCAN.findall(plan) if on_table == table}
+            if not used:
+                return False, f"no index scan on {table}", set()
+            return True, ', '.join(sorted(used)), used
+
+        # SQLite: every table access is a SCAN or SEARCH step
+        steps = []
+        used = set()
+        for line in plan.splitlines():
+            match = SQLITE_STEP.search(line)
+            if not match or match.group(2) != table:
+                continue
+            verb, _, rest = match.groups()
+            if verb == 'SCAN' and 'USING' not in rest:
+                return False, line.strip(), set()
+            steps.append(rest.strip())
+            used.update(SQLITE_INDEX.findall(rest))
+        if not steps:
+            return False, f"{table} not found in plan", set()
+        return True, '; '.join(steps), used
+
+    def _mysql_uses_index(self, plan, table):
+        accesses = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get('table_name') == table:
+                    accesses.append(node)
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(plan)
+        if not accesses:
+            return False, f"{table} not found in plan", set()
+        for access in accesses:
+            if access.get('access_type') == 'ALL' or not access.get('key'):
+                return False, f"{table}: access_type={access.get('access_type')}", set()
+        return (
+            True,
+            ', '.join(f"{a['access_type']} via {a['key']}" for a in accesses),
+            {a['key'] for a in accesses},
+        )
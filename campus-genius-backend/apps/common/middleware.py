@@ -0,0 +1,47 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from allauth.account import middleware as allauth_middleware
+from allauth.core import context
+from whitenoise import middleware as whitenoise_middleware
+
+# Async-capable versions of the sync-only middleware in settings.MIDDLEWARE.
+#
+# One sync-only middleware makes Django run the whole chain, async views
+# included, through sync_to_async on a single thread, so a view awaiting a
+# slow LLM call would block every other request behind it. These subclasses
+# keep the original behaviour and add an async path, the same way Django's
+# MiddlewareMixin does.
+
+
+class _AsyncCapable:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+
+class WhiteNoiseMiddleware(_AsyncCapable, whitenoise_middleware.WhiteNoiseMiddleware):
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class AccountMiddleware(_AsyncCapable, allauth_middleware.AccountMiddleware):
+    async def __acall__(self, request):
+        with context.request_context(request):
+            response = await self.get_response(request)
+            # May read and write the session
+            await sync_to_async(self._remove_dangling_login)(request, response)
+            return response
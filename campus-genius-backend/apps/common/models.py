@@ -10,12 +10,21 @@ class Notification(models.Model):
         ('system', 'System'),
     )
     
-    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    # Covered by both composite indexes below
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications', db_index=False)
     title = models.CharField(max_length=200)
     message = models.TextField()
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pages of a user's notifications
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notification_feed_idx'),
+            # Unread counts
+            models.Index(fields=['recipient', 'is_read'], name='notification_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.recipient.email} - {self.title}"
@@ -26,6 +35,11 @@ class Announcement(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='announcements')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='announcement_feed_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -0,0 +1,105 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from .models import Notification
+
+# Per-user notification counters.
+#
+# total, unread and one count per notification type are kept in the cache as
+# separate keys, so a new or read notification is an incr/decr rather than a
+# recount. When any of a user's keys is missing (cold cache, eviction, TTL)
+# they are all recounted with one conditional-aggregate query; the TTL also
+# bounds any drift from concurrent writers. Each change is pushed to the
+# user's NotificationConsumer group so clients do not need to poll.
+
+COUNTS_TIMEOUT = getattr(settings, 'NOTIFICATION_COUNTS_TIMEOUT', 300)
+TYPES = [value for value, _ in Notification.NOTIFICATION_TYPES]
+
+
+def _keys(user_id):
+    return {
+        'total': f'notifications:{user_id}:total',
+        'unread': f'notifications:{user_id}:unread',
+        **{name: f'notifications:{user_id}:type:{name}' for name in TYPES},
+    }
+
+
+def get_counts(user_id):
+    keys = _keys(user_id)
+    cached = cache.get_many(keys.values())
+    if len(cached) == len(keys):
+        values = {name: cached[key] for name, key in keys.items()}
+    else:
+        values = count_notifications(user_id)
+        cache.set_many({keys[name]: value for name, value in values.items()}, COUNTS_TIMEOUT)
+    return {
+        'total': values['total'],
+        'unread': values['unread'],
+        'by_type': {name: values[name] for name in TYPES if values[name]},
+    }
+
+
+def count_notifications(user_id):
+    return Notification.objects.filter(recipient_id=user_id).aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+        **{name: Count('id', filter=Q(notification_type=name)) for name in TYPES},
+    )
+
+
+def notification_created(notification):
+    _adjust(notification.recipient_id, {
+        'total': 1,
+        'unread': 0 if notification.is_read else 1,
+        notification.notification_type: 1,
+    })
+
+
+def mark_read(notification):
+    """Mark one notification read; only the request that flips it counts it."""
+    updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True)
+    notification.is_read = True
+    if updated:
+        _adjust(notification.recipient_id, {'unread': -1})
+    return bool(updated)
+
+
+def invalidate_counts(user_ids):
+    # For deletes and bulk writes; the next read recounts
+    user_ids = set(user_ids)
+
+    def drop():
+        cache.delete_many([key for user_id in user_ids for key in _keys(user_id).values()])
+        for user_id in user_ids:
+            push_counts(user_id)
+
+    transaction.on_commit(drop)
+
+
+def _adjust(user_id, deltas):
+    def apply():
+        keys = _keys(user_id)
+        for name, delta in deltas.items():
+            if not delta or name not in keys:
+                continue
+            try:
+                cache.incr(keys[name], delta)
+            except ValueError:
+                # Not cached: get_counts() recounts the whole set
+                pass
+        push_counts(user_id)
+
+    transaction.on_commit(apply)
+
+
+def push_counts(user_id):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        f'notifications_{user_id}',
+        {'type': 'notification_counts', 'counts': get_counts(user_id)}
+    )
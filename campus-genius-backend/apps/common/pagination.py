@@ -0,0 +1,147 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Keyset pagination for the feed endpoints (notifications, announcements,
+# study group messages), which set it as their pagination_class.
+#
+# Rows are ordered by (field, id) and a page starts strictly after the row
+# the cursor points at, e.g. WHERE created_at < t OR (created_at = t AND
+# id < i), so every page is one index range scan whatever its depth. The
+# field defaults to created_at (newest first) when the model has it and to
+# id otherwise; views override it with ``pagination_ordering`` and the page
+# size with ``pagination_page_size`` / ``pagination_max_page_size``.
+#
+# The body is the page as a plain list; the neighbouring pages are in the
+# Link header (rel="next" / rel="prev"), so a client has to follow it to
+# read past the first page.
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not isinstance(queryset, QuerySet):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.field, self.descending = self._ordering(queryset.model, view)
+        self.page_size = self._page_size(request, view)
+
+        cursor = self._decode_cursor(queryset.model, request)
+        reverse = bool(cursor and cursor['r'])
+        if cursor:
+            queryset = queryset.filter(self._after(cursor['v'], cursor['id'], reverse))
+
+        # Walking backwards is the same query with the ordering flipped
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        rows = list(queryset.order_by(f'{prefix}{self.field}', f'{prefix}id')[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_cursor = None
+        self.previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                self.next_cursor = self._position(rows[-1], reverse=False)
+            if cursor and (has_more or not reverse):
+                self.previous_cursor = self._position(rows[0], reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        links = []
+        if self.next_cursor:
+            links.append(f'<{self._link(self.next_cursor)}>; rel="next"')
+        if self.previous_cursor:
+            links.append(f'<{self._link(self.previous_cursor)}>; rel="prev"')
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor from the Link header of the previous response',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results per page',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def _ordering(self, model, view):
+        ordering = getattr(view, 'pagination_ordering', None)
+        if ordering is None:
+            try:
+                model._meta.get_field('created_at')
+                ordering = '-created_at'
+            except FieldDoesNotExist:
+                ordering = '-id'
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def _page_size(self, request, view):
+        default = getattr(view, 'pagination_page_size', self.page_size)
+        maximum = getattr(view, 'pagination_max_page_size', self.max_page_size)
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        return min(requested, maximum) if requested > 0 else default
+
+    def _after(self, value, pk, reverse):
+        # Strictly past (value, pk) in the direction being walked
+        op = 'lt' if self.descending != reverse else 'gt'
+        if self.field == 'id':
+            return Q(**{f'id__{op}': pk})
+        return Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'id__{op}': pk})
+
+    def _position(self, row, reverse):
+        # Rows are model instances, or dicts from a values() queryset
+        if isinstance(row, dict):
+            value, pk = row[self.field], row['id']
+        else:
+            value, pk = getattr(row, self.field), row.pk
+        return {
+            'v': value.isoformat() if hasattr(value, 'isoformat') else value,
+            'id': pk,
+            'r': reverse,
+        }
+
+    def _link(self, position):
+        token = urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def _decode_cursor(self, model, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(token.encode()))
+            position['id'] = int(position['id'])
+            position['r'] = bool(position['r'])
+            position['v'] = model._meta.get_field(self.field).to_python(position['v'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position
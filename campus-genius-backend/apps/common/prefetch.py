@@ -0,0 +1,152 @@
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+# Query planning from serializers.
+#
+# plan_queryset() walks a serializer's fields and works out which relations
+# to_representation() will touch: nested serializers, dotted source= paths
+# such as 'course.title', related fields that render more than the pk, and
+# many-to-many pk lists. Forward foreign keys and one-to-ones are followed
+# with select_related, everything reached through a to-many relation with
+# prefetch_related. Values that cannot be inferred (a SerializerMethodField
+# counting rows, say) can be declared on the serializer as
+#
+#     class Meta:
+#         annotations = {'members_count': Count('members')}
+#
+# and are added with annotate(), or with a Prefetch queryset for nested
+# many=True serializers. Plans are cached per serializer class and model.
+
+
+class PrefetchPlannerMixin:
+    """
+    Apply the serializer's query plan to the view's queryset. Hooks
+    filter_queryset() rather than get_queryset(), which views override, so
+    it covers list() and get_object() whatever get_queryset() returns.
+
+    Only the actions in prefetch_plan_actions are planned: writes and
+    custom actions that fetch an object to act on it would otherwise load
+    relations they never render. Views without actions (generic views) are
+    planned for GET and HEAD.
+    """
+    prefetch_plan_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        action = getattr(self, 'action', None)
+        if action is None:
+            planned = self.request.method in ('GET', 'HEAD')
+        else:
+            planned = action in self.prefetch_plan_actions
+        if not planned:
+            return queryset
+        return plan_queryset(queryset, self.get_serializer_class())
+
+
+def plan_queryset(queryset, serializer_class):
+    select, prefetch, annotations = _plan(serializer_class, queryset.model)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset
+
+
+@lru_cache(maxsize=None)
+def _plan(serializer_class, model):
+    planner = _Planner()
+    try:
+        planner.walk(serializer_class(), model, prefix='', to_many=False)
+    except ImproperlyConfigured:
+        # Left for the serializer to report when it is used; actions that
+        # only call get_object() keep working meanwhile
+        return (), (), {}
+    return (
+        tuple(sorted(planner.select)),
+        tuple(planner.prefetch_lookups()),
+        dict(getattr(getattr(serializer_class, 'Meta', None), 'annotations', {})),
+    )
+
+
+class _Planner:
+    def __init__(self):
+        self.select = set()
+        self.prefetch = {}
+
+    def prefetch_lookups(self):
+        # Shorter paths first so a Prefetch queryset precedes the lookups under it
+        return [
+            self.prefetch[path] for path in sorted(self.prefetch, key=lambda p: (p.count('__'), p))
+        ]
+
+    def walk(self, serializer, model, prefix, to_many):
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                if isinstance(field, serializers.BaseSerializer):
+                    self.walk(field, model, prefix, to_many)
+                continue
+            self.field(field, model, prefix, to_many)
+
+    def field(self, field, model, prefix, to_many):
+        path, model, to_many, complete = self.follow(field.source_attrs, model, prefix, to_many)
+        if not complete or model is None:
+            return
+
+        if isinstance(field, serializers.ListSerializer):
+            self.add(path, to_many=True, child=field.child, model=model)
+            self.walk(field.child, model, path, to_many=True)
+        elif isinstance(field, serializers.BaseSerializer):
+            self.add(path, to_many)
+            self.walk(field, model, path, to_many)
+        elif isinstance(field, serializers.ManyRelatedField):
+            self.add(path, to_many=True)
+        elif isinstance(field, serializers.RelatedField):
+            # A bare pk is read from the *_id column without a query
+            if not field.use_pk_only_optimization():
+                self.add(path, to_many)
+
+    def follow(self, attrs, model, prefix, to_many):
+        """
+        Walk source attrs across relations. Returns the lookup path of the
+        last relation, its model, whether it is reached through a to-many
+        relation, and whether every attr up to it was a relation.
+        """
+        path = prefix
+        for attr in attrs:
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method: whatever it reads cannot be inferred,
+                # but the relations leading to it are still worth loading
+                if path != prefix:
+                    self.add(path, to_many)
+                return path, model, to_many, False
+            if not model_field.is_relation:
+                if path != prefix:
+                    self.add(path, to_many)
+                return path, model, to_many, False
+
+            if path != prefix:
+                self.add(path, to_many)
+            path = f'{path}__{attr}' if path else attr
+            to_many = to_many or model_field.many_to_many or model_field.one_to_many
+            model = model_field.related_model
+        return path, model, to_many, True
+
+    def add(self, path, to_many, child=None, model=None):
+        if not path:
+            return
+        if not to_many:
+            self.select.add(path)
+            return
+        annotations = getattr(getattr(type(child), 'Meta', None), 'annotations', None) if child else None
+        if annotations and model is not None:
+            self.prefetch[path] = Prefetch(path, queryset=model._default_manager.annotate(**annotations))
+        else:
+            self.prefetch.setdefault(path, path)
@@ -0,0 +1,217 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.faculty.dashboard import rebuild_snapshots
+from apps.faculty.models import (
+    Course, Meeting, Note, VideoLecture, Assignment, Resource, Lecture,
+    AITool, AIToolUsage, FacultyProfile
+)
+from apps.student.progress import reconcile_counters
+from apps.quiz.models import Quiz, Question, Choice, QuizAttempt, StudentAnswer
+from apps.student.models import (
+    Enrollment, AssignmentSubmission, QuizSubmission, Answer,
+    MeetingAttendance, NoteView, VideoProgress, StudyGroup,
+    StudyGroupMessage, LearningPath, Doubt
+)
+from .models import Notification, Announcement
+from .notification_counts import invalidate_counts
+
+User = get_user_model()
+
+# A realistic data set for benchmarks and query budgets: a few courses with
+# hundreds of enrolled students, quizzes with graded attempts, videos with
+# progress, assignments with submissions, and so on. Everything is written
+# with bulk_create, so model signals do not fire while seeding.
+
+
+def seed_campus(students=200, courses=3, questions=10, videos=5, meetings=5,
+                assignments=3, messages=50):
+    now = timezone.now()
+    faculty = User.objects.create_user(
+        username='seed-faculty', email='seed-faculty@example.com',
+        password=None, role='faculty', first_name='Seed', last_name='Faculty'
+    )
+    FacultyProfile.objects.create(user=faculty, department='CS')
+
+    student_users = User.objects.bulk_create([
+        User(
+            username=f'seed-student-{i}', email=f'seed-student-{i}@example.com',
+            role='student', first_name='Student', last_name=str(i)
+        )
+        for i in range(students)
+    ])
+    student = student_users[0]
+
+    course_rows = Course.objects.bulk_create([
+        Course(
+            title=f'Course {c}', code=f'SEED{c}', description='',
+            faculty=faculty, is_published=True
+        )
+        for c in range(courses)
+    ])
+
+    Enrollment.objects.bulk_create([
+        Enrollment(student=s, course=course, progress=(s.id % 100))
+        for course in course_rows for s in student_users
+    ])
+
+    video_rows = VideoLecture.objects.bulk_create([
+        VideoLecture(
+            title=f'Video {v}', course=course, video_file='videos/seed.mp4',
+            description='', duration=600, created_by=faculty
+        )
+        for course in course_rows for v in range(videos)
+    ])
+    VideoProgress.objects.bulk_create([
+        VideoProgress(
+            student=s, video=video, last_position=300, watch_time=300,
+            is_completed=(s.id + video.id) % 2 == 0
+        )
+        for video in video_rows for s in student_users
+    ])
+
+    meeting_rows = Meeting.objects.bulk_create([
+        Meeting(
+            title=f'Meeting {m}', course=course,
+            start_time=now + timedelta(days=m - 2), end_time=now + timedelta(days=m - 2, hours=1),
+            meeting_link='https://example.com/meet', meeting_type='lecture', created_by=faculty
+        )
+        for course in course_rows for m in range(meetings)
+    ])
+    MeetingAttendance.objects.bulk_create([
+        MeetingAttendance(student=s, meeting=meeting, is_present=(s.id + meeting.id) % 3 != 0)
+        for meeting in meeting_rows for s in student_users
+    ])
+
+    assignment_rows = Assignment.objects.bulk_create([
+        Assignment(
+            course=course, title=f'Assignment {a}', description='',
+            due_date=now + timedelta(days=a - 1), total_marks=10, submission_type='text'
+        )
+        for course in course_rows for a in range(assignments)
+    ])
+    AssignmentSubmission.objects.bulk_create([
+        AssignmentSubmission(
+            student=s, assignment=assignment, submission_text='answer',
+            score=s.id % 11, status='graded'
+        )
+        for assignment in assignment_rows for s in student_users
+    ])
+
+    quiz_rows = Quiz.objects.bulk_create([
+        Quiz(
+            title=f'Quiz {course.code}', course=course, description='', time_limit=30,
+            total_marks=questions, created_by=faculty, is_published=True, max_attempts=3
+        )
+        for course in course_rows
+    ])
+    question_rows = Question.objects.bulk_create([
+        Question(
+            quiz=quiz, question_text=f'Question {q}', question_type='mcq' if q % 4 else 'text',
+            marks=1, order=q
+        )
+        for quiz in quiz_rows for q in range(questions)
+    ])
+    Choice.objects.bulk_create([
+        Choice(question=question, choice_text=option, is_correct=(option == 'b'))
+        for question in question_rows for option in 'abcd'
+    ])
+
+    attempts = QuizAttempt.objects.bulk_create([
+        QuizAttempt(
+            quiz=quiz, student=s, completed_at=now, attempt_number=1,
+            score=(s.id % 10) * 10, is_passed=(s.id % 10) >= 6
+        )
+        for quiz in quiz_rows for s in student_users
+    ])
+    questions_by_quiz = {}
+    for question in question_rows:
+        questions_by_quiz.setdefault(question.quiz_id, []).append(question)
+    StudentAnswer.objects.bulk_create([
+        StudentAnswer(
+            attempt=attempt, question=question,
+            selected_option='abcd'[(attempt.student_id + question.id) % 4],
+            is_correct=(attempt.student_id + question.id) % 4 == 1,
+            marks_obtained=1 if (attempt.student_id + question.id) % 4 == 1 else 0
+        )
+        for attempt in attempts for question in questions_by_quiz[attempt.quiz_id]
+    ])
+
+    submissions = QuizSubmission.objects.bulk_create([
+        QuizSubmission(student=s, quiz=quiz, submitted_at=now, score=50, is_completed=True)
+        for quiz in quiz_rows for s in student_users[:20]
+    ])
+    Answer.objects.bulk_create([
+        Answer(submission=submission, question=question, answer_text='b', is_correct=True)
+        for submission in submissions for question in questions_by_quiz[submission.quiz_id]
+    ])
+
+    note_rows = Note.objects.bulk_create([
+        Note(
+            title=f'Note {n}', course=course, file='notes/seed.pdf',
+            description='', created_by=faculty if n % 2 else student
+        )
+        for course in course_rows for n in range(4)
+    ])
+    NoteView.objects.bulk_create([
+        NoteView(student=student, note=note) for note in note_rows
+    ])
+    Resource.objects.bulk_create([
+        Resource(course=course, title='Slides', description='', resource_type='link', url='https://example.com')
+        for course in course_rows
+    ])
+    Lecture.objects.bulk_create([
+        Lecture(course=course, title='Intro', description='', scheduled_at=now, duration=60)
+        for course in course_rows
+    ])
+    tool = AITool.objects.create(name='Reviewer', tool_type='code_review', description='')
+    AIToolUsage.objects.bulk_create([
+        AIToolUsage(tool=tool, user=faculty, course=course, input_data={}, output_data={})
+        for course in course_rows
+    ])
+
+    groups = StudyGroup.objects.bulk_create([
+        StudyGroup(name=f'Group {course.code}', course=course, created_by=student, description='')
+        for course in course_rows
+    ])
+    members = student_users[:10]
+    StudyGroup.members.through.objects.bulk_create([
+        StudyGroup.members.through(studygroup=group, user=s)
+        for group in groups for s in members
+    ])
+    StudyGroupMessage.objects.bulk_create([
+        StudyGroupMessage(group=group, sender=members[m % len(members)], message=f'Message {m}')
+        for group in groups for m in range(messages)
+    ])
+    LearningPath.objects.bulk_create([
+        LearningPath(student=student, course=course, current_topic='Basics')
+        for course in course_rows
+    ])
+    Doubt.objects.bulk_create([
+        Doubt(student=student, course=course, title='Question', description='')
+        for course in course_rows
+    ])
+
+    Notification.objects.bulk_create([
+        Notification(
+            recipient=recipient, title=f'Notice {n}', message='',
+            notification_type='announcement', is_read=n % 2 == 0
+        )
+        for recipient in (faculty, student) for n in range(messages)
+    ])
+    invalidate_counts([faculty.id, student.id])
+    Announcement.objects.bulk_create([
+        Announcement(title=f'Announcement {n}', content='', created_by=faculty)
+        for n in range(10)
+    ])
+
+    reconcile_counters()
+    rebuild_snapshots()
+
+    return {
+        'faculty': faculty,
+        'student': student,
+        'students': student_users,
+        'courses': course_rows,
+        'quizzes': quiz_rows,
+    }
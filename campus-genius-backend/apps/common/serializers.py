@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .fast import FastSerializer, datetime_formatter
 from .models import Notification, Announcement, Feedback, SystemLog
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -7,6 +8,26 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at',)
 
+class NotificationFastSerializer(FastSerializer):
+    """NotificationSerializer's list output, read with values()."""
+    columns = ('id', 'title', 'message', 'notification_type', 'is_read',
+               'created_at', 'recipient_id')
+
+    def to_representation(self, rows):
+        format_datetime = datetime_formatter()
+        return [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'message': row['message'],
+                'notification_type': row['notification_type'],
+                'is_read': row['is_read'],
+                'created_at': format_datetime(row['created_at']),
+                'recipient': row['recipient_id'],
+            }
+            for row in rows
+        ]
+
 class AnnouncementSerializer(serializers.ModelSerializer):
     created_by = serializers.StringRelatedField()
     
@@ -0,0 +1,28 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Per-row aggregates as correlated subqueries.
+#
+# Each value is computed by its own subquery grouped on the outer row, so
+# several of them can be annotated on one queryset without the joins
+# multiplying each other's rows.
+
+
+def per_row(queryset, outer_field, aggregate, output_field):
+    """Aggregate ``queryset`` over the rows whose ``outer_field`` is the outer row."""
+    return Subquery(
+        queryset.filter(**{outer_field: OuterRef('pk')})
+        .order_by()
+        .values(outer_field)
+        .annotate(value=aggregate)
+        .values('value')[:1],
+        output_field=output_field
+    )
+
+
+def count_per_row(queryset, outer_field):
+    """Number of rows in ``queryset`` pointing at the outer row, 0 when none do."""
+    return Coalesce(
+        per_row(queryset, outer_field, Count('pk'), IntegerField()),
+        Value(0)
+    )
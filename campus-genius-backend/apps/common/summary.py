@@ -0,0 +1,26 @@
+from rest_framework.exceptions import ParseError
+
+# ?view=summary|full on read endpoints.
+#
+# Views that set ``summary_serializer_class`` answer GET requests with that
+# flat, read-only serializer when asked for ?view=summary. 'full' is the
+# default and keeps ``serializer_class``, so existing clients see no change.
+# Writes always use the full serializer. Combined with PrefetchPlannerMixin
+# the queryset is planned for whichever serializer was picked, so a summary
+# list also skips the joins and prefetches only the full one needs.
+
+
+class SummaryViewMixin:
+    view_query_param = 'view'
+    summary_serializer_class = None
+    invalid_view_message = "view must be 'summary' or 'full'"
+
+    def get_serializer_class(self):
+        request = getattr(self, 'request', None)
+        if self.summary_serializer_class is not None and request is not None and request.method == 'GET':
+            view = request.query_params.get(self.view_query_param, 'full')
+            if view == 'summary':
+                return self.summary_serializer_class
+            if view != 'full':
+                raise ParseError(self.invalid_view_message)
+        return super().get_serializer_class()
@@ -1,17 +1,23 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Count
+from .fast import FastListMixin
+from .pagination import KeysetPagination
+from .notification_counts import get_counts, mark_read
 from .models import Notification, Announcement, Feedback, SystemLog
 from .serializers import (
     NotificationSerializer, AnnouncementSerializer,
     FeedbackSerializer, SystemLogSerializer,
-    NotificationCountSerializer
+    NotificationCountSerializer, NotificationFastSerializer
 )
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(FastListMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
+    fast_serializer_class = NotificationFastSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    pagination_page_size = 20
+    pagination_max_page_size = 100
     
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user).order_by('-created_at')
@@ -26,8 +32,7 @@ class NotificationMarkAsReadView(APIView):
         ).first()
         
         if notification:
-            notification.is_read = True
-            notification.save()
+            mark_read(notification)
             return Response({'message': 'Notification marked as read'})
         return Response(
             {'error': 'Notification not found'},
@@ -38,23 +43,15 @@ class NotificationCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        notifications = Notification.objects.filter(recipient=request.user)
-        total = notifications.count()
-        unread = notifications.filter(is_read=False).count()
-        by_type = notifications.values('notification_type').annotate(count=Count('id'))
-        
-        data = {
-            'total': total,
-            'unread': unread,
-            'by_type': {item['notification_type']: item['count'] for item in by_type}
-        }
-        
-        serializer = NotificationCountSerializer(data)
+        serializer = NotificationCountSerializer(get_counts(request.user.id))
         return Response(serializer.data)
 
 class AnnouncementListView(generics.ListCreateAPIView):
     serializer_class = AnnouncementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    pagination_page_size = 20
+    pagination_max_page_size = 100
     
     def get_queryset(self):
         return Announcement.objects.all().order_by('-created_at')
@@ -0,0 +1,63 @@
+from django.db.models import Avg, FloatField, IntegerField
+from django.db.models.functions import Cast
+from apps.common.subqueries import per_row, count_per_row
+from .models import Assignment
+from apps.quiz.models import Quiz, QuizAttempt
+from apps.student.models import (
+    Enrollment, MeetingAttendance, VideoProgress, AssignmentSubmission
+)
+
+# Course/assignment/quiz analytics where every metric is computed on its own.
+#
+# Putting Count('enrollments'), Avg('meetings__attendance__...') and
+# Avg('videos__progress__...') in one annotate() joins all three relations at
+# once, so each enrollment is repeated attendance x progress times: counts are
+# inflated and the cost grows with students x meetings x videos. Here course
+# metrics are one query each, and per-assignment/per-quiz figures are
+# correlated subqueries grouped on the outer row.
+
+
+def annotate_assignment_analytics(assignments):
+    submissions = AssignmentSubmission.objects.all()
+    return assignments.annotate(
+        submissions_count=count_per_row(submissions, 'assignment'),
+        avg_score=per_row(submissions, 'assignment', Avg('score'), FloatField()),
+    )
+
+
+def annotate_quiz_analytics(quizzes):
+    # Only completed attempts count as submissions
+    attempts = QuizAttempt.objects.filter(completed_at__isnull=False)
+    return quizzes.annotate(
+        submissions_count=count_per_row(attempts, 'quiz'),
+        avg_score=per_row(attempts, 'quiz', Avg('score'), FloatField()),
+    )
+
+
+def course_metrics(course):
+    """Course-level figures for a single course, one query per metric."""
+    return {
+        'total_students': Enrollment.objects.filter(course=course).count(),
+        'avg_attendance': MeetingAttendance.objects.filter(meeting__course=course).aggregate(
+            value=Avg(Cast('is_present', IntegerField()))
+        )['value'],
+        'completion_rate': VideoProgress.objects.filter(video__course=course).aggregate(
+            value=Avg(Cast('is_completed', IntegerField()))
+        )['value'],
+    }
+
+
+def assignment_stats(course):
+    return list(
+        annotate_assignment_analytics(Assignment.objects.filter(course=course))
+        .values('id', 'title', 'submissions_count', 'avg_score')
+        .order_by('id')
+    )
+
+
+def quiz_stats(course):
+    return list(
+        annotate_quiz_analytics(Quiz.objects.filter(course=course))
+        .values('id', 'title', 'submissions_count', 'avg_score')
+        .order_by('id')
+    )
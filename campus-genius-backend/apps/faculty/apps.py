@@ -1 +1,10 @@
- 
\ No newline at end of file
+from django.apps import AppConfig
+
+class FacultyConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.faculty'
+    verbose_name = 'Faculty'
+
+    def ready(self):
+        # Keeps CourseDashboardSnapshot rows current
+        from . import signals  # noqa: F401
@@ -0,0 +1,82 @@
+import threading
+from django.db import transaction
+from .models import Course, CourseDashboardSnapshot
+from .analytics import course_metrics, assignment_stats, quiz_stats
+
+# Faculty dashboard snapshots.
+#
+# Writes that change a course's figures only mark its snapshot stale: the
+# course ids touched in a transaction are collected and flagged with one
+# UPDATE after it commits, however many rows changed. Stale snapshots are
+# rebuilt off the write path, by the periodic refresh_dashboard_snapshots
+# task or by the dashboard view before it reads them.
+
+_pending = threading.local()
+
+
+def compute_course_snapshot(course_id):
+    return {
+        **course_metrics(course_id),
+        'assignment_stats': assignment_stats(course_id),
+        'quiz_stats': quiz_stats(course_id),
+    }
+
+
+def refresh_course_snapshot(course_id):
+    faculty_id = Course.objects.filter(id=course_id).values_list('faculty_id', flat=True).first()
+    if faculty_id is None:
+        # Course is gone; the snapshot went with it through the cascade
+        return None
+
+    # Clear the flag first so a change made while we compute marks it again
+    CourseDashboardSnapshot.objects.filter(course_id=course_id, is_stale=True).update(is_stale=False)
+    snapshot, _ = CourseDashboardSnapshot.objects.update_or_create(
+        course_id=course_id,
+        defaults={'faculty_id': faculty_id, **compute_course_snapshot(course_id)}
+    )
+    return snapshot
+
+
+def schedule_snapshot_refresh(course_id):
+    # Marks the snapshot stale after the surrounding transaction commits, or
+    # right away outside one
+    if course_id is None:
+        return
+    course_ids = getattr(_pending, 'course_ids', None)
+    if course_ids is None:
+        course_ids = _pending.course_ids = set()
+    course_ids.add(course_id)
+    # Every call registers a callback, so the ids survive a rolled back
+    # savepoint; the first callback to run flags them all, the rest find
+    # nothing left to do
+    transaction.on_commit(_mark_pending_stale)
+
+
+def _mark_pending_stale():
+    course_ids = getattr(_pending, 'course_ids', None)
+    if not course_ids:
+        return
+    _pending.course_ids = set()
+    CourseDashboardSnapshot.objects.filter(
+        course_id__in=course_ids, is_stale=False
+    ).update(is_stale=True)
+
+
+def refresh_stale_snapshots(faculty_id=None):
+    snapshots = CourseDashboardSnapshot.objects.filter(is_stale=True)
+    if faculty_id is not None:
+        snapshots = snapshots.filter(faculty_id=faculty_id)
+    return rebuild_snapshots(list(snapshots.values_list('course_id', flat=True)))
+
+
+def rebuild_snapshots(course_ids=None):
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+
+    rebuilt = 0
+    for course_id in courses.values_list('id', flat=True).iterator():
+        with transaction.atomic():
+            refresh_course_snapshot(course_id)
+        rebuilt += 1
+    return rebuilt
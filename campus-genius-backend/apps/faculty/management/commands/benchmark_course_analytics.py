@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count
+from django.utils import timezone
+from apps.common.benchmarking import scratch_database, best_of
+from apps.faculty.analytics import course_metrics
+from apps.faculty.models import Course, Meeting, VideoLecture
+from apps.student.models import Enrollment, MeetingAttendance, VideoProgress
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the old single-GROUP-BY course analytics with course_metrics, '
+        'which the dashboard snapshots and the course analytics endpoint use, '
+        'across course sizes on a scratch database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10, 20, 40, 80],
+            help='Students per course; meetings and videos scale as students / 4'
+        )
+        parser.add_argument(
+            '--legacy-limit', type=int, default=40,
+            help='Skip the old join above this many students (it grows cubically)'
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            faculty = User.objects.create_user(
+                username='bench-faculty', email='bench-faculty@example.com',
+                password=None, role='faculty'
+            )
+            self.stdout.write(
+                f"{'students':>8} {'meetings':>8} {'videos':>6} "
+                f"{'legacy ms':>10} {'legacy count':>12} {'metrics ms':>10} {'count':>6}"
+            )
+            for size in options['sizes']:
+                course = self._seed(faculty, size)
+                courses = Course.objects.filter(id=course.id)
+
+                new_ms, new_row = best_of(lambda: course_metrics(course), options['repeat'])
+
+                if size <= options['legacy_limit']:
+                    legacy_ms, legacy_row = best_of(
+                        lambda: courses.annotate(
+                            total_students=Count('enrollments'),
+                            avg_attendance=Avg('meetings__attendance__is_present'),
+                            completion_rate=Avg('videos__progress__is_completed')
+                        ).values('total_students').get(),
+                        options['repeat']
+                    )
+                    legacy = f"{legacy_ms:>10.2f} {legacy_row['total_students']:>12}"
+                else:
+                    legacy = f"{'skipped':>10} {'-':>12}"
+
+                meetings = max(size // 4, 1)
+                self.stdout.write(
+                    f"{size:>8} {meetings:>8} {meetings:>6} {legacy} "
+                    f"{new_ms:>10.2f} {new_row['total_students']:>6}"
+                )
+
+    def _seed(self, faculty, size):
+        now = timezone.now()
+        course = Course.objects.create(
+            title=f'Bench {size}', code=f'BENCH{size}', description='', faculty=faculty
+        )
+        students = User.objects.bulk_create([
+            User(username=f'bench-{size}-{i}', email=f'bench-{size}-{i}@example.com', role='student')
+            for i in range(size)
+        ])
+        Enrollment.objects.bulk_create([Enrollment(student=s, course=course) for s in students])
+
+        count = max(size // 4, 1)
+        meetings = Meeting.objects.bulk_create([
+            Meeting(
+                title=f'Meeting {i}', course=course, start_time=now, end_time=now,
+                meeting_link='https://example.com', meeting_type='lecture', created_by=faculty
+            )
+            for i in range(count)
+        ])
+        videos = VideoLecture.objects.bulk_create([
+            VideoLecture(
+                title=f'Video {i}', course=course, video_file='videos/bench.mp4',
+                description='', duration=60, created_by=faculty
+            )
+            for i in range(count)
+        ])
+        MeetingAttendance.objects.bulk_create([
+            MeetingAttendance(student=s, meeting=m, is_present=(s.id + m.id) % 3 != 0)
+            for s in students for m in meetings
+        ])
+        VideoProgress.objects.bulk_create([
+            VideoProgress(student=s, video=v, is_completed=(s.id + v.id) % 2 == 0)
+            for s in students for v in videos
+        ])
+        return course
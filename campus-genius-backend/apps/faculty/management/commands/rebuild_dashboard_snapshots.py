@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from apps.faculty.dashboard import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild faculty dashboard snapshots from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', type=int, action='append', dest='course_ids',
+            help='Only rebuild the given course id (may be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_snapshots(options['course_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} dashboard snapshot(s)'))
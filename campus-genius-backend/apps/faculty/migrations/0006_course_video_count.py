@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0005_coursedashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='video_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
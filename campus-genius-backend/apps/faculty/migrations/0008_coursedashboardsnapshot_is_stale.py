@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursedashboardsnapshot',
+            name='is_stale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
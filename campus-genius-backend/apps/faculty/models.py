@@ -32,6 +32,8 @@ class Course(models.Model):
     thumbnail = models.ImageField(upload_to='course_thumbnails/', null=True, blank=True)
     is_published = models.BooleanField(default=False)
     enrollment_key = models.CharField(max_length=20, null=True, blank=True)
+    # Maintained by apps.student.progress; repaired by reconcile_video_counters
+    video_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -44,7 +46,8 @@ class Course(models.Model):
 class Meeting(models.Model):
 
     title = models.CharField(max_length=200)
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='meetings')
+    # Covered by meeting_course_start_idx
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='meetings', db_index=False)
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     meeting_link = models.URLField()
@@ -62,6 +65,12 @@ class Meeting(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Upcoming meetings on both dashboards
+            models.Index(fields=['course', 'start_time'], name='meeting_course_start_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.course.code}"
 
@@ -110,7 +119,8 @@ class Lecture(models.Model):
         return f"{self.course.code} - {self.title}"
 
 class Assignment(models.Model):
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='assignments')
+    # Covered by assignment_course_due_idx
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='assignments', db_index=False)
     title = models.CharField(max_length=200)
     description = models.TextField()
     due_date = models.DateTimeField()
@@ -125,6 +135,12 @@ class Assignment(models.Model):
     rubric = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Active (not yet due) assignments per course
+            models.Index(fields=['course', 'due_date'], name='assignment_course_due_idx'),
+        ]
     
     def __str__(self):
         return f"{self.course.code} - {self.title}"
@@ -181,4 +197,24 @@ class AIToolUsage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.tool.name} - {self.user.email}" 
\ No newline at end of file
+        return f"{self.tool.name} - {self.user.email}" 
+class CourseDashboardSnapshot(models.Model):
+    """Precomputed per-course figures read by the faculty dashboard."""
+    # Covered by faculty_snapshot_idx
+    faculty = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='dashboard_snapshots', db_index=False)
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name='dashboard_snapshot')
+    total_students = models.IntegerField(default=0)
+    avg_attendance = models.FloatField(null=True, blank=True)
+    completion_rate = models.FloatField(null=True, blank=True)
+    assignment_stats = models.JSONField(default=list)  # [{id, title, submissions_count, avg_score}]
+    quiz_stats = models.JSONField(default=list)  # [{id, title, submissions_count, avg_score}]
+    is_stale = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['faculty', 'course'], name='faculty_snapshot_idx'),
+        ]
+
+    def __str__(self):
+        return f"Dashboard snapshot - {self.course.code}"
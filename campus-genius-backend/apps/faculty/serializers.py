@@ -35,6 +35,14 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['faculty', 'created_at', 'updated_at']
 
+class CourseSummarySerializer(serializers.ModelSerializer):
+    # ?view=summary for course lists
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'code', 'faculty', 'is_published',
+                 'video_count', 'created_at']
+        read_only_fields = fields
+
 class AssignmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Assignment
@@ -0,0 +1,59 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Course, Meeting, VideoLecture, Assignment
+from .dashboard import schedule_snapshot_refresh
+from apps.quiz.models import Quiz, QuizAttempt
+from apps.student.models import (
+    Enrollment, MeetingAttendance, VideoProgress, AssignmentSubmission
+)
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, **kwargs):
+    schedule_snapshot_refresh(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=Assignment)
+@receiver([post_save, post_delete], sender=Quiz)
+def course_child_changed(sender, instance, **kwargs):
+    schedule_snapshot_refresh(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=MeetingAttendance)
+def attendance_changed(sender, instance, **kwargs):
+    schedule_snapshot_refresh(
+        Meeting.objects.filter(
+            id=instance.meeting_id
+        ).values_list('course_id', flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=VideoProgress)
+def video_progress_changed(sender, instance, **kwargs):
+    schedule_snapshot_refresh(
+        VideoLecture.objects.filter(
+            id=instance.video_id
+        ).values_list('course_id', flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=AssignmentSubmission)
+def assignment_submission_changed(sender, instance, **kwargs):
+    schedule_snapshot_refresh(
+        Assignment.objects.filter(
+            id=instance.assignment_id
+        ).values_list('course_id', flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=QuizAttempt)
+def quiz_attempt_changed(sender, instance, **kwargs):
+    # Attempts only count towards the quiz stats once completed
+    if instance.completed_at is None:
+        return
+    schedule_snapshot_refresh(
+        Quiz.objects.filter(
+            id=instance.quiz_id
+        ).values_list('course_id', flat=True).first()
+    )
@@ -0,0 +1,7 @@
+from celery import shared_task
+from .dashboard import refresh_stale_snapshots
+
+
+@shared_task(ignore_result=True)
+def refresh_dashboard_snapshots():
+    refresh_stale_snapshots()
@@ -1,35 +1,43 @@
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model, logout
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
+from django.db.models import Avg
 from .models import (
     Course, Meeting,
     Note, VideoLecture, Assignment, Resource,
-    AITool, AIToolUsage, FacultyProfile, Lecture
+    AITool, AIToolUsage, FacultyProfile, Lecture,
+    CourseDashboardSnapshot
 )
 from apps.quiz.models import Quiz, Question, Choice
+from apps.quiz.item_analysis import get_item_analysis
+from apps.common.prefetch import PrefetchPlannerMixin
+from apps.common.summary import SummaryViewMixin
+from .analytics import course_metrics, assignment_stats, quiz_stats
+from .dashboard import rebuild_snapshots, refresh_stale_snapshots
 from .serializers import (
     CourseSerializer, AssignmentSerializer,
     ResourceSerializer, AIToolSerializer, AIToolUsageSerializer,
     FacultyDashboardSerializer, FacultyProfileSerializer,
     FacultySettingsSerializer, FacultyProfileUpdateSerializer,
     FacultyUserUpdateSerializer, CourseDetailSerializer,
-    LectureSerializer
+    LectureSerializer, CourseSummarySerializer
 )
 from apps.student.serializers import (
     NoteSerializer, MeetingSerializer, VideoLectureSerializer
 )
 from apps.quiz.serializers import (
-    QuizSerializer, QuestionSerializer, ChoiceSerializer
+    QuizSerializer, QuestionSerializer, ChoiceSerializer,
+    QuizSummarySerializer
 )
 from apps.student.models import (
-    QuizSubmission, AssignmentSubmission,
-    Enrollment, VideoProgress
+    QuizSubmission, AssignmentSubmission, VideoProgress
 )
+from apps.student.enrollment import enroll_roster, EnrollmentError
 
 User = get_user_model()
 
@@ -45,49 +53,61 @@ class FacultyDashboardView(APIView):
     
     def get(self, request):
         try:
-            courses = Course.objects.filter(faculty=request.user)
-            enrollments = Enrollment.objects.filter(course__in=courses)
+            # Course-level figures are precomputed; see apps.faculty.dashboard.
+            # Courses created before snapshots existed are built on first view,
+            # and stale ones the periodic refresh has not reached yet are
+            # rebuilt here.
+            missing = Course.objects.filter(
+                faculty=request.user, dashboard_snapshot__isnull=True
+            ).values_list('id', flat=True)
+            if missing:
+                rebuild_snapshots(list(missing))
+            refresh_stale_snapshots(request.user.id)
             
-            # Course analytics
-            course_analytics = courses.annotate(
-                total_students=Count('enrollments'),
-                avg_attendance=Avg('meetings__attendance__is_present'),
-                completion_rate=Avg('videos__progress__is_completed')
-            )
-            
-            # Assignment analytics
-            assignment_analytics = Assignment.objects.filter(
-                course__in=courses
-            ).annotate(
-                submissions_count=Count('submissions'),
-                avg_score=Avg('submissions__score')
-            )
-            
-            # Quiz analytics
-            quiz_analytics = Quiz.objects.filter(
-                course__in=courses
-            ).annotate(
-                submissions_count=Count('submissions'),
-                avg_score=Avg('submissions__score')
+            snapshots = list(
+                CourseDashboardSnapshot.objects.filter(
+                    faculty=request.user
+                ).select_related('course').order_by('course_id')
             )
+            now = timezone.now()
             
             data = {
-                'total_courses': courses.count(),
-                'total_students': enrollments.count(),
+                'total_courses': len(snapshots),
+                'total_students': sum(s.total_students for s in snapshots),
                 'active_assignments': Assignment.objects.filter(
-                    course__in=courses,
-                    due_date__gt=timezone.now()
+                    course__faculty=request.user,
+                    due_date__gt=now
                 ).count(),
-                'upcoming_meetings': Meeting.objects.filter(
-                    course__in=courses,
-                    start_time__gt=timezone.now()
-                ).order_by('start_time')[:5],
+                'upcoming_meetings': MeetingSerializer(
+                    Meeting.objects.filter(
+                        course__faculty=request.user,
+                        start_time__gt=now
+                    ).order_by('start_time')[:5],
+                    many=True
+                ).data,
                 'recent_submissions': AssignmentSubmission.objects.filter(
-                    assignment__course__in=courses
-                ).order_by('-submitted_at')[:5],
-                'course_analytics': course_analytics,
-                'assignment_analytics': assignment_analytics,
-                'quiz_analytics': quiz_analytics
+                    assignment__course__faculty=request.user
+                ).order_by('-submitted_at').values(
+                    'id', 'student_id', 'assignment_id', 'assignment__title',
+                    'submitted_at', 'score', 'status'
+                )[:5],
+                'course_analytics': [
+                    {
+                        'id': s.course_id,
+                        'code': s.course.code,
+                        'title': s.course.title,
+                        'total_students': s.total_students,
+                        'avg_attendance': s.avg_attendance,
+                        'completion_rate': s.completion_rate,
+                    }
+                    for s in snapshots
+                ],
+                'assignment_analytics': [
+                    stat for s in snapshots for stat in s.assignment_stats
+                ],
+                'quiz_analytics': [
+                    stat for s in snapshots for stat in s.quiz_stats
+                ]
             }
             
             serializer = FacultyDashboardSerializer(data)
@@ -98,8 +118,9 @@ class FacultyDashboardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SummaryViewMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = CourseSerializer
+    summary_serializer_class = CourseSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
     def get_queryset(self):
@@ -119,23 +140,30 @@ class CourseViewSet(viewsets.ModelViewSet):
     def analytics(self, request, pk=None):
         course = self.get_object()
         data = {
-            'total_students': course.enrollments.count(),
-            'completion_rate': course.videos.aggregate(
-                avg=Avg('progress__is_completed')
-            )['avg'],
-            'assignment_stats': course.assignments.annotate(
-                submissions_count=Count('submissions'),
-                avg_score=Avg('submissions__score')
-            ),
-            'quiz_stats': course.quiz_app_quizzes.annotate(
-                submissions_count=Count('submissions'),
-                avg_score=Avg('submissions__score')
-            )
+            **course_metrics(course),
+            'assignment_stats': assignment_stats(course),
+            'quiz_stats': quiz_stats(course)
         }
         return Response(data)
 
-class QuizViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'], parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def roster(self, request, pk=None):
+        # Either a CSV upload ("file", with an email or username column) or
+        # {"students": ["alice@example.com", "bob", ...]}
+        course = self.get_object()
+        try:
+            result = enroll_roster(
+                course,
+                identifiers=request.data.get('students'),
+                upload=request.FILES.get('file')
+            )
+        except EnrollmentError as e:
+            return Response({'error': e.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+class QuizViewSet(SummaryViewMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = QuizSerializer
+    summary_serializer_class = QuizSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
     def get_queryset(self):
@@ -158,14 +186,11 @@ class QuizViewSet(viewsets.ModelViewSet):
         data = {
             'total_submissions': submissions.count(),
             'avg_score': submissions.aggregate(avg=Avg('score'))['avg'],
-            'question_analysis': quiz.questions.annotate(
-                correct_count=Count('answers', filter=Q(answers__is_correct=True)),
-                total_attempts=Count('answers')
-            )
+            'question_analysis': get_item_analysis(quiz.id)
         }
         return Response(data)
 
-class QuestionViewSet(viewsets.ModelViewSet):
+class QuestionViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -179,7 +204,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("You cannot add questions to this quiz.")
         serializer.save()
 
-class MeetingViewSet(viewsets.ModelViewSet):
+class MeetingViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = MeetingSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -201,7 +226,7 @@ class MeetingViewSet(viewsets.ModelViewSet):
         meeting.save()
         return Response({'status': 'recording saved'})
 
-class AIToolViewSet(viewsets.ModelViewSet):
+class AIToolViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = AIToolSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -236,7 +261,7 @@ class AIToolViewSet(viewsets.ModelViewSet):
         
         return Response(output_data)
 
-class AIToolUsageViewSet(viewsets.ModelViewSet):
+class AIToolUsageViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = AIToolUsageSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -292,7 +317,7 @@ class AIToolUsageViewSet(viewsets.ModelViewSet):
             ]
         }
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = NoteSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -308,7 +333,7 @@ class NoteViewSet(viewsets.ModelViewSet):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class VideoLectureViewSet(viewsets.ModelViewSet):
+class VideoLectureViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = VideoLectureSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -324,8 +349,9 @@ class VideoLectureViewSet(viewsets.ModelViewSet):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class CourseListView(generics.ListCreateAPIView):
+class CourseListView(SummaryViewMixin, PrefetchPlannerMixin, generics.ListCreateAPIView):
     serializer_class = CourseSerializer
+    summary_serializer_class = CourseSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
     def get_queryset(self):
@@ -334,7 +360,7 @@ class CourseListView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(faculty=self.request.user)
 
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CourseDetailView(PrefetchPlannerMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CourseDetailSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -347,7 +373,7 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class LectureListView(generics.ListCreateAPIView):
+class LectureListView(PrefetchPlannerMixin, generics.ListCreateAPIView):
     serializer_class = LectureSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -365,7 +391,7 @@ class LectureListView(generics.ListCreateAPIView):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class AssignmentViewSet(viewsets.ModelViewSet):
+class AssignmentViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = AssignmentSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -387,7 +413,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class ResourceViewSet(viewsets.ModelViewSet):
+class ResourceViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = ResourceSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -407,8 +433,9 @@ class ResourceViewSet(viewsets.ModelViewSet):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class QuizListView(generics.ListCreateAPIView):
+class QuizListView(SummaryViewMixin, PrefetchPlannerMixin, generics.ListCreateAPIView):
     serializer_class = QuizSerializer
+    summary_serializer_class = QuizSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
     def get_queryset(self):
@@ -425,7 +452,7 @@ class QuizListView(generics.ListCreateAPIView):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-class FacultyProfileViewSet(viewsets.ModelViewSet):
+class FacultyProfileViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = FacultyProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
     
@@ -482,10 +509,12 @@ class FacultyLogoutView(APIView):
         logout(request)
         return Response({'status': 'successfully logged out'})
 
-import google.generativeai as genai
 import json
 import os
-from django.conf import settings
+from apps.chat_service.gateway import BULK, LLMConfigurationError, LLMTransientError, RETRY_AFTER
+from apps.chat_service.llm import get_gateway
+
+AI_PROCESSING_MODEL = 'gemini-1.5-flash'
 
 class AIProcessingView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
@@ -521,13 +550,11 @@ class AIProcessingView(APIView):
                     is_public=False
                 )
             
-            # 2. Process with Gemini
-            api_key = getattr(settings, 'GEMINI_API_KEY', os.getenv('GEMINI_API_KEY'))
-            if not api_key:
-                return Response({'error': 'AI configuration missing'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            # 2. Process with Gemini, through the shared LLM gateway as bulk work
+            try:
+                gateway = get_gateway()
+            except LLMConfigurationError as e:
+                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # Create a temporary file to handle the upload for Gemini
             import tempfile
@@ -539,18 +566,18 @@ class AIProcessingView(APIView):
 
             try:
                 # Upload to Gemini
-                uploaded_file = genai.upload_file(tmp_path, mime_type=file.content_type)
+                uploaded_file = gateway.upload_file_sync(tmp_path, file.content_type, BULK)
                 
                 # Wait for file to be active (usually instant for small files, but good practice)
                 # Note: For very large files, might need polling. 1.5 Flash is fast.
 
                 if action == 'summarize':
                     prompt = "Summarize the following content in a clear, concise manner."
-                    response = model.generate_content([prompt, uploaded_file])
+                    response_text = gateway.generate_sync(AI_PROCESSING_MODEL, [prompt, uploaded_file], BULK)
                     
                     return Response({
                         'type': 'summary',
-                        'content': response.text,
+                        'content': response_text,
                         'file_url': resource.file.url if resource else None
                     })
 
@@ -560,10 +587,10 @@ class AIProcessingView(APIView):
                         "Return ONLY a valid JSON array with this structure: "
                         '[{ "question_text": "...", "question_type": "mcq", "marks": 1, "choices": [{ "choice_text": "...", "is_correct": true/false }] }]. '
                     )
-                    response = model.generate_content([prompt, uploaded_file])
+                    response_text = gateway.generate_sync(AI_PROCESSING_MODEL, [prompt, uploaded_file], BULK)
                     
                     # Clean markdown code blocks if Gemini wraps JSON in ```json ... ```
-                    text = response.text.replace('```json', '').replace('```', '').strip()
+                    text = response_text.replace('```json', '').replace('```', '').strip()
                     questions_data = json.loads(text)
 
                     # Create Quiz in MySQL
@@ -606,7 +633,7 @@ class AIProcessingView(APIView):
                         'type': 'quiz',
                         'quiz_id': quiz.id,
                         'title': quiz.title,
-                        'content': response.text,
+                        'content': response_text,
                         'message': 'Quiz generated successfully'
                     })
 
@@ -617,5 +644,11 @@ class AIProcessingView(APIView):
                 if os.path.exists(tmp_path):
                     os.remove(tmp_path)
 
+        except LLMTransientError as e:
+            # Rate limited or queue full: ask the client to come back
+            return Response(
+                {'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(RETRY_AFTER)}
+            )
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR) 
\ No newline at end of file
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import Quiz, Question, Choice
+
+# Compiled answer keys, one per quiz:
+#
+#     {'version': 3, 'questions': {question_id: {
+#         'marks': 2, 'type': 'mcq',
+#         'correct_choice': 'Paris', 'correct_choice_ids': [7]}}}
+#
+# Lookups go process-local LRU -> Django cache -> database. The version is
+# Quiz.answer_key_version, bumped in the same transaction as any change to a
+# question or choice of the quiz. A process trusts its local copy for
+# QUIZ_ANSWER_KEY_RECHECK seconds, then re-reads the version (one pk lookup)
+# and recompiles or refetches if it moved. Cached keys are stored under their
+# version, so the cache can never hand out a stale one, shared or not.
+
+ANSWER_KEY_TIMEOUT = getattr(settings, 'QUIZ_ANSWER_KEY_TIMEOUT', 60 * 60)
+ANSWER_KEY_LRU_SIZE = getattr(settings, 'QUIZ_ANSWER_KEY_LRU_SIZE', 256)
+ANSWER_KEY_RECHECK = getattr(settings, 'QUIZ_ANSWER_KEY_RECHECK', 5.0)
+
+
+class _LRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local_keys = _LRU(ANSWER_KEY_LRU_SIZE)
+
+
+def _data_key(quiz_id, version):
+    return f'quiz:{quiz_id}:answer_key:{version}'
+
+
+def _current_version(quiz_id):
+    return Quiz.objects.filter(pk=quiz_id).values_list('answer_key_version', flat=True).first()
+
+
+def compile_answer_key(quiz_id, version=None):
+    questions = {
+        question_id: {
+            'marks': marks,
+            'type': question_type,
+            'correct_choice': None,
+            'correct_choice_ids': [],
+        }
+        for question_id, marks, question_type in Question.objects.filter(
+            quiz_id=quiz_id
+        ).values_list('id', 'marks', 'question_type')
+    }
+
+    correct = Choice.objects.filter(
+        question__quiz_id=quiz_id, is_correct=True
+    ).order_by('id').values_list('id', 'question_id', 'choice_text')
+    for choice_id, question_id, choice_text in correct:
+        entry = questions[question_id]
+        # Grading compares against the first correct choice, as before
+        if entry['correct_choice'] is None:
+            entry['correct_choice'] = choice_text
+        entry['correct_choice_ids'].append(choice_id)
+
+    return {'version': version, 'questions': questions}
+
+
+def get_answer_key(quiz_id):
+    # Local entries are (checked_at, key)
+    local = _local_keys.get(quiz_id)
+    if local is not None and time.monotonic() - local[0] < ANSWER_KEY_RECHECK:
+        return local[1]
+
+    checked_at = time.monotonic()
+    version = _current_version(quiz_id)
+    if local is not None and local[1]['version'] == version:
+        key = local[1]
+    else:
+        key = cache.get(_data_key(quiz_id, version))
+        if key is None:
+            key = compile_answer_key(quiz_id, version)
+            cache.set(_data_key(quiz_id, version), key, ANSWER_KEY_TIMEOUT)
+
+    _local_keys.set(quiz_id, (checked_at, key))
+    return key
+
+
+def invalidate_answer_key(quiz_id):
+    # Bump inside the caller's transaction so the new version commits with
+    # the edit; other processes notice within ANSWER_KEY_RECHECK
+    Quiz.objects.filter(pk=quiz_id).update(answer_key_version=F('answer_key_version') + 1)
+    transaction.on_commit(lambda: _local_keys.pop(quiz_id))
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class QuizConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.quiz'
+    verbose_name = 'Quiz'
+
+    def ready(self):
+        # Answer-key cache invalidation
+        from . import signals  # noqa: F401
@@ -0,0 +1,41 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q
+from .models import QuizAttempt
+
+
+class AttemptError(Exception):
+    pass
+
+
+def allocate_attempt(quiz, student, retries=3):
+    """
+    Allocate the next attempt for ``student`` on ``quiz``.
+
+    Reads the attempt stats in one aggregate and inserts with the next
+    attempt number. The (quiz, student, attempt_number) unique constraint
+    arbitrates concurrent requests: a loser of the race gets an
+    IntegrityError, re-reads, and then sees the winner's active attempt.
+    """
+    for _ in range(retries):
+        stats = QuizAttempt.objects.filter(quiz=quiz, student=student).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(completed_at__isnull=True)),
+            last_number=Max('attempt_number')
+        )
+
+        if stats['total'] >= quiz.max_attempts and not quiz.allow_retake:
+            raise AttemptError("Maximum attempts reached")
+        if stats['active']:
+            raise AttemptError("You already have an active attempt")
+
+        try:
+            with transaction.atomic():
+                return QuizAttempt.objects.create(
+                    quiz=quiz,
+                    student=student,
+                    attempt_number=(stats['last_number'] or 0) + 1
+                )
+        except IntegrityError:
+            continue
+
+    raise AttemptError("Could not start the attempt, please try again")
@@ -0,0 +1,64 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from .models import QuizAttempt, StudentAnswer
+from .serializers import QuizAttemptSerializer
+
+# Streaming exports of quiz results. Attempts are read with
+# .iterator(chunk_size=...) and their answers/questions are prefetched per
+# chunk, so memory stays flat however many attempts a quiz has.
+
+EXPORT_CHUNK_SIZE = 500
+
+CSV_HEADER = [
+    'attempt_id', 'student_id', 'student_name', 'attempt_number',
+    'started_at', 'completed_at', 'score', 'is_passed',
+    'question_id', 'question_text', 'question_type', 'question_marks',
+    'selected_option', 'text_answer', 'code_answer', 'file_answer',
+    'is_correct', 'marks_obtained', 'feedback',
+]
+
+
+def attempts_with_answers(quiz):
+    answers = StudentAnswer.objects.select_related('question').order_by('question__order', 'id')
+    return QuizAttempt.objects.filter(quiz=quiz).select_related(
+        'student', 'quiz'
+    ).prefetch_related(
+        Prefetch('answers', queryset=answers)
+    ).order_by('id')
+
+
+class _Echo:
+    # csv.writer only needs write(); hand each line straight back
+    def write(self, value):
+        return value
+
+
+def stream_csv(quiz):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for attempt in attempts_with_answers(quiz).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        attempt_columns = [
+            attempt.id, attempt.student_id, attempt.student.get_full_name(),
+            attempt.attempt_number, attempt.started_at, attempt.completed_at,
+            attempt.score, attempt.is_passed,
+        ]
+        answers = attempt.answers.all()
+        if not answers:
+            yield writer.writerow(attempt_columns + [''] * (len(CSV_HEADER) - len(attempt_columns)))
+        for answer in answers:
+            yield writer.writerow(attempt_columns + [
+                answer.question_id, answer.question.question_text,
+                answer.question.question_type, answer.question.marks,
+                answer.selected_option, answer.text_answer, answer.code_answer,
+                answer.file_answer.name if answer.file_answer else '',
+                answer.is_correct, answer.marks_obtained, answer.feedback,
+            ])
+
+
+def stream_ndjson(quiz, request=None):
+    # One QuizAttemptSerializer document per line, same shape as the API
+    for attempt in attempts_with_answers(quiz).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        data = QuizAttemptSerializer(attempt, context={'request': request}).data
+        yield json.dumps(data, cls=DjangoJSONEncoder) + '\n'
@@ -0,0 +1,202 @@
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from apps.faculty.dashboard import schedule_snapshot_refresh
+from apps.student.dashboard import invalidate_dashboards
+from .models import QuizAttempt, StudentAnswer
+from .answer_key import get_answer_key
+from .item_analysis import invalidate_item_analysis
+
+PASSING_SCORE = 60  # percent
+
+
+class GradingError(Exception):
+    pass
+
+
+def score_answer(entry, selected_option):
+    # Only MCQs are auto-graded; other types get marks from faculty later
+    if entry['type'] != 'mcq' or entry['correct_choice'] is None:
+        return False, 0
+    if selected_option == entry['correct_choice']:
+        return True, entry['marks']
+    return False, 0
+
+
+def validate_answers(quiz_id, answers_data):
+    """
+    Check a submitted answer list against the quiz's answer key and return
+    the key's questions. Only touches the cache once the key is warm.
+    """
+    if not isinstance(answers_data, list):
+        raise GradingError("answers must be a list")
+
+    questions = get_answer_key(quiz_id)['questions']
+    seen = set()
+    for answer_data in answers_data:
+        question_id = _question_id(answer_data)
+        if question_id not in questions:
+            raise GradingError(f"Question {question_id} is not part of this quiz")
+        if question_id in seen:
+            raise GradingError(f"Question {question_id} was answered more than once")
+        seen.add(question_id)
+    return questions
+
+
+def grade_attempt(attempt, answers_data, submitted_at=None):
+    """
+    Grade a submitted attempt in memory and persist it in one transaction:
+    the answers are written with a single bulk insert and the attempt is
+    closed in the same commit. ``submitted_at`` is when the student
+    submitted, for answers graded later from a receipt; it defaults to now.
+    """
+    questions = validate_answers(attempt.quiz_id, answers_data)
+
+    answers = []
+    total_marks = 0
+    earned_marks = 0
+    for answer_data in answers_data:
+        question_id = _question_id(answer_data)
+        entry = questions[question_id]
+        answer = StudentAnswer(
+            attempt=attempt,
+            question_id=question_id,
+            selected_option=answer_data.get('selected_option'),
+            text_answer=answer_data.get('text_answer'),
+            code_answer=answer_data.get('code_answer')
+        )
+        answer.is_correct, answer.marks_obtained = score_answer(entry, answer.selected_option)
+        answers.append(answer)
+
+        earned_marks += answer.marks_obtained
+        total_marks += entry['marks']
+
+    score = (earned_marks / total_marks) * 100 if total_marks > 0 else 0
+
+    with transaction.atomic():
+        # Lock the attempt so a double submit cannot write the answers twice
+        still_open = QuizAttempt.objects.select_for_update().filter(
+            pk=attempt.pk, completed_at__isnull=True
+        ).exists()
+        if not still_open:
+            raise GradingError("This attempt has already been submitted")
+
+        StudentAnswer.objects.bulk_create(answers)
+
+        attempt.score = score
+        attempt.is_passed = score >= PASSING_SCORE
+        attempt.completed_at = submitted_at or timezone.now()
+        attempt.save(update_fields=['score', 'is_passed', 'completed_at'])
+
+    return {
+        "score": score,
+        "is_passed": attempt.is_passed,
+        "total_marks": total_marks,
+        "earned_marks": earned_marks
+    }
+
+
+def apply_manual_grades(grades, grader):
+    """
+    Apply faculty marks to many attempts at once.
+
+    ``grades`` is a list of ``{"attempt_id": ..., "answers": [{"answer_id",
+    "marks_obtained", "feedback"}]}``. Answers are fetched with their
+    questions in one query and written back with one bulk_update; attempt
+    scores are then recomputed over all of their answers with one grouped
+    aggregate for the whole batch.
+    """
+    if not isinstance(grades, list):
+        raise GradingError("attempts must be a list")
+
+    requested = {}
+    for grade in grades:
+        attempt_id = _int_field(grade, 'attempt_id')
+        answers_data = grade.get('answers') or []
+        if not isinstance(answers_data, list):
+            raise GradingError(f"answers for attempt {attempt_id} must be a list")
+        for answer_data in answers_data:
+            requested[_int_field(answer_data, 'answer_id')] = (attempt_id, answer_data)
+
+    attempt_ids = {attempt_id for attempt_id, _ in requested.values()}
+    attempt_ids.update(_int_field(grade, 'attempt_id') for grade in grades)
+
+    attempts = {
+        attempt.id: attempt
+        for attempt in QuizAttempt.objects.filter(
+            id__in=attempt_ids, quiz__created_by=grader
+        ).select_related('quiz')
+    }
+    missing = attempt_ids - attempts.keys()
+    if missing:
+        raise GradingError(f"Attempts not found: {sorted(missing)}")
+    in_progress = sorted(attempt.id for attempt in attempts.values() if attempt.completed_at is None)
+    if in_progress:
+        raise GradingError(f"Attempts not submitted yet: {in_progress}")
+
+    answers = list(
+        StudentAnswer.objects.filter(id__in=requested.keys()).select_related('question')
+    )
+    for answer in answers:
+        attempt_id, answer_data = requested.pop(answer.id)
+        if answer.attempt_id != attempt_id:
+            raise GradingError(f"Answer {answer.id} does not belong to attempt {attempt_id}")
+
+        marks = answer_data.get('marks_obtained', 0)
+        if not isinstance(marks, (int, float)) or isinstance(marks, bool) or not 0 <= marks <= answer.question.marks:
+            raise GradingError(
+                f"marks_obtained for answer {answer.id} must be between 0 and {answer.question.marks}"
+            )
+        answer.marks_obtained = marks
+        answer.feedback = answer_data.get('feedback', '')
+    if requested:
+        raise GradingError(f"Answers not found: {sorted(requested)}")
+
+    with transaction.atomic():
+        StudentAnswer.objects.bulk_update(answers, ['marks_obtained', 'feedback'])
+
+        totals = StudentAnswer.objects.filter(attempt_id__in=attempts.keys()).values(
+            'attempt_id'
+        ).annotate(
+            earned=Sum('marks_obtained'),
+            total=Sum('question__marks')
+        ).order_by()
+
+        results = {}
+        for row in totals:
+            attempt = attempts[row['attempt_id']]
+            total_marks = row['total'] or 0
+            earned_marks = row['earned'] or 0
+            attempt.score = (earned_marks / total_marks) * 100 if total_marks > 0 else 0
+            attempt.is_passed = attempt.score >= PASSING_SCORE
+            results[attempt.id] = {
+                "score": attempt.score,
+                "is_passed": attempt.is_passed,
+                "total_marks": total_marks,
+                "earned_marks": earned_marks
+            }
+        QuizAttempt.objects.bulk_update(
+            [attempts[attempt_id] for attempt_id in results], ['score', 'is_passed']
+        )
+
+    # bulk_update skips post_save, so refresh derived data ourselves
+    for course_id in {attempt.quiz.course_id for attempt in attempts.values()}:
+        schedule_snapshot_refresh(course_id)
+    for quiz_id in {attempt.quiz_id for attempt in attempts.values()}:
+        invalidate_item_analysis(quiz_id)
+    invalidate_dashboards(attempt.student_id for attempt in attempts.values())
+
+    return results
+
+
+def _int_field(data, name):
+    if not isinstance(data, dict):
+        raise GradingError(f"Each entry needs a valid {name}")
+    try:
+        return int(data[name])
+    except (KeyError, TypeError, ValueError):
+        raise GradingError(f"Each entry needs a valid {name}")
+
+
+def _question_id(answer_data):
+    return _int_field(answer_data, 'question_id')
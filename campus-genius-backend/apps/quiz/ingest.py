@@ -0,0 +1,135 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import QuizAttempt, SubmissionReceipt
+from .grading import grade_attempt, validate_answers, GradingError
+
+logger = logging.getLogger(__name__)
+
+# Submission ingest: when a timed quiz closes, every student submits at once.
+# In ingest mode the request only validates the answers against the cached
+# answer key and stores them as a SubmissionReceipt (one insert), then Celery
+# workers grade queued receipts in batches. The receipt row is the durable
+# record, so a lost broker message is picked up again by the periodic sweep.
+# The attempt is closed as of the receipt's created_at, when the student
+# submitted, not when a worker got to it. A failed receipt leaves the attempt
+# open and is replaced when the student submits again. A receipt is marked
+# graded in the grading transaction; one whose attempt is already closed takes
+# the stored result instead of failing.
+
+STALE_PROCESSING_AFTER = timedelta(minutes=5)
+
+
+def ingest_enabled():
+    return getattr(settings, 'QUIZ_SUBMISSION_INGEST', False)
+
+
+def enqueue_submission(attempt, answers_data):
+    validate_answers(attempt.quiz_id, answers_data)
+
+    receipt, created = SubmissionReceipt.objects.get_or_create(
+        attempt=attempt,
+        defaults={'answers': answers_data}
+    )
+    if not created and receipt.status == 'failed':
+        receipt.delete()
+        receipt, created = SubmissionReceipt.objects.get_or_create(
+            attempt=attempt,
+            defaults={'answers': answers_data}
+        )
+    if created:
+        transaction.on_commit(_notify_workers)
+    return receipt
+
+
+def _notify_workers():
+    from config.celery import ensure_broker_folders
+    from .tasks import grade_queued_submissions
+    try:
+        ensure_broker_folders()
+        grade_queued_submissions.delay()
+    except Exception as e:
+        # The receipt is already stored; the sweep will pick it up
+        logger.warning(f"Could not enqueue submission grading: {e}")
+
+
+def claim_batch(batch_size=None):
+    batch_size = batch_size or getattr(settings, 'QUIZ_SUBMISSION_BATCH_SIZE', 50)
+    with transaction.atomic():
+        ids = list(
+            SubmissionReceipt.objects.select_for_update(skip_locked=True)
+            .filter(status='queued')
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        # SQLite ignores skip_locked, so re-check the status and only return
+        # the rows this call actually moved to processing
+        claimed_at = timezone.now()
+        SubmissionReceipt.objects.filter(id__in=ids, status='queued').update(
+            status='processing', claimed_at=claimed_at
+        )
+    return SubmissionReceipt.objects.filter(
+        id__in=ids, status='processing', claimed_at=claimed_at
+    ).select_related('attempt').order_by('created_at')
+
+
+def process_submission_batch(batch_size=None):
+    """Grade one batch of queued receipts. Returns how many were processed."""
+    processed = 0
+    for receipt in claim_batch(batch_size):
+        try:
+            # The receipt is marked graded in the same commit that closes the attempt
+            with transaction.atomic():
+                receipt.result = grade_attempt(
+                    receipt.attempt, receipt.answers, submitted_at=receipt.created_at
+                )
+                receipt.status = 'graded'
+                receipt.error = None
+                _finish(receipt)
+        except GradingError as e:
+            result = _stored_result(receipt.attempt_id)
+            if result is not None:
+                # The attempt was closed without this receipt being marked,
+                # e.g. by a worker that died before the two shared a commit
+                receipt.status, receipt.result, receipt.error = 'graded', result, None
+            else:
+                receipt.status, receipt.result, receipt.error = 'failed', None, str(e)
+            _finish(receipt)
+        except Exception as e:
+            logger.exception(f"Grading receipt {receipt.id} failed")
+            receipt.status, receipt.result, receipt.error = 'failed', None, str(e)
+            _finish(receipt)
+        processed += 1
+    return processed
+
+
+def _finish(receipt):
+    receipt.processed_at = timezone.now()
+    receipt.save(update_fields=['status', 'result', 'error', 'processed_at'])
+
+
+def _stored_result(attempt_id):
+    """The grading result of an already submitted attempt, or None if it is still open."""
+    attempt = QuizAttempt.objects.filter(pk=attempt_id, completed_at__isnull=False).annotate(
+        earned_marks=Sum('answers__marks_obtained'),
+        total_marks=Sum('answers__question__marks'),
+    ).values('score', 'is_passed', 'earned_marks', 'total_marks').first()
+    if attempt is None:
+        return None
+    return {
+        "score": attempt['score'],
+        "is_passed": attempt['is_passed'],
+        "total_marks": attempt['total_marks'] or 0,
+        "earned_marks": attempt['earned_marks'] or 0
+    }
+
+
+def requeue_stale_receipts():
+    # Receipts claimed by a worker that died mid-batch
+    return SubmissionReceipt.objects.filter(
+        status='processing',
+        claimed_at__lt=timezone.now() - STALE_PROCESSING_AFTER
+    ).update(status='queued', claimed_at=None)
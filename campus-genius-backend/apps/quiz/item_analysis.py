@@ -0,0 +1,137 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .models import StudentAnswer
+from .answer_key import get_answer_key
+
+# Classical item analysis for a quiz, computed in one vectorized pass.
+#
+# All answers of completed attempts are read with a single values_list query
+# and scattered into an attempts x questions matrix of item scores (marks
+# obtained / question marks, unanswered = 0). From that matrix:
+#
+#   difficulty      mean item score of the students who answered it (p-value)
+#   discrimination  mean item score of the top 27% by total score minus the
+#                   bottom 27%
+#   distractors     how often each option was selected, for MCQs
+#   cronbach_alpha  k/(k-1) * (1 - sum(item variances) / variance of totals)
+#
+# The result is cached per quiz until another attempt is completed.
+
+ITEM_ANALYSIS_TIMEOUT = getattr(settings, 'QUIZ_ITEM_ANALYSIS_TIMEOUT', 60 * 60)
+GROUP_FRACTION = 0.27
+
+
+def _cache_key(quiz_id):
+    return f'quiz:{quiz_id}:item_analysis'
+
+
+def invalidate_item_analysis(quiz_id):
+    transaction.on_commit(lambda: cache.delete(_cache_key(quiz_id)))
+
+
+def get_item_analysis(quiz_id):
+    analysis = cache.get(_cache_key(quiz_id))
+    if analysis is None:
+        analysis = compute_item_analysis(quiz_id)
+        cache.set(_cache_key(quiz_id), analysis, ITEM_ANALYSIS_TIMEOUT)
+    return analysis
+
+
+def _or_none(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _item(questions, question_id, responses=0, difficulty=None, discrimination=None, distractors=None):
+    return {
+        'question_id': question_id,
+        'question_type': questions[question_id]['type'],
+        'marks': questions[question_id]['marks'],
+        'responses': responses,
+        'difficulty': difficulty,
+        'discrimination': discrimination,
+        'distractors': distractors or {},
+    }
+
+
+def compute_item_analysis(quiz_id):
+    questions = get_answer_key(quiz_id)['questions']
+    question_ids = np.array(sorted(questions), dtype=np.int64)
+
+    rows = list(
+        StudentAnswer.objects.filter(
+            attempt__quiz_id=quiz_id,
+            attempt__completed_at__isnull=False,
+            question_id__in=question_ids.tolist()
+        ).values_list('attempt_id', 'question_id', 'marks_obtained', 'selected_option')
+    )
+
+    if not rows:
+        return {
+            'attempts': 0,
+            'questions': len(question_ids),
+            'cronbach_alpha': None,
+            'items': [_item(questions, q) for q in question_ids.tolist()],
+        }
+
+    attempt_col, question_col, marks_col, option_col = zip(*rows)
+    _, row_idx = np.unique(np.array(attempt_col, dtype=np.int64), return_inverse=True)
+    col_idx = np.searchsorted(question_ids, np.array(question_col, dtype=np.int64))
+    n_attempts = int(row_idx.max()) + 1
+    n_questions = len(question_ids)
+
+    max_marks = np.array([questions[q]['marks'] for q in question_ids.tolist()], dtype=float)
+    safe_marks = np.where(max_marks > 0, max_marks, 1.0)
+
+    scores = np.zeros((n_attempts, n_questions))
+    answered = np.zeros((n_attempts, n_questions), dtype=bool)
+    scores[row_idx, col_idx] = np.array(marks_col, dtype=float) / safe_marks[col_idx]
+    answered[row_idx, col_idx] = True
+
+    responses = answered.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        difficulty = np.where(responses > 0, scores.sum(axis=0) / responses, np.nan)
+
+    totals = scores @ max_marks
+    group = max(1, int(round(GROUP_FRACTION * n_attempts)))
+    ranked = np.argsort(totals, kind='stable')
+    if n_attempts >= 2:
+        discrimination = scores[ranked[-group:]].mean(axis=0) - scores[ranked[:group]].mean(axis=0)
+    else:
+        discrimination = np.full(n_questions, np.nan)
+
+    alpha = None
+    if n_questions > 1 and n_attempts > 1:
+        total_variance = scores.sum(axis=1).var(ddof=1)
+        if total_variance > 0:
+            item_variance = scores.var(axis=0, ddof=1).sum()
+            alpha = float(n_questions / (n_questions - 1) * (1 - item_variance / total_variance))
+
+    # Option counts per MCQ: encode options once, then scatter-add
+    options = np.array([option or '' for option in option_col], dtype=object)
+    is_mcq = np.array([questions[q]['type'] == 'mcq' for q in question_col]) & (options != '')
+    distractors = [{} for _ in range(n_questions)]
+    if is_mcq.any():
+        labels, option_idx = np.unique(options[is_mcq].astype(str), return_inverse=True)
+        counts = np.zeros((n_questions, len(labels)), dtype=np.int64)
+        np.add.at(counts, (col_idx[is_mcq], option_idx), 1)
+        for q, o in zip(*np.nonzero(counts)):
+            distractors[q][str(labels[o])] = int(counts[q, o])
+
+    return {
+        'attempts': n_attempts,
+        'questions': n_questions,
+        'cronbach_alpha': alpha,
+        'items': [
+            _item(
+                questions, question_id,
+                responses=int(responses[i]),
+                difficulty=_or_none(difficulty[i]),
+                discrimination=_or_none(discrimination[i]),
+                distractors=distractors[i]
+            )
+            for i, question_id in enumerate(question_ids.tolist())
+        ],
+    }
@@ -0,0 +1,112 @@
+import threading
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.common.benchmarking import scratch_database
+from apps.common.seed import seed_campus
+from apps.quiz.attempts import allocate_attempt, AttemptError
+from apps.quiz.models import Quiz, QuizAttempt
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a scratch database and race start_attempt allocations from many '
+        'threads, checking that attempt numbers stay unique and the attempt '
+        'limit holds'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--max-attempts', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.failures = []
+        threads = options['threads']
+        max_attempts = options['max_attempts']
+        with scratch_database(on_disk=True):
+            seeded = seed_campus(students=threads)
+            course = seeded['courses'][0]
+            student = seeded['student']
+
+            self.stdout.write(f'One student, {threads} threads per round')
+            quiz = self._quiz(course, seeded['faculty'], max_attempts)
+            for round_number in range(1, max_attempts + 2):
+                outcomes = self._race([student] * threads, quiz)
+                started = [o for o in outcomes if isinstance(o, QuizAttempt)]
+                if round_number <= max_attempts:
+                    self.expect(
+                        len(started) == 1,
+                        f'round {round_number}: exactly one thread starts an attempt ({len(started)})'
+                    )
+                else:
+                    self.expect(not started, f'round {round_number}: the attempt limit stops every thread')
+                self._check_errors(outcomes)
+                # Submitting frees the student for the next round
+                QuizAttempt.objects.filter(quiz=quiz, completed_at__isnull=True).update(
+                    completed_at=timezone.now()
+                )
+            numbers = list(
+                QuizAttempt.objects.filter(quiz=quiz, student=student)
+                .order_by('attempt_number').values_list('attempt_number', flat=True)
+            )
+            self.expect(
+                numbers == list(range(1, max_attempts + 1)),
+                f'attempt numbers are 1..{max_attempts} without gaps or duplicates: {numbers}'
+            )
+
+            self.stdout.write(f'{threads} students at once')
+            quiz = self._quiz(course, seeded['faculty'], max_attempts)
+            outcomes = self._race(seeded['students'][:threads], quiz)
+            started = [o for o in outcomes if isinstance(o, QuizAttempt)]
+            self.expect(len(started) == threads, f'every student starts an attempt ({len(started)}/{threads})')
+            self.expect(
+                all(attempt.attempt_number == 1 for attempt in started),
+                'each student gets attempt number 1'
+            )
+            self._check_errors(outcomes)
+
+        if self.failures:
+            raise CommandError('\n'.join(self.failures))
+        self.stdout.write(self.style.SUCCESS('Attempt allocation holds under concurrency'))
+
+    def expect(self, condition, message):
+        self.stdout.write(f"  {'ok  ' if condition else 'FAIL'} {message}")
+        if not condition:
+            self.failures.append(message)
+
+    def _quiz(self, course, faculty, max_attempts):
+        return Quiz.objects.create(
+            title='Allocation race', course=course, description='', time_limit=10,
+            total_marks=10, is_published=True, max_attempts=max_attempts, created_by=faculty
+        )
+
+    def _race(self, students, quiz):
+        """Call allocate_attempt once per student, all threads released together."""
+        barrier = threading.Barrier(len(students))
+        outcomes = [None] * len(students)
+
+        def run(index, student):
+            try:
+                barrier.wait()
+                outcomes[index] = allocate_attempt(quiz, student)
+            except Exception as e:
+                outcomes[index] = e
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=run, args=(index, student))
+            for index, student in enumerate(students)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return outcomes
+
+    def _check_errors(self, outcomes):
+        unexpected = [
+            f'{type(o).__name__}: {o}' for o in outcomes
+            if isinstance(o, Exception) and not isinstance(o, AttemptError)
+        ]
+        self.expect(not unexpected, f'losers only see AttemptError {sorted(set(unexpected))}')
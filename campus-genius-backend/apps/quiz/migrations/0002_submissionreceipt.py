@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionReceipt',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('answers', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('graded', 'Graded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempt', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='submission_receipt', to='quiz.quizattempt')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='receipt_status_idx')],
+            },
+        ),
+    ]
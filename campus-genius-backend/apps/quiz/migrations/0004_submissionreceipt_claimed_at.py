@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 01:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_claimed_at(apps, schema_editor):
+    # Receipts already being processed count as claimed when they were created
+    SubmissionReceipt = apps.get_model('quiz', 'SubmissionReceipt')
+    SubmissionReceipt.objects.filter(status='processing').update(claimed_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionreceipt',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_claimed_at, migrations.RunPython.noop),
+    ]
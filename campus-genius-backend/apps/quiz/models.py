@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 from apps.faculty.models import Course
@@ -15,6 +16,7 @@ class Quiz(models.Model):
     max_attempts = models.IntegerField(default=1)
     show_correct_answers = models.BooleanField(default=False)
     shuffle_questions = models.BooleanField(default=False)
+    answer_key_version = models.PositiveIntegerField(default=0, editable=False)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_quizzes')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -52,8 +54,9 @@ class Choice(models.Model):
         return f"{self.choice_text} ({'Correct' if self.is_correct else 'Incorrect'})"
 
 class QuizAttempt(models.Model):
-    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
-    student = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Both are covered by the unique index and the composites below
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, db_index=False)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     score = models.FloatField(null=True, blank=True)
@@ -62,6 +65,11 @@ class QuizAttempt(models.Model):
 
     class Meta:
         unique_together = ('quiz', 'student', 'attempt_number')
+        # (quiz, student) lookups are served by the unique index above
+        indexes = [
+            models.Index(fields=['student', 'completed_at'], name='attempt_student_done_idx'),
+            models.Index(fields=['quiz', 'completed_at'], name='attempt_quiz_done_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.username}'s attempt {self.attempt_number} on {self.quiz.title}"
@@ -82,3 +90,30 @@ class StudentAnswer(models.Model):
 
     def __str__(self):
         return f"Answer for {self.question.question_text}"
+
+class SubmissionReceipt(models.Model):
+    """Answers queued for grading while submission ingest mode is on."""
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('graded', 'Graded'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    attempt = models.OneToOneField(QuizAttempt, on_delete=models.CASCADE, related_name='submission_receipt')
+    answers = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)  # when the student submitted
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='receipt_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Receipt {self.id} - {self.status}"
@@ -1,5 +1,10 @@
 from rest_framework import serializers
-from .models import Quiz, Question, Choice, QuizAttempt, StudentAnswer
+from django.db.models import Count
+from django.urls import reverse
+from apps.common.fast import FastSerializer, datetime_formatter, file_url, optional
+from .models import (
+    Quiz, Question, Choice, QuizAttempt, StudentAnswer, SubmissionReceipt
+)
 
 class ChoiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -49,6 +54,19 @@ class QuizSerializer(serializers.ModelSerializer):
                 
         return quiz
 
+class QuizSummarySerializer(serializers.ModelSerializer):
+    # ?view=summary for quiz lists: no questions, so no answers either
+    course_name = serializers.CharField(source='course.title', read_only=True)
+    question_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ['id', 'title', 'course', 'course_name', 'time_limit',
+                 'total_marks', 'is_published', 'max_attempts',
+                 'question_count', 'created_at']
+        read_only_fields = fields
+        annotations = {'question_count': Count('questions', distinct=True)}
+
 class StudentAnswerSerializer(serializers.ModelSerializer):
     question_text = serializers.CharField(source='question.question_text', read_only=True)
     question_type = serializers.CharField(source='question.question_type', read_only=True)
@@ -81,3 +99,81 @@ class QuizAttemptSerializer(serializers.ModelSerializer):
         for answer_data in answers_data:
             StudentAnswer.objects.create(attempt=attempt, **answer_data)
         return attempt
+
+class QuizAttemptFastSerializer(FastSerializer):
+    """QuizAttemptSerializer's list output, read with values()."""
+    columns = ('id', 'quiz_id', 'quiz__title', 'student_id', 'student__first_name',
+               'student__last_name', 'started_at', 'completed_at', 'score',
+               'is_passed', 'attempt_number')
+    answer_columns = ('id', 'attempt_id', 'question_id', 'selected_option',
+                      'text_answer', 'code_answer', 'file_answer', 'is_correct',
+                      'marks_obtained', 'feedback')
+
+    def to_representation(self, rows):
+        if not rows:
+            return []
+        request = self.context.get('request')
+        format_datetime = datetime_formatter()
+        file_field = StudentAnswer._meta.get_field('file_answer')
+
+        # The same two queries prefetch_related('answers__question') runs
+        answers = list(
+            StudentAnswer.objects.filter(attempt_id__in=[row['id'] for row in rows])
+            .values(*self.answer_columns)
+        )
+        questions = {
+            question['id']: question
+            for question in Question.objects.filter(
+                id__in={answer['question_id'] for answer in answers}
+            ).values('id', 'question_text', 'question_type', 'marks')
+        }
+
+        by_attempt = {row['id']: [] for row in rows}
+        for answer in answers:
+            question = questions[answer['question_id']]
+            by_attempt[answer['attempt_id']].append({
+                'id': answer['id'],
+                'question': answer['question_id'],
+                'question_text': question['question_text'],
+                'question_type': question['question_type'],
+                'question_marks': question['marks'],
+                'selected_option': answer['selected_option'],
+                'text_answer': answer['text_answer'],
+                'code_answer': answer['code_answer'],
+                'file_answer': file_url(file_field, answer['file_answer'], request),
+                'is_correct': answer['is_correct'],
+                'marks_obtained': optional(float, answer['marks_obtained']),
+                'feedback': answer['feedback'],
+            })
+
+        return [
+            {
+                'id': row['id'],
+                'quiz': row['quiz_id'],
+                'quiz_title': row['quiz__title'],
+                'student': row['student_id'],
+                'student_name': f"{row['student__first_name']} {row['student__last_name']}".strip(),
+                'started_at': format_datetime(row['started_at']),
+                'completed_at': format_datetime(row['completed_at']),
+                'score': optional(float, row['score']),
+                'is_passed': row['is_passed'],
+                'attempt_number': row['attempt_number'],
+                'answers': by_attempt[row['id']],
+            }
+            for row in rows
+        ]
+
+class SubmissionReceiptSerializer(serializers.ModelSerializer):
+    receipt = serializers.UUIDField(source='id', read_only=True)
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SubmissionReceipt
+        fields = ['receipt', 'status', 'result', 'error',
+                 'created_at', 'processed_at', 'status_url']
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        url = reverse('submission-receipt', kwargs={'receipt_id': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
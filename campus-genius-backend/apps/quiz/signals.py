@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Question, Choice, QuizAttempt
+from .answer_key import invalidate_answer_key
+from .item_analysis import invalidate_item_analysis
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    invalidate_answer_key(instance.quiz_id)
+    invalidate_item_analysis(instance.quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    quiz_id = Question.objects.filter(
+        id=instance.question_id
+    ).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        invalidate_answer_key(quiz_id)
+        invalidate_item_analysis(quiz_id)
+
+
+@receiver([post_save, post_delete], sender=QuizAttempt)
+def attempt_changed(sender, instance, **kwargs):
+    # Item analysis only covers completed attempts
+    if instance.completed_at is not None:
+        invalidate_item_analysis(instance.quiz_id)
@@ -0,0 +1,17 @@
+from celery import shared_task
+from .ingest import process_submission_batch, requeue_stale_receipts
+from .models import SubmissionReceipt
+
+
+@shared_task(ignore_result=True)
+def grade_queued_submissions(batch_size=None):
+    process_submission_batch(batch_size)
+
+
+@shared_task(ignore_result=True)
+def sweep_submission_receipts():
+    requeue_stale_receipts()
+    # Drain anything whose notification never reached a worker
+    while SubmissionReceipt.objects.filter(status='queued').exists():
+        if not process_submission_batch():
+            break
@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import QuizViewSet, QuestionViewSet, QuizAttemptViewSet
+from .views import (
+    QuizViewSet, QuestionViewSet, QuizAttemptViewSet, SubmissionReceiptView
+)
 
 router = DefaultRouter()
 router.register(r'quizzes', QuizViewSet)
@@ -9,4 +11,5 @@ router.register(r'quiz-attempts', QuizAttemptViewSet, basename='quiz-attempt')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('submission-receipts/<uuid:receipt_id>/', SubmissionReceiptView.as_view(), name='submission-receipt'),
 ]
@@ -1,12 +1,25 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
 from django.db.models import Count, Avg, Q
-from .models import Quiz, Question, Choice, QuizAttempt, StudentAnswer
+from apps.common.fast import FastListMixin
+from apps.common.prefetch import PrefetchPlannerMixin
+from apps.common.summary import SummaryViewMixin
+from .models import (
+    Quiz, Question, Choice, QuizAttempt, SubmissionReceipt
+)
+from .attempts import allocate_attempt, AttemptError
+from .grading import grade_attempt, apply_manual_grades, GradingError
+from .ingest import ingest_enabled, enqueue_submission
+from .exports import attempts_with_answers, stream_csv, stream_ndjson
+from .pagination import AttemptCursorPagination
 from .serializers import (
     QuizSerializer, QuestionSerializer, ChoiceSerializer,
-    QuizAttemptSerializer, StudentAnswerSerializer
+    QuizAttemptSerializer, StudentAnswerSerializer,
+    SubmissionReceiptSerializer, QuizSummarySerializer,
+    QuizAttemptFastSerializer
 )
 
 class IsFaculty(permissions.BasePermission):
@@ -16,9 +29,10 @@ class IsFaculty(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return self.has_permission(request, view)
 
-class QuizViewSet(viewsets.ModelViewSet):
+class QuizViewSet(SummaryViewMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
+    summary_serializer_class = QuizSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -48,17 +62,49 @@ class QuizViewSet(viewsets.ModelViewSet):
                           status=status.HTTP_403_FORBIDDEN)
         
         attempts = QuizAttempt.objects.filter(quiz=quiz)
-        total_attempts = attempts.count()
-        avg_score = attempts.aggregate(avg_score=Avg('score'))['avg_score']
-        pass_rate = attempts.filter(is_passed=True).count() / total_attempts if total_attempts > 0 else 0
+        summary = attempts.aggregate(
+            total_attempts=Count('id'),
+            avg_score=Avg('score'),
+            passed=Count('id', filter=Q(is_passed=True))
+        )
+        total_attempts = summary['total_attempts']
+        pass_rate = summary['passed'] / total_attempts if total_attempts > 0 else 0
+
+        # Attempts are paged by cursor; use the export action for everything
+        paginator = AttemptCursorPagination()
+        page = paginator.paginate_queryset(attempts_with_answers(quiz), request, view=self)
         
         return Response({
             "total_attempts": total_attempts,
-            "average_score": avg_score,
+            "average_score": summary['avg_score'],
             "pass_rate": pass_rate,
-            "attempts": QuizAttemptSerializer(attempts, many=True).data
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "attempts": QuizAttemptSerializer(page, many=True, context={'request': request}).data
         })
 
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        quiz = self.get_object()
+        if quiz.created_by != request.user:
+            return Response({"error": "You don't have permission to export results"}, 
+                          status=status.HTTP_403_FORBIDDEN)
+
+        # ?output=csv (default) or ?output=ndjson
+        output = request.query_params.get('output', 'csv')
+        if output == 'ndjson':
+            response = StreamingHttpResponse(
+                stream_ndjson(quiz, request), content_type='application/x-ndjson'
+            )
+        elif output == 'csv':
+            response = StreamingHttpResponse(stream_csv(quiz), content_type='text/csv')
+        else:
+            return Response({"error": "output must be csv or ndjson"}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz.id}-results.{output}"'
+        return response
+
     @action(detail=True, methods=['post'])
     def start_attempt(self, request, pk=None):
         quiz = self.get_object()
@@ -66,32 +112,12 @@ class QuizViewSet(viewsets.ModelViewSet):
             return Response({"error": "This quiz is not published yet"}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        # Check if user has exceeded max attempts
-        current_attempts = QuizAttempt.objects.filter(
-            quiz=quiz, 
-            student=request.user
-        ).count()
-        
-        if current_attempts >= quiz.max_attempts and not quiz.allow_retake:
-            return Response({"error": "Maximum attempts reached"}, 
-                          status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check if user has an active attempt
-        active_attempt = QuizAttempt.objects.filter(
-            quiz=quiz, 
-            student=request.user,
-            completed_at__isnull=True
-        ).first()
-        
-        if active_attempt:
-            return Response({"error": "You already have an active attempt"}, 
+        try:
+            attempt = allocate_attempt(quiz, request.user)
+        except AttemptError as e:
+            return Response({"error": str(e)}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        attempt = QuizAttempt.objects.create(
-            quiz=quiz,
-            student=request.user,
-            attempt_number=current_attempts + 1
-        )
         serializer = QuizAttemptSerializer(attempt)
         return Response(serializer.data)
 
@@ -109,52 +135,29 @@ class QuizViewSet(viewsets.ModelViewSet):
                           status=status.HTTP_400_BAD_REQUEST)
 
         answers_data = request.data.get('answers', [])
-        total_marks = 0
-        earned_marks = 0
-
-        for answer_data in answers_data:
-            question = Question.objects.get(id=answer_data['question_id'])
-            answer = StudentAnswer.objects.create(
-                attempt=attempt,
-                question=question,
-                selected_option=answer_data.get('selected_option'),
-                text_answer=answer_data.get('text_answer'),
-                code_answer=answer_data.get('code_answer')
-            )
-            
-            # For MCQ questions, check if the answer is correct
-            if question.question_type == 'mcq':
-                correct_choice = question.choices.filter(is_correct=True).first()
-                if correct_choice and answer.selected_option == correct_choice.choice_text:
-                    answer.is_correct = True
-                    answer.marks_obtained = question.marks
-                    earned_marks += question.marks
-            
-            # For other question types, marks will be assigned by faculty later
-            answer.save()
-            total_marks += question.marks
-
-        score = (earned_marks / total_marks) * 100 if total_marks > 0 else 0
-        attempt.score = score
-        attempt.is_passed = score >= 60  # Assuming 60% is passing score
-        attempt.completed_at = timezone.now()
-        attempt.save()
+        try:
+            if ingest_enabled():
+                receipt = enqueue_submission(attempt, answers_data)
+                return Response(
+                    SubmissionReceiptSerializer(receipt, context={'request': request}).data,
+                    status=status.HTTP_202_ACCEPTED
+                )
+            result = grade_attempt(attempt, answers_data)
+        except GradingError as e:
+            return Response({"error": str(e)}, 
+                          status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            "score": score,
-            "is_passed": attempt.is_passed,
-            "total_marks": total_marks,
-            "earned_marks": earned_marks
-        })
+        return Response(result)
 
-class QuestionViewSet(viewsets.ModelViewSet):
+class QuestionViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated, IsFaculty]
 
-class QuizAttemptViewSet(viewsets.ModelViewSet):
+class QuizAttemptViewSet(FastListMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = QuizAttempt.objects.all()
     serializer_class = QuizAttemptSerializer
+    fast_serializer_class = QuizAttemptFastSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -169,33 +172,53 @@ class QuizAttemptViewSet(viewsets.ModelViewSet):
             return Response({"error": "You don't have permission to grade this attempt"}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        answers_data = request.data.get('answers', [])
-        total_marks = 0
-        earned_marks = 0
-
-        for answer_data in answers_data:
-            answer = StudentAnswer.objects.get(
-                id=answer_data['answer_id'],
-                attempt=attempt
+        try:
+            results = apply_manual_grades(
+                [{'attempt_id': attempt.id, 'answers': request.data.get('answers', [])}],
+                request.user
             )
-            marks = answer_data.get('marks_obtained', 0)
-            feedback = answer_data.get('feedback', '')
-            
-            answer.marks_obtained = marks
-            answer.feedback = feedback
-            answer.save()
-            
-            earned_marks += marks
-            total_marks += answer.question.marks
-
-        score = (earned_marks / total_marks) * 100 if total_marks > 0 else 0
-        attempt.score = score
-        attempt.is_passed = score >= 60  # Assuming 60% is passing score
-        attempt.save()
+        except GradingError as e:
+            return Response({"error": str(e)}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(results.get(attempt.id, {
+            "score": 0,
+            "is_passed": False,
+            "total_marks": 0,
+            "earned_marks": 0
+        }))
+
+    @action(detail=False, methods=['post'])
+    def bulk_grade(self, request):
+        if request.user.role != 'faculty':
+            return Response({"error": "You don't have permission to grade attempts"}, 
+                          status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            results = apply_manual_grades(request.data.get('attempts', []), request.user)
+        except GradingError as e:
+            return Response({"error": str(e)}, 
+                          status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
-            "score": score,
-            "is_passed": attempt.is_passed,
-            "total_marks": total_marks,
-            "earned_marks": earned_marks
+            "graded": len(results),
+            "attempts": [
+                {"attempt_id": attempt_id, **result}
+                for attempt_id, result in results.items()
+            ]
         })
+
+class SubmissionReceiptView(APIView):
+    """Lightweight status poll for answers queued in ingest mode."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, receipt_id):
+        receipt = SubmissionReceipt.objects.filter(
+            id=receipt_id,
+            attempt__student=request.user
+        ).only('id', 'status', 'result', 'error', 'created_at', 'processed_at').first()
+
+        if not receipt:
+            return Response({"error": "Receipt not found"}, 
+                          status=status.HTTP_404_NOT_FOUND)
+        return Response(SubmissionReceiptSerializer(receipt, context={'request': request}).data)
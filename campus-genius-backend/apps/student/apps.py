@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class StudentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.student'
-    verbose_name = 'Student' 
\ No newline at end of file
+    verbose_name = 'Student'
+
+    def ready(self):
+        # Drops cached student dashboards when a student's activity changes
+        from . import signals  # noqa: F401
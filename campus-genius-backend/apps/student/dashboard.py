@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from apps.common.subqueries import count_per_row
+from apps.faculty.models import Course, Assignment
+from apps.quiz.models import Quiz, QuizAttempt
+from .models import Enrollment, StudyGroup
+from .serializers import StudentDashboardSerializer
+
+User = get_user_model()
+
+# The student dashboard payload is built with one aggregate query for the
+# counters and one query per short list, then cached per student for a short
+# TTL. Signals drop the entry when the student's own enrollments, submissions
+# or progress change; course-level edits (a new assignment, a renamed quiz)
+# show up when the TTL runs out.
+
+DASHBOARD_TIMEOUT = getattr(settings, 'STUDENT_DASHBOARD_TIMEOUT', 60)
+
+
+def _cache_key(student_id):
+    return f'student:{student_id}:dashboard'
+
+
+def invalidate_dashboard(student_id):
+    transaction.on_commit(lambda: cache.delete(_cache_key(student_id)))
+
+
+def invalidate_dashboards(student_ids):
+    # For bulk writes, which do not send post_save
+    keys = [_cache_key(student_id) for student_id in set(student_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_dashboard(student):
+    data = cache.get(_cache_key(student.id))
+    if data is None:
+        data = build_dashboard(student)
+        cache.set(_cache_key(student.id), data, DASHBOARD_TIMEOUT)
+    return data
+
+
+def build_dashboard(student):
+    now = timezone.now()
+    # Annotation names must not clash with the user's reverse relations
+    counts = User.objects.filter(pk=student.pk).annotate(
+        n_enrolled_courses=count_per_row(Enrollment.objects.filter(is_active=True), 'student'),
+        # One row per (active enrollment, open assignment) of the student
+        n_active_assignments=count_per_row(
+            Enrollment.objects.filter(is_active=True, course__assignments__due_date__gt=now),
+            'student'
+        ),
+        n_completed_quizzes=count_per_row(QuizAttempt.objects.filter(completed_at__isnull=False), 'student'),
+        n_study_groups=count_per_row(StudyGroup.members.through.objects.all(), 'user'),
+    ).values(
+        'n_enrolled_courses', 'n_active_assignments', 'n_completed_quizzes', 'n_study_groups'
+    ).get()
+
+    courses = Course.objects.filter(enrollments__student=student, enrollments__is_active=True)
+
+    data = {
+        'enrolled_courses': counts['n_enrolled_courses'],
+        'active_assignments': counts['n_active_assignments'],
+        'completed_quizzes': counts['n_completed_quizzes'],
+        'study_groups': counts['n_study_groups'],
+        'recent_courses': courses[:5],
+        'upcoming_assignments': Assignment.objects.filter(course__in=courses, due_date__gt=now)[:5],
+        'recent_quizzes': Quiz.objects.filter(course__in=courses).select_related('course')[:5],
+    }
+    return StudentDashboardSerializer(data).data
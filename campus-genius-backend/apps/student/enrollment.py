@@ -0,0 +1,166 @@
+import csv
+import hmac
+import io
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from apps.faculty.dashboard import schedule_snapshot_refresh
+from apps.faculty.models import Course
+from .dashboard import invalidate_dashboards
+from .models import Enrollment
+
+User = get_user_model()
+
+# Bulk enrollment for students picking several courses and for faculty
+# importing a roster. Existing (student, course) pairs are found with one
+# query, new ones are inserted with bulk_create(ignore_conflicts=True) so a
+# concurrent enrollment cannot fail the batch, and inactive enrollments are
+# reactivated. bulk_create sends no signals, so the faculty snapshot and the
+# student dashboards are refreshed here.
+
+ROSTER_CHUNK_SIZE = 1000
+
+
+class EnrollmentError(Exception):
+    pass
+
+
+def _key_matches(course, key):
+    if not course.enrollment_key:
+        return True
+    return hmac.compare_digest(course.enrollment_key, str(key or ''))
+
+
+def _enroll(pairs):
+    """
+    Enroll (student_id, course_id) pairs. Returns (enrolled, reactivated,
+    already_enrolled) as lists of pairs.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return [], [], []
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+
+    existing = {
+        (student_id, course_id): is_active
+        for student_id, course_id, is_active in Enrollment.objects.filter(
+            student_id__in=student_ids, course_id__in=course_ids
+        ).values_list('student_id', 'course_id', 'is_active')
+    }
+    new = sorted(pairs - existing.keys())
+    inactive = sorted(pair for pair in pairs if existing.get(pair) is False)
+    active = sorted(pair for pair in pairs if existing.get(pair) is True)
+
+    with transaction.atomic():
+        Enrollment.objects.bulk_create(
+            [Enrollment(student_id=student_id, course_id=course_id) for student_id, course_id in new],
+            ignore_conflicts=True
+        )
+        for course_id in {course_id for _, course_id in inactive}:
+            Enrollment.objects.filter(
+                course_id=course_id,
+                student_id__in=[student_id for student_id, c in inactive if c == course_id]
+            ).update(is_active=True)
+
+    changed = new + inactive
+    for course_id in {course_id for _, course_id in changed}:
+        schedule_snapshot_refresh(course_id)
+    invalidate_dashboards(student_id for student_id, _ in changed)
+    return new, inactive, active
+
+
+def enroll_in_courses(student, entries):
+    """
+    Enroll a student in several courses. ``entries`` is a list of
+    ``{"course": id, "enrollment_key": "..."}``; nothing is written unless
+    every course exists, is published and the key matches.
+    """
+    if not isinstance(entries, list) or not entries:
+        raise EnrollmentError("courses must be a non-empty list")
+
+    keys = {}
+    for entry in entries:
+        try:
+            keys[int(entry['course'])] = entry.get('enrollment_key')
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise EnrollmentError("Each entry needs a valid course id")
+
+    courses = Course.objects.filter(id__in=keys.keys(), is_published=True).only('id', 'enrollment_key')
+    found = {course.id: course for course in courses}
+
+    errors = {}
+    for course_id, key in keys.items():
+        if course_id not in found:
+            errors[course_id] = "Course not found"
+        elif not _key_matches(found[course_id], key):
+            errors[course_id] = "Invalid enrollment key"
+    if errors:
+        raise EnrollmentError(errors)
+
+    new, reactivated, existing = _enroll((student.id, course_id) for course_id in keys)
+    return {
+        'enrolled': [course_id for _, course_id in new + reactivated],
+        'already_enrolled': [course_id for _, course_id in existing],
+    }
+
+
+def _roster_rows(upload):
+    # Stream the file; only the current chunk of rows is held in memory
+    reader = csv.DictReader(io.TextIOWrapper(upload, encoding='utf-8-sig', newline=''))
+    if not reader.fieldnames or not {'email', 'username'} & set(reader.fieldnames):
+        raise EnrollmentError("The CSV needs an email or username column")
+    for row in reader:
+        yield (row.get('email') or row.get('username') or '').strip()
+
+
+def _chunks(values, size):
+    chunk = []
+    for value in values:
+        if value:
+            chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def enroll_roster(course, identifiers=None, upload=None):
+    """
+    Enroll students into ``course`` by email or username, either from a list
+    or from an uploaded CSV with an ``email`` or ``username`` column. Rows
+    are processed in chunks of ROSTER_CHUNK_SIZE with a constant number of
+    queries per chunk.
+    """
+    if upload is not None:
+        rows = _roster_rows(upload)
+    elif isinstance(identifiers, list):
+        rows = (str(identifier).strip() for identifier in identifiers)
+    else:
+        raise EnrollmentError("Provide a CSV file or a list of students")
+
+    summary = {'enrolled': 0, 'already_enrolled': 0, 'unknown': []}
+    try:
+        for chunk in _chunks(rows, ROSTER_CHUNK_SIZE):
+            _enroll_chunk(course, chunk, summary)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Earlier chunks stay enrolled; rerunning the import is idempotent
+        raise EnrollmentError(f"Could not read the CSV: {e}")
+    return summary
+
+
+def _enroll_chunk(course, chunk, summary):
+    students = User.objects.filter(role='student').filter(
+        Q(email__in=chunk) | Q(username__in=chunk)
+    ).values_list('id', 'email', 'username')
+    matched = set()
+    student_ids = set()
+    for student_id, email, username in students:
+        student_ids.add(student_id)
+        matched.update((email, username))
+    summary['unknown'].extend(identifier for identifier in chunk if identifier not in matched)
+
+    new, reactivated, existing = _enroll((student_id, course.id) for student_id in student_ids)
+    summary['enrolled'] += len(new) + len(reactivated)
+    summary['already_enrolled'] += len(existing)
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from .models import VideoProgress
+
+logger = logging.getLogger(__name__)
+
+# Buffered video heartbeats.
+#
+# A player sends a heartbeat every second or so. Instead of one UPDATE per
+# heartbeat, heartbeats are merged in a per-process buffer keyed by
+# (student, video): the latest position wins and the watched seconds add up.
+# The buffer is written with a single bulk_update where watch_time is set to
+# F('watch_time') + seconds, so concurrent flushes from several processes
+# never lose increments. A flush happens when the buffer holds
+# VIDEO_HEARTBEAT_FLUSH_SIZE entries, from a background thread every
+# VIDEO_HEARTBEAT_FLUSH_INTERVAL seconds, and at interpreter exit.
+
+FLUSH_SIZE = getattr(settings, 'VIDEO_HEARTBEAT_FLUSH_SIZE', 500)
+FLUSH_INTERVAL = getattr(settings, 'VIDEO_HEARTBEAT_FLUSH_INTERVAL', 5.0)
+MAX_SECONDS_PER_HEARTBEAT = 60
+
+
+class HeartbeatError(Exception):
+    pass
+
+
+class HeartbeatBuffer:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, student_id, video_id, progress_id, position, seconds):
+        with self._lock:
+            entry = self._entries.get((student_id, video_id))
+            if entry is None:
+                self._entries[(student_id, video_id)] = [progress_id, position, seconds]
+            else:
+                entry[1] = position
+                entry[2] += seconds
+            return len(self._entries)
+
+    def restore(self, entries):
+        # Put back entries from a failed flush, merged with newer heartbeats
+        with self._lock:
+            for key, (progress_id, position, seconds) in entries.items():
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._entries[key] = [progress_id, position, seconds]
+                else:
+                    entry[2] += seconds
+
+    def drain(self):
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        return entries
+
+
+_buffer = HeartbeatBuffer()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def record_heartbeat(progress, position, seconds=1):
+    if position < 0:
+        raise HeartbeatError("position must be >= 0")
+    if _buffer.add(progress.student_id, progress.video_id, progress.id, position, seconds) >= FLUSH_SIZE:
+        flush_heartbeats()
+    _ensure_flusher()
+
+
+def record_heartbeats(student, heartbeats):
+    """
+    Buffer a batch of ``{"video", "position", "seconds"}`` heartbeats for one
+    student. Returns the video ids that have no progress row for the student.
+    """
+    if not isinstance(heartbeats, list):
+        raise HeartbeatError("heartbeats must be a list")
+
+    cleaned = []
+    for heartbeat in heartbeats:
+        try:
+            video_id = int(heartbeat['video'])
+            position = int(heartbeat['position'])
+            seconds = int(heartbeat.get('seconds', 1))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise HeartbeatError("Each heartbeat needs integer video and position")
+        if position < 0 or not 0 <= seconds <= MAX_SECONDS_PER_HEARTBEAT:
+            raise HeartbeatError(
+                f"position must be >= 0 and seconds between 0 and {MAX_SECONDS_PER_HEARTBEAT}"
+            )
+        cleaned.append((video_id, position, seconds))
+
+    progress_ids = dict(
+        VideoProgress.objects.filter(
+            student=student, video_id__in={video_id for video_id, _, _ in cleaned}
+        ).values_list('video_id', 'id')
+    )
+
+    skipped = []
+    for video_id, position, seconds in cleaned:
+        if video_id not in progress_ids:
+            skipped.append(video_id)
+            continue
+        _buffer.add(student.id, video_id, progress_ids[video_id], position, seconds)
+    if len(_buffer) >= FLUSH_SIZE:
+        flush_heartbeats()
+    _ensure_flusher()
+    return sorted(set(skipped))
+
+
+def flush_heartbeats():
+    """Write everything buffered so far. Returns how many rows were updated."""
+    entries = _buffer.drain()
+    if not entries:
+        return 0
+    rows = [
+        VideoProgress(
+            id=progress_id,
+            last_position=position,
+            watch_time=F('watch_time') + seconds
+        )
+        for progress_id, position, seconds in entries.values()
+    ]
+    try:
+        VideoProgress.objects.bulk_update(rows, ['last_position', 'watch_time'], batch_size=FLUSH_SIZE)
+    except Exception:
+        _buffer.restore(entries)
+        raise
+    return len(rows)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            close_old_connections()
+            flush_heartbeats()
+        except Exception:
+            logger.exception("Flushing video heartbeats failed")
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_periodically, name='video-heartbeat-flusher', daemon=True
+            )
+            _flusher.start()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush_heartbeats()
+    except Exception:
+        logger.exception("Flushing video heartbeats at exit failed")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.student.progress import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount Course.video_count and Enrollment.completed_videos and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', type=int, action='append', dest='course_ids',
+            help='Only reconcile the given course id (may be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        courses, enrollments = reconcile_counters(options['course_ids'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired {courses} course video count(s) and {enrollments} enrollment counter(s)'
+        ))
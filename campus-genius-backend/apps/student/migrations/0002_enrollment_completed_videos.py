@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:15
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model('faculty', 'Course')
+    VideoLecture = apps.get_model('faculty', 'VideoLecture')
+    Enrollment = apps.get_model('student', 'Enrollment')
+    VideoProgress = apps.get_model('student', 'VideoProgress')
+
+    Course.objects.update(video_count=Coalesce(Subquery(
+        VideoLecture.objects.filter(course=OuterRef('pk'))
+        .order_by().values('course').annotate(n=Count('pk')).values('n')[:1],
+        output_field=IntegerField()
+    ), Value(0)))
+    Enrollment.objects.update(completed_videos=Coalesce(Subquery(
+        VideoProgress.objects.filter(
+            student=OuterRef('student'), video__course=OuterRef('course'), is_completed=True
+        ).order_by().values('student').annotate(n=Count('pk')).values('n')[:1],
+        output_field=IntegerField()
+    ), Value(0)))
+    for course_id, video_count in Course.objects.filter(video_count__gt=0).values_list('id', 'video_count'):
+        Enrollment.objects.filter(course_id=course_id).update(
+            progress=Cast(F('completed_videos'), FloatField()) * 100.0 / video_count
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0006_course_video_count'),
+        ('student', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_videos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
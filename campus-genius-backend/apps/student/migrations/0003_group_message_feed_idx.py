@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0002_enrollment_completed_videos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studygroupmessage',
+            index=models.Index(fields=['group', '-created_at', '-id'], name='group_message_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0007_hot_path_indexes'),
+        ('student', '0003_group_message_feed_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['student', '-submitted_at'], name='submission_student_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'is_active'], name='enrollment_course_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(fields=['student', 'is_completed'], name='progress_student_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(fields=['video', 'is_completed'], name='progress_video_done_idx'),
+        ),
+    ]
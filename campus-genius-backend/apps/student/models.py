@@ -11,22 +11,29 @@ from apps.quiz.models import Quiz, Question
 User = get_user_model()
 
 class Enrollment(models.Model):
-    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='enrollments')
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
+    # Covered by the unique (student, course) index
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='enrollments', db_index=False)
+    # Covered by enrollment_course_active_idx
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments', db_index=False)
     enrolled_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     last_accessed = models.DateTimeField(auto_now=True)
     progress = models.FloatField(default=0.0)
+    completed_videos = models.PositiveIntegerField(default=0)  # see apps.student.progress
     grade = models.CharField(max_length=2, null=True, blank=True)
     
     class Meta:
         unique_together = ('student', 'course')
+        indexes = [
+            models.Index(fields=['course', 'is_active'], name='enrollment_course_active_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.email} - {self.course.code}"
 
 class AssignmentSubmission(models.Model):
-    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='assignment_submissions')
+    # Covered by submission_student_recent_idx
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='assignment_submissions', db_index=False)
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='submissions')
     submitted_at = models.DateTimeField(auto_now_add=True)
     submission_text = models.TextField(null=True, blank=True)
@@ -41,6 +48,12 @@ class AssignmentSubmission(models.Model):
         ('graded', 'Graded'),
         ('resubmitted', 'Resubmitted')
     ], default='submitted')
+
+    class Meta:
+        indexes = [
+            # Recent submissions on the student dashboard
+            models.Index(fields=['student', '-submitted_at'], name='submission_student_recent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.email} - {self.assignment.title}"
@@ -106,8 +119,10 @@ class NoteView(models.Model):
         return f"{self.student.email} - {self.note.title}"
 
 class VideoProgress(models.Model):
-    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='video_progress')
-    video = models.ForeignKey(VideoLecture, on_delete=models.CASCADE, related_name='progress')
+    # Covered by the unique (student, video) index and progress_student_done_idx
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='video_progress', db_index=False)
+    # Covered by progress_video_done_idx
+    video = models.ForeignKey(VideoLecture, on_delete=models.CASCADE, related_name='progress', db_index=False)
     started_at = models.DateTimeField(auto_now_add=True)
     last_position = models.IntegerField(default=0)  # in seconds
     is_completed = models.BooleanField(default=False)
@@ -118,6 +133,11 @@ class VideoProgress(models.Model):
     
     class Meta:
         unique_together = ('student', 'video')
+        indexes = [
+            # A student's completed videos, and completion rate per video
+            models.Index(fields=['student', 'is_completed'], name='progress_student_done_idx'),
+            models.Index(fields=['video', 'is_completed'], name='progress_video_done_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.email} - {self.video.title}"
@@ -137,12 +157,18 @@ class StudyGroup(models.Model):
         return f"{self.name} - {self.course.code}"
 
 class StudyGroupMessage(models.Model):
-    group = models.ForeignKey(StudyGroup, on_delete=models.CASCADE, related_name='messages')
+    # Covered by group_message_feed_idx
+    group = models.ForeignKey(StudyGroup, on_delete=models.CASCADE, related_name='messages', db_index=False)
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='group_messages')
     message = models.TextField()
     file = models.FileField(upload_to='group_messages/', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['group', '-created_at', '-id'], name='group_message_feed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.email} - {self.group.name}"
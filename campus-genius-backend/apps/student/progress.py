@@ -0,0 +1,116 @@
+from django.db import transaction
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from apps.faculty.dashboard import schedule_snapshot_refresh
+from apps.faculty.models import Course, VideoLecture
+from .models import Enrollment, VideoProgress
+
+# Denormalized video counters.
+#
+# Course.video_count is kept up to date when videos are added or removed and
+# Enrollment.completed_videos is bumped with F() the first time a student
+# completes a video, so Enrollment.progress can be written without counting
+# anything. reconcile_counters() recomputes both from the source rows.
+
+
+def progress_expression(video_count, offset=0):
+    # offset lets the same UPDATE change completed_videos; see complete_video
+    if not video_count:
+        return Value(0.0)
+    completed = Cast(F('completed_videos'), FloatField())
+    if offset:
+        completed = completed + offset
+    return completed * 100.0 / video_count
+
+
+def complete_video(progress):
+    """
+    Mark a VideoProgress completed and advance the enrollment. Returns False
+    if it was already completed (including by a concurrent request).
+    """
+    course = Course.objects.only('id', 'video_count').get(videos__id=progress.video_id)
+    with transaction.atomic():
+        now = timezone.now()
+        marked = VideoProgress.objects.filter(
+            pk=progress.pk, is_completed=False
+        ).update(is_completed=True, completed_at=now)
+        if not marked:
+            return False
+
+        # progress is assigned first: MySQL evaluates SET left to right, so
+        # it must see completed_videos before the increment on every backend
+        Enrollment.objects.filter(student_id=progress.student_id, course=course).update(
+            progress=progress_expression(course.video_count, offset=1),
+            completed_videos=F('completed_videos') + 1
+        )
+    progress.is_completed = True
+    progress.completed_at = now
+    # .update() skips post_save
+    schedule_snapshot_refresh(course.id)
+    return True
+
+
+def video_count_changed(course_id, delta):
+    Course.objects.filter(pk=course_id).update(video_count=F('video_count') + delta)
+    video_count = Course.objects.filter(pk=course_id).values_list('video_count', flat=True).first()
+    if video_count is not None:
+        Enrollment.objects.filter(course_id=course_id).update(
+            progress=progress_expression(video_count)
+        )
+
+
+def uncomplete_videos(course_id, student_ids):
+    # Completed progress rows are going away
+    video_count = Course.objects.filter(pk=course_id).values_list('video_count', flat=True).first()
+    Enrollment.objects.filter(course_id=course_id, student_id__in=student_ids).update(
+        progress=progress_expression(video_count, offset=-1),
+        completed_videos=F('completed_videos') - 1
+    )
+
+
+def reconcile_counters(course_ids=None):
+    """Repair drifted counters. Returns (courses fixed, enrollments fixed)."""
+    courses = Course.objects.all()
+    if course_ids:
+        courses = courses.filter(id__in=course_ids)
+
+    video_counts = Subquery(
+        VideoLecture.objects.filter(course=OuterRef('pk'))
+        .order_by().values('course').annotate(n=Count('pk')).values('n')[:1],
+        output_field=IntegerField()
+    )
+    drifted_courses = list(
+        courses.annotate(actual=Coalesce(video_counts, Value(0)))
+        .exclude(video_count=F('actual')).only('id', 'video_count')
+    )
+    for course in drifted_courses:
+        course.video_count = course.actual
+    Course.objects.bulk_update(drifted_courses, ['video_count'], batch_size=500)
+
+    completed_counts = Subquery(
+        VideoProgress.objects.filter(
+            student=OuterRef('student'), video__course=OuterRef('course'), is_completed=True
+        ).order_by().values('student').annotate(n=Count('pk')).values('n')[:1],
+        output_field=IntegerField()
+    )
+    drifted_enrollments = list(
+        Enrollment.objects.filter(course__in=courses)
+        .annotate(actual=Coalesce(completed_counts, Value(0)))
+        .exclude(completed_videos=F('actual')).only('id', 'completed_videos')
+    )
+    for enrollment in drifted_enrollments:
+        enrollment.completed_videos = enrollment.actual
+    Enrollment.objects.bulk_update(drifted_enrollments, ['completed_videos'], batch_size=500)
+
+    # Progress follows both counters
+    affected = {course.id for course in drifted_courses}
+    affected.update(
+        Enrollment.objects.filter(
+            id__in=[enrollment.id for enrollment in drifted_enrollments]
+        ).values_list('course_id', flat=True)
+    )
+    for course_id, video_count in Course.objects.filter(id__in=affected).values_list('id', 'video_count'):
+        Enrollment.objects.filter(course_id=course_id).update(progress=progress_expression(video_count))
+
+    return len(drifted_courses), len(drifted_enrollments)
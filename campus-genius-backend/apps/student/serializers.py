@@ -1,3 +1,5 @@
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from .models import (
     Enrollment, AssignmentSubmission,
@@ -10,6 +12,7 @@ from apps.faculty.serializers import (
 )
 from apps.quiz.serializers import QuizSerializer
 from apps.faculty.models import Note, Meeting, VideoLecture
+from apps.quiz.models import Quiz
 
 class NoteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -54,6 +57,34 @@ class QuizSubmissionSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('submitted_at',)
 
+class EnrollmentSummarySerializer(serializers.ModelSerializer):
+    course_title = serializers.CharField(source='course.title', read_only=True)
+    course_code = serializers.CharField(source='course.code', read_only=True)
+
+    class Meta:
+        model = Enrollment
+        fields = ['id', 'course', 'course_title', 'course_code', 'enrolled_at',
+                 'is_active', 'progress', 'completed_videos', 'grade']
+        read_only_fields = fields
+
+class AssignmentSubmissionSummarySerializer(serializers.ModelSerializer):
+    assignment_title = serializers.CharField(source='assignment.title', read_only=True)
+
+    class Meta:
+        model = AssignmentSubmission
+        fields = ['id', 'assignment', 'assignment_title', 'submitted_at',
+                 'score', 'is_late', 'status']
+        read_only_fields = fields
+
+class QuizSubmissionSummarySerializer(serializers.ModelSerializer):
+    quiz_title = serializers.CharField(source='quiz.title', read_only=True)
+
+    class Meta:
+        model = QuizSubmission
+        fields = ['id', 'quiz', 'quiz_title', 'started_at', 'submitted_at',
+                 'score', 'time_taken', 'attempt_number', 'is_completed']
+        read_only_fields = fields
+
 class StudyGroupSerializer(serializers.ModelSerializer):
     course = CourseSerializer(read_only=True)
     members_count = serializers.SerializerMethodField()
@@ -62,8 +93,17 @@ class StudyGroupSerializer(serializers.ModelSerializer):
         model = StudyGroup
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at')
+        # Applied by PrefetchPlannerMixin
+        annotations = {
+            'members_total': Coalesce(Subquery(
+                StudyGroup.members.through.objects.filter(studygroup=OuterRef('pk'))
+                .order_by().values('studygroup').annotate(n=Count('pk')).values('n')[:1]
+            ), Value(0))
+        }
     
     def get_members_count(self, obj):
+        if hasattr(obj, 'members_total'):
+            return obj.members_total
         return obj.members.count()
 
 class StudyGroupMessageSerializer(serializers.ModelSerializer):
@@ -74,6 +114,16 @@ class StudyGroupMessageSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at',)
 
+class DashboardQuizSerializer(serializers.ModelSerializer):
+    # Card-sized quiz for the dashboard; no questions or choices
+    course_name = serializers.CharField(source='course.title', read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ['id', 'title', 'course', 'course_name', 'description',
+                 'time_limit', 'total_marks', 'is_published', 'max_attempts',
+                 'created_at']
+
 class StudentDashboardSerializer(serializers.Serializer):
     enrolled_courses = serializers.IntegerField()
     active_assignments = serializers.IntegerField()
@@ -81,7 +131,7 @@ class StudentDashboardSerializer(serializers.Serializer):
     study_groups = serializers.IntegerField()
     recent_courses = CourseSerializer(many=True)
     upcoming_assignments = AssignmentSerializer(many=True)
-    recent_quizzes = QuizSerializer(many=True)
+    recent_quizzes = DashboardQuizSerializer(many=True)
 
 class AnswerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -110,9 +160,11 @@ class VideoProgressSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = VideoProgress
-        fields = ['id', 'video', 'student', 'current_time', 
-                 'is_completed', 'last_watched']
-        read_only_fields = ['student', 'last_watched']
+        fields = ['id', 'video', 'student', 'last_position', 'watch_time',
+                 'is_completed', 'completed_at', 'started_at']
+        # Completion goes through the complete action, which keeps
+        # Enrollment.completed_videos in step (apps.student.progress)
+        read_only_fields = ['student', 'is_completed', 'completed_at', 'started_at']
 
 class DoubtSerializer(serializers.ModelSerializer):
     class Meta:
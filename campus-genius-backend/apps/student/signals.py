@@ -0,0 +1,70 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .dashboard import invalidate_dashboard
+from .models import (
+    Enrollment, AssignmentSubmission, QuizSubmission, VideoProgress, StudyGroup
+)
+from .progress import video_count_changed, uncomplete_videos
+from apps.faculty.models import Course, VideoLecture
+from apps.quiz.models import QuizAttempt
+
+
+def _origin_model(origin):
+    # What delete() was called on; cascaded rows share their parent's origin
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=AssignmentSubmission)
+@receiver([post_save, post_delete], sender=QuizSubmission)
+@receiver([post_save, post_delete], sender=QuizAttempt)
+@receiver([post_save, post_delete], sender=VideoProgress)
+def student_activity_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.student_id)
+
+
+@receiver(m2m_changed, sender=StudyGroup.members.through)
+def study_group_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # instance is the user
+        invalidate_dashboard(instance.pk)
+    elif pk_set:
+        for student_id in pk_set:
+            invalidate_dashboard(student_id)
+
+
+@receiver(post_save, sender=VideoLecture)
+def video_added(sender, instance, created, **kwargs):
+    if created:
+        video_count_changed(instance.course_id, 1)
+
+
+@receiver(pre_delete, sender=VideoLecture)
+def video_removing(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) is Course:
+        return
+    # The progress rows are still there before the cascade
+    student_ids = list(
+        VideoProgress.objects.filter(video=instance, is_completed=True).values_list('student_id', flat=True)
+    )
+    if student_ids:
+        uncomplete_videos(instance.course_id, student_ids)
+
+
+@receiver(post_delete, sender=VideoLecture)
+def video_removed(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) is not Course:
+        video_count_changed(instance.course_id, -1)
+
+
+@receiver(post_delete, sender=VideoProgress)
+def video_progress_removed(sender, instance, origin=None, **kwargs):
+    # Cascades from a video, course or user are handled by their own receivers
+    if instance.is_completed and _origin_model(origin) is VideoProgress:
+        course_id = VideoLecture.objects.filter(
+            id=instance.video_id
+        ).values_list('course_id', flat=True).first()
+        uncomplete_videos(course_id, [instance.student_id])
@@ -5,24 +5,30 @@ from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Count, Avg, Q, F, Sum
+from django.db.models import Q, F
 from .models import (
     Enrollment, QuizSubmission, Answer, MeetingAttendance,
     NoteView, VideoProgress, AssignmentSubmission,
     StudyGroup, StudyGroupMessage, LearningPath, Doubt
 )
-from apps.faculty.models import (
-    Course, Meeting, Note,
-    VideoLecture, Assignment, Resource
-)
-from apps.quiz.models import Quiz, Question, QuizAttempt
+from apps.faculty.models import Note, Resource
+from apps.quiz.models import Question
+from apps.quiz.answer_key import get_answer_key
+from apps.common.pagination import KeysetPagination
+from apps.common.prefetch import PrefetchPlannerMixin
+from apps.common.summary import SummaryViewMixin
+from .dashboard import get_dashboard
+from .heartbeats import record_heartbeat, record_heartbeats, HeartbeatError
+from .progress import complete_video
+from .enrollment import enroll_in_courses, EnrollmentError
 from .serializers import (
     EnrollmentSerializer, QuizSubmissionSerializer,
     AnswerSerializer, MeetingAttendanceSerializer,
     NoteViewSerializer, VideoProgressSerializer,
     AssignmentSubmissionSerializer, StudyGroupSerializer,
     StudyGroupMessageSerializer, LearningPathSerializer,
-    DoubtSerializer, StudentDashboardSerializer
+    DoubtSerializer, EnrollmentSummarySerializer,
+    QuizSubmissionSummarySerializer, AssignmentSubmissionSummarySerializer
 )
 
 User = get_user_model()
@@ -39,89 +45,16 @@ class StudentDashboardView(APIView):
     
     def get(self, request):
         try:
-            enrollments = Enrollment.objects.filter(student=request.user, is_active=True)
-            courses = Course.objects.filter(enrollments__in=enrollments)
-            
-            # Course analytics
-            course_analytics = courses.annotate(
-                progress=Avg('enrollments__progress', filter=Q(enrollments__student=request.user)),
-                grade=Avg('enrollments__grade', filter=Q(enrollments__student=request.user))
-            )
-            
-            # Assignment analytics
-            assignment_analytics = Assignment.objects.filter(
-                course__in=courses
-            ).annotate(
-                submission_status=Count('submissions', filter=Q(submissions__student=request.user)),
-                score=Avg('submissions__score', filter=Q(submissions__student=request.user))
-            )
-            
-            # Quiz analytics
-            quiz_analytics = Quiz.objects.filter(
-                course__in=courses
-            ).annotate(
-                submission_status=Count('quizattempt', filter=Q(quizattempt__student=request.user)),
-                score=Avg('quizattempt__score', filter=Q(quizattempt__student=request.user))
-            )
-
-            # Completed quizzes logic
-            completed_quizzes_count = QuizAttempt.objects.filter(
-                student=request.user,
-                completed_at__isnull=False
-            ).count()
-            
-            # Video progress
-            video_progress = VideoProgress.objects.filter(
-                student=request.user,
-                video__course__in=courses
-            ).aggregate(
-                total_watch_time=Sum('watch_time'),
-                completed_videos=Count('id', filter=Q(is_completed=True))
-            )
-            
-            data = {
-                'enrolled_courses': courses.count(),
-                'active_assignments': Assignment.objects.filter(
-                    course__in=courses,
-                    due_date__gt=timezone.now()
-                ).count(),
-                'completed_quizzes': completed_quizzes_count,
-                'study_groups': StudyGroup.objects.filter(members=request.user).count(),
-                'upcoming_meetings': Meeting.objects.filter(
-                    course__in=courses,
-                    start_time__gt=timezone.now()
-                ).order_by('start_time')[:5],
-                'recent_submissions': AssignmentSubmission.objects.filter(
-                    student=request.user
-                ).order_by('-submitted_at')[:5],
-                'course_analytics': course_analytics,
-                'assignment_analytics': assignment_analytics,
-                'quiz_analytics': quiz_analytics,
-                'video_progress': video_progress,
-                'learning_paths': LearningPath.objects.filter(
-                    student=request.user,
-                    course__in=courses
-                ),
-                'recent_doubts': Doubt.objects.filter(
-                    student=request.user,
-                    course__in=courses
-                ).order_by('-created_at')[:5],
-                 # Adding required fields for serializer usually expected but missing in previous code
-                 'recent_courses': courses[:5],
-                 'upcoming_assignments': Assignment.objects.filter(course__in=courses, due_date__gt=timezone.now())[:5],
-                 'recent_quizzes': Quiz.objects.filter(course__in=courses)[:5]
-            }
-            
-            serializer = StudentDashboardSerializer(data)
-            return Response(serializer.data)
+            return Response(get_dashboard(request.user))
         except Exception as e:
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(SummaryViewMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = EnrollmentSerializer
+    summary_serializer_class = EnrollmentSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
     def get_queryset(self):
@@ -130,6 +63,15 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        # Body: {"courses": [{"course": 1, "enrollment_key": "..."}, ...]}
+        try:
+            result = enroll_in_courses(request.user, request.data.get('courses'))
+        except EnrollmentError as e:
+            return Response({'error': e.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'])
     def update_progress(self, request, pk=None):
         enrollment = self.get_object()
@@ -143,8 +85,9 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class QuizSubmissionViewSet(viewsets.ModelViewSet):
+class QuizSubmissionViewSet(SummaryViewMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = QuizSubmissionSerializer
+    summary_serializer_class = QuizSubmissionSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
     def get_queryset(self):
@@ -187,15 +130,24 @@ class QuizSubmissionViewSet(viewsets.ModelViewSet):
         submission.submitted_at = timezone.now()
         submission.time_taken = (timezone.now() - submission.started_at).seconds
         
-        # Calculate score
-        total_questions = submission.quiz.questions.count()
-        correct_answers = submission.answers.filter(is_correct=True).count()
-        submission.score = (correct_answers / total_questions) * 100
+        # Calculate score against the cached answer key; MCQs are checked
+        # against the key, other answers keep whatever grade they were given
+        questions = get_answer_key(submission.quiz_id)['questions']
+        correct_answers = 0
+        for question_id, answer_text, is_correct in submission.answers.values_list(
+            'question_id', 'answer_text', 'is_correct'
+        ):
+            entry = questions.get(question_id)
+            if entry and entry['type'] == 'mcq' and entry['correct_choice'] is not None:
+                is_correct = answer_text == entry['correct_choice']
+            correct_answers += bool(is_correct)
+        total_questions = len(questions)
+        submission.score = (correct_answers / total_questions) * 100 if total_questions else 0
         
         submission.save()
         return Response({'status': 'quiz completed', 'score': submission.score})
 
-class MeetingAttendanceViewSet(viewsets.ModelViewSet):
+class MeetingAttendanceViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = MeetingAttendanceSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
@@ -220,7 +172,7 @@ class MeetingAttendanceViewSet(viewsets.ModelViewSet):
         
         return Response({'status': 'left meeting', 'duration': attendance.duration})
 
-class NoteViewViewSet(viewsets.ModelViewSet):
+class NoteViewViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = NoteViewSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
@@ -250,7 +202,7 @@ class NoteViewViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class VideoProgressViewSet(viewsets.ModelViewSet):
+class VideoProgressViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = VideoProgressSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
@@ -265,46 +217,45 @@ class VideoProgressViewSet(viewsets.ModelViewSet):
         progress = self.get_object()
         position = request.data.get('position')
         if position is not None:
-            progress.last_position = position
-            progress.watch_time += 1  # Assuming 1 second increment
-            progress.save()
+            try:
+                position = int(position)
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'position must be an integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                record_heartbeat(progress, position)  # 1 second per heartbeat
+            except HeartbeatError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             return Response({'status': 'position updated'})
         return Response(
             {'error': 'position is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+    @action(detail=False, methods=['post'])
+    def heartbeats(self, request):
+        # Body: {"heartbeats": [{"video": 1, "position": 120, "seconds": 5}, ...]}
+        try:
+            skipped = record_heartbeats(request.user, request.data.get('heartbeats'))
+        except HeartbeatError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'status': 'heartbeats recorded', 'skipped_videos': skipped})
     
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         progress = self.get_object()
-        if progress.is_completed:
+        if not complete_video(progress):
             return Response(
                 {'error': 'video already completed'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        progress.is_completed = True
-        progress.completed_at = timezone.now()
-        progress.save()
-        
-        # Update course progress
-        enrollment = Enrollment.objects.get(
-            student=self.request.user,
-            course=progress.video.course
-        )
-        total_videos = VideoLecture.objects.filter(course=progress.video.course).count()
-        completed_videos = VideoProgress.objects.filter(
-            student=self.request.user,
-            video__course=progress.video.course,
-            is_completed=True
-        ).count()
-        enrollment.progress = (completed_videos / total_videos) * 100
-        enrollment.save()
-        
         return Response({'status': 'video completed'})
 
-class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
+class AssignmentSubmissionViewSet(SummaryViewMixin, PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = AssignmentSubmissionSerializer
+    summary_serializer_class = AssignmentSubmissionSummarySerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
     def get_queryset(self):
@@ -336,7 +287,7 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
         
         return Response({'status': 'assignment resubmitted'})
 
-class StudyGroupViewSet(viewsets.ModelViewSet):
+class StudyGroupViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = StudyGroupSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
@@ -372,9 +323,12 @@ class StudyGroupViewSet(viewsets.ModelViewSet):
         group.members.remove(self.request.user)
         return Response({'status': 'left group'})
 
-class StudyGroupMessageViewSet(viewsets.ModelViewSet):
+class StudyGroupMessageViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = StudyGroupMessageSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
+    pagination_class = KeysetPagination
+    pagination_page_size = 50
+    pagination_max_page_size = 200
     
     def get_queryset(self):
         return StudyGroupMessage.objects.filter(
@@ -384,7 +338,7 @@ class StudyGroupMessageViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
 
-class LearningPathViewSet(viewsets.ModelViewSet):
+class LearningPathViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = LearningPathSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
@@ -410,7 +364,7 @@ class LearningPathViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class DoubtViewSet(viewsets.ModelViewSet):
+class DoubtViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = DoubtSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
@@ -441,7 +395,7 @@ from apps.faculty.models import Note
 
 from rest_framework.parsers import MultiPartParser, FormParser
 
-class StudentNoteViewSet(viewsets.ModelViewSet):
+class StudentNoteViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     serializer_class = NoteSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     parser_classes = (MultiPartParser, FormParser)
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import beat_init, worker_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -10,6 +11,22 @@ app = Celery('campus_genius')
 # the configuration object to child processes.
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+
+def ensure_broker_folders():
+    # The filesystem transport expects its folders to exist. Created on
+    # demand rather than at import, since the web app may run on a
+    # read-only filesystem.
+    for folder in app.conf.broker_transport_options.values():
+        if isinstance(folder, str):
+            os.makedirs(folder, exist_ok=True)
+
+
+@worker_init.connect
+@beat_init.connect
+def _prepare_broker(**kwargs):
+    ensure_broker_folders()
+
+
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
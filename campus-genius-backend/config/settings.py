@@ -77,7 +77,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'drf_spectacular',
     'allauth',
-    'allauth.account',
+    'apps.common.apps.AccountConfig',  # allauth.account, see apps.common.middleware
     'allauth.socialaccount',
     'django_filters',
     'channels', # Django Channels
@@ -102,7 +102,7 @@ CHANNEL_LAYERS = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.common.middleware.WhiteNoiseMiddleware',  # async-capable whitenoise
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
     'django.middleware.common.CommonMiddleware',
@@ -110,7 +110,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'allauth.account.middleware.AccountMiddleware',
+    'apps.common.middleware.AccountMiddleware',  # async-capable allauth
 ]
 
 # CORS settings
@@ -140,6 +140,7 @@ CORS_ALLOW_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
 ]
+CORS_EXPOSE_HEADERS = ['link']  # pagination cursors
 
 CSRF_TRUSTED_ORIGINS = env.list('CSRF_TRUSTED_ORIGINS', default=['http://localhost:3000', 'http://127.0.0.1:3000'])
 
@@ -169,6 +170,15 @@ DATABASES = {
     'default': env.db('DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}")
 }
 
+# Cache
+# Notification counts, quiz item analysis and compiled answer keys live here.
+# The local-memory default is private to each process, so a deployment with
+# more than one process (several web workers, Celery) must point CACHE_URL at
+# a shared backend, e.g. redis://localhost:6379/1.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 # Rest Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -260,3 +270,85 @@ REST_AUTH_REGISTER_SERIALIZERS = {
     'REGISTER_SERIALIZER': 'apps.custom_auth.serializers.CustomRegisterSerializer'
 }
 
+# Celery
+# Defaults to a filesystem broker so workers run locally (and in tests) without
+# Redis; point CELERY_BROKER_URL at a real broker in production, or at
+# sqla+sqlite:///celery.sqlite3 for a SQLite-backed queue.
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='filesystem://')
+CELERY_BROKER_FOLDER = env('CELERY_BROKER_FOLDER', default=str(BASE_DIR / 'celery_broker'))
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'data_folder_in': os.path.join(CELERY_BROKER_FOLDER, 'queue'),
+    'data_folder_out': os.path.join(CELERY_BROKER_FOLDER, 'queue'),
+    'processed_folder': os.path.join(CELERY_BROKER_FOLDER, 'processed'),
+    'control_folder': os.path.join(CELERY_BROKER_FOLDER, 'control'),
+    'store_processed': False,
+} if CELERY_BROKER_URL.startswith('filesystem://') else {}
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=False)
+CELERY_BEAT_SCHEDULE = {
+    'sweep-quiz-submission-receipts': {
+        'task': 'apps.quiz.tasks.sweep_submission_receipts',
+        'schedule': 30.0,
+    },
+    'refresh-dashboard-snapshots': {
+        'task': 'apps.faculty.tasks.refresh_dashboard_snapshots',
+        'schedule': 60.0,
+    },
+}
+
+# Quiz submission ingest
+# When enabled, submit_attempt only validates and queues the answers (202 with
+# a receipt); Celery workers grade them in batches.
+QUIZ_SUBMISSION_INGEST = env.bool('QUIZ_SUBMISSION_INGEST', default=False)
+QUIZ_SUBMISSION_BATCH_SIZE = env.int('QUIZ_SUBMISSION_BATCH_SIZE', default=50)
+
+# Quiz answer keys
+# Each process keeps compiled keys in memory and re-checks the quiz's key
+# version in the database at most this often, so an edited key reaches every
+# process within this many seconds whatever the cache backend.
+QUIZ_ANSWER_KEY_RECHECK = env.float('QUIZ_ANSWER_KEY_RECHECK', default=5.0)
+
+# Video heartbeats
+# Player heartbeats are buffered per process and written with one bulk UPDATE
+# when the buffer holds this many videos or this many seconds have passed.
+VIDEO_HEARTBEAT_FLUSH_SIZE = env.int('VIDEO_HEARTBEAT_FLUSH_SIZE', default=500)
+VIDEO_HEARTBEAT_FLUSH_INTERVAL = env.float('VIDEO_HEARTBEAT_FLUSH_INTERVAL', default=5.0)
+
+# Fast serialization
+# Hot read-only lists build their JSON from values() rows instead of DRF
+# serializers (apps.common.fast); turn off to serve them the usual way.
+FAST_SERIALIZATION = env.bool('FAST_SERIALIZATION', default=True)
+
+# Chat LLM (apps.chat_service.llm)
+# 'gemini', or 'fake' for a deterministic local model that answers after
+# CHAT_LLM_FAKE_DELAY seconds.
+CHAT_LLM_BACKEND = env('CHAT_LLM_BACKEND', default='gemini')
+CHAT_LLM_TIMEOUT = env.float('CHAT_LLM_TIMEOUT', default=30.0)
+CHAT_LLM_AVAILABILITY_TTL = env.float('CHAT_LLM_AVAILABILITY_TTL', default=3600.0)
+CHAT_LLM_FAKE_DELAY = env.float('CHAT_LLM_FAKE_DELAY', default=0.0)
+# A model that fails CHAT_LLM_BREAKER_THRESHOLD times in a row is skipped
+# for CHAT_LLM_BREAKER_COOLDOWN seconds (apps.chat_service.health).
+CHAT_LLM_BREAKER_THRESHOLD = env.int('CHAT_LLM_BREAKER_THRESHOLD', default=3)
+CHAT_LLM_BREAKER_COOLDOWN = env.float('CHAT_LLM_BREAKER_COOLDOWN', default=60.0)
+
+# Chat response cache (apps.chat_service.response_cache), shared with
+# ai_service through Mongo. CHAT_CACHE_SIMILARITY is the cosine threshold
+# for answering near-identical questions from the cache, e.g. 0.92; 0 keeps
+# exact (normalized) matches only and skips the embedding call.
+CHAT_CACHE_TTL = env.int('CHAT_CACHE_TTL', default=86400)
+CHAT_CACHE_MAX_ENTRIES = env.int('CHAT_CACHE_MAX_ENTRIES', default=500)
+CHAT_CACHE_SIMILARITY = env.float('CHAT_CACHE_SIMILARITY', default=0.0)
+
+# LLM gateway (apps.chat_service.gateway), shared by every AI feature.
+# At most LLM_GATEWAY_CONCURRENCY provider calls run at once per process,
+# LLM_GATEWAY_BULK_CONCURRENCY of them bulk work (quiz generation, file
+# summaries), so chat keeps a free slot. A call that waits longer than
+# LLM_GATEWAY_QUEUE_TIMEOUT seconds for a slot gets a 503. Rate-limit and
+# overload errors are retried LLM_GATEWAY_RETRIES times with jittered
+# backoff from LLM_GATEWAY_BACKOFF seconds. LLM_GATEWAY_TIMEOUT bounds calls
+# that do not set their own (chat uses CHAT_LLM_TIMEOUT).
+LLM_GATEWAY_CONCURRENCY = env.int('LLM_GATEWAY_CONCURRENCY', default=8)
+LLM_GATEWAY_BULK_CONCURRENCY = env.int('LLM_GATEWAY_BULK_CONCURRENCY', default=2)
+LLM_GATEWAY_QUEUE_TIMEOUT = env.float('LLM_GATEWAY_QUEUE_TIMEOUT', default=10.0)
+LLM_GATEWAY_TIMEOUT = env.float('LLM_GATEWAY_TIMEOUT', default=120.0)
+LLM_GATEWAY_RETRIES = env.int('LLM_GATEWAY_RETRIES', default=2)
+LLM_GATEWAY_BACKOFF = env.float('LLM_GATEWAY_BACKOFF', default=0.5)
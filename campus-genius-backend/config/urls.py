@@ -49,7 +49,7 @@ urlpatterns = [
     path('api/chat/', include('apps.chat_service.urls')),
     path('api/', include('apps.quiz.urls')), # Mount request at root for api/quizzes
     # path('api/core/', include('apps.core.urls')),
-    # path('api/common/', include('apps.common.urls')),
+    path('api/common/', include('apps.common.urls')),
 ]
 
 from django.conf import settings